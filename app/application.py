@@ -1,12 +1,18 @@
 import asyncio
 import sys
+from typing import Dict
 
 from twisted.internet import asyncioreactor
 from twisted.internet.asyncioreactor import AsyncioSelectorReactor
+from twisted.internet.protocol import Factory
+from twisted.web import server
 
 from app.configuration import Configuration, BuildInformation
 from app.core.logging.loggers import Logger
 from app.core.service.factory import ServiceFactory
+from app.core.service.websocket import WebSocketConfiguration, WebSocketServiceFactory
+from app.core.service.workers import HealthReporter, HealthResource, HealthStatus, WorkerConfiguration, \
+    listen_reusable
 from app.domain.chat.participant.factory import get_client
 
 if sys.platform == "win32":
@@ -27,20 +33,67 @@ class Application(object):
 
     def __initialize(self, name: str, version: str) -> None:
         self.logger.info("Starting {0} VER: {1}".format(name, version))
-        self.reactor.listenTCP(self.__configuration.port(),
-                               ServiceFactory(
-                                   configuration=self.__configuration,
-                                   event_loop=self.__event_loop
-                               ))
+        service_factory = ServiceFactory(
+            configuration=self.__configuration,
+            event_loop=self.__event_loop,
+            reactor=self.reactor
+        )
+        self.__listen(reactor=self.reactor, port=self.__configuration.port(), factory=service_factory)
+        self.__listen_for_websockets(reactor=self.reactor, service_factory=service_factory)
+        self.__report_health(reactor=self.reactor, service_factory=service_factory)
         asyncio.set_event_loop(self.__event_loop)
         self.reactor.callLater(seconds=5, f=get_client().start_up)
         self.reactor.run()
 
     async def _initializer(self, reactor: AsyncioSelectorReactor):
-        reactor.listenTCP(self.__configuration.port(),
-                          ServiceFactory(
-                              configuration=self.__configuration,
-                              event_loop=asyncio.get_event_loop()
-                          ))
+        service_factory = ServiceFactory(
+            configuration=self.__configuration,
+            event_loop=asyncio.get_event_loop(),
+            reactor=reactor
+        )
+        self.__listen(reactor=reactor, port=self.__configuration.port(), factory=service_factory)
+        self.__listen_for_websockets(reactor=reactor, service_factory=service_factory)
+        self.__report_health(reactor=reactor, service_factory=service_factory)
         asyncio.get_event_loop().create_task(coro=get_client().start_up(), name="start-nats")
         reactor.run()
+
+    def __listen_for_websockets(self, reactor: AsyncioSelectorReactor, service_factory: ServiceFactory) -> None:
+        configuration = WebSocketConfiguration(content_map=self.__configuration.websocket_configuration())
+        if not configuration.enabled:
+            return
+        self.logger.info("Accepting websocket connections on {0}".format(configuration.port))
+        self.__listen(reactor=reactor,
+                      port=configuration.port,
+                      factory=WebSocketServiceFactory(
+                          wrapped_factory=service_factory,
+                          configuration=configuration,
+                          reactor=reactor
+                      ))
+
+    def __listen(self, reactor: AsyncioSelectorReactor, port: int, factory: Factory) -> None:
+        if self.__configuration.worker_index() is None:
+            reactor.listenTCP(port, factory)
+            return
+        # Sibling workers listen on the same port
+        listen_reusable(reactor=reactor, port=port, factory=factory)
+
+    def __report_health(self, reactor: AsyncioSelectorReactor, service_factory: ServiceFactory) -> None:
+        configuration = WorkerConfiguration(content_map=self.__configuration.worker_configuration())
+        if self.__configuration.worker_index() is None:
+            # Without a supervisor the process serves its own health on the port the supervisor would
+            self.logger.info("Serving health on {0}".format(configuration.health_port))
+            reactor.listenTCP(configuration.health_port, server.Site(HealthResource(
+                probe=lambda: self.__process_health(service_factory=service_factory))))
+            return
+        self.logger.info("Running as worker {0} NODE: {1}".format(self.__configuration.worker_index(),
+                                                                 self.__configuration.node()))
+        HealthReporter(reactor=reactor,
+                       interval=configuration.report_interval,
+                       index=self.__configuration.worker_index(),
+                       node=self.__configuration.node(),
+                       probe=service_factory.health).start()
+
+    @staticmethod
+    def __process_health(service_factory: ServiceFactory) -> Dict:
+        # A process that answers at all is up, there are no workers that could be down
+        return dict(service_factory.health(), status=HealthStatus.UP.value)
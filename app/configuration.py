@@ -1,6 +1,6 @@
 import os
 import socket
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from decouple import config
 from yaml import safe_load
@@ -66,7 +66,26 @@ class Configuration(object):
         self.__build_information = build_information
         self.__database_uri: str = content_map["database"]["uri"]
         self.__account_service_url: str = content_map["account-service"]["url"]
+        self.__account_service_configuration: Dict = content_map["account-service"]
         self.__nats_configuration = content_map["nats"]
+        self.__transport_configuration: Dict = content_map.get("transport", {})
+        self.__transfer_configuration: Dict = content_map.get("transfers", {})
+        self.__profile_cache_configuration: Dict = content_map.get("profiles", {})
+        self.__contact_index_configuration: Dict = content_map.get("contacts", {})
+        self.__receipt_configuration: Dict = content_map.get("receipts", {})
+        self.__watermark_configuration: Dict = content_map.get("watermarks", {})
+        self.__persistence_configuration: Dict = content_map.get("persistence", {})
+        self.__liveness_configuration: Dict = content_map.get("liveness", {})
+        self.__websocket_configuration: Dict = content_map.get("websocket", {})
+        self.__worker_configuration: Dict = content_map.get("workers", {})
+        self.__identification_configuration: Dict = content_map.get("identification", {})
+        self.__admission_configuration: Dict = content_map.get("admission", {})
+        self.__resumption_configuration: Dict = content_map.get("resumption", {})
+        # Shared by every node and worker so any of them can open a ticket another issued
+        self.__resumption_secret: Optional[str] = config("RESUMPTION_SECRET", default=None)
+        # Set by the supervisor for each worker process it starts
+        worker_index = config("WORKER_INDEX", default=None)
+        self.__worker_index: Optional[int] = int(worker_index) if worker_index is not None else None
         self.__port: int = int(content_map["port"])
         self.__client: ServiceDiscoveryClient = client
         if self.__client is not None:
@@ -86,14 +105,66 @@ class Configuration(object):
     def account_service_url(self) -> str:
         return self.__account_service_url
 
+    def account_service_configuration(self) -> Dict:
+        return self.__account_service_configuration
+
     def nats_configuration(self) -> Dict:
         return self.__nats_configuration
 
+    def transport_configuration(self) -> Dict:
+        return self.__transport_configuration
+
+    def liveness_configuration(self) -> Dict:
+        return self.__liveness_configuration
+
+    def websocket_configuration(self) -> Dict:
+        return self.__websocket_configuration
+
+    def identification_configuration(self) -> Dict:
+        return self.__identification_configuration
+
+    def admission_configuration(self) -> Dict:
+        return self.__admission_configuration
+
+    def resumption_configuration(self) -> Dict:
+        return self.__resumption_configuration
+
+    def resumption_secret(self) -> Optional[str]:
+        return self.__resumption_secret
+
+    def worker_configuration(self) -> Dict:
+        return self.__worker_configuration
+
+    def worker_index(self) -> Optional[int]:
+        return self.__worker_index
+
+    def transfer_configuration(self) -> Dict:
+        return self.__transfer_configuration
+
+    def profile_cache_configuration(self) -> Dict:
+        return self.__profile_cache_configuration
+
+    def contact_index_configuration(self) -> Dict:
+        return self.__contact_index_configuration
+
+    def receipt_configuration(self) -> Dict:
+        return self.__receipt_configuration
+
+    def watermark_configuration(self) -> Dict:
+        return self.__watermark_configuration
+
+    def persistence_configuration(self) -> Dict:
+        return self.__persistence_configuration
+
     def port(self) -> int:
         return self.__port
 
     def node(self) -> str:
-        return self.__node if self.__node is not None else "default"
+        node = self.__node if self.__node is not None else "default"
+        if self.__worker_index is not None:
+            # Every worker is a node of its own, pass-overs between them go through NATS
+            return "{0}-worker-{1}".format(node, self.__worker_index)
+        return node
 
     def is_in_test_mode(self):
         return self.__test_mode
@@ -9,6 +9,10 @@ class SmartSession:
         return self.__session
 
     def __exit__(self, type, value, traceback):
+        if type is not None:
+            # Nothing of a failed block is kept, a caller retrying it would write it twice
+            self.__session.rollback()
+            return False
         try:
             self.__session.commit()
         except Exception as e:
@@ -1,9 +1,11 @@
-import datetime
 import logging
 import os
 import platform
 import sys
 import threading
+import time
+from typing import Dict, Tuple
+
 import structlog
 from app.configuration import BuildInformation
 
@@ -17,6 +19,14 @@ class LogEntryProcessor:
     _HOST = platform.node().split('.')[0]
     _BI = BuildInformation.fetch()
     _TLS = threading.local()
+    _APP_INFO = {
+        'logRepoName': _BI.repository(),
+        'logServiceType': _BI.environment(),
+        'logServiceName': _BI.name(),
+        'logServiceVersion': _BI.version(),
+        'logServiceInstance': _HOST
+    }
+    _SECOND: Tuple[int, str] = (-1, "")
 
     @staticmethod
     def get_request_id() -> str:
@@ -33,12 +43,8 @@ class LogEntryProcessor:
         """
         Add application level keys to the event dict
         """
-        event_dict['logRepoName'] = LogEntryProcessor._BI.repository()
-        event_dict['logServiceType'] = LogEntryProcessor._BI.environment()
-        event_dict['logServiceName'] = LogEntryProcessor._BI.name()
-        event_dict['logServiceVersion'] = LogEntryProcessor._BI.version()
-        event_dict['logServiceInstance'] = LogEntryProcessor._HOST
-        event_dict['logThreadId'] = threading.current_thread().getName()
+        event_dict.update(LogEntryProcessor._APP_INFO)
+        event_dict['logThreadId'] = threading.current_thread().name
         if LogEntryProcessor.get_request_id():
             # We are also used by the gunicorn logger so this may not be set
             event_dict['logRequestId'] = LogEntryProcessor.get_request_id()
@@ -66,9 +72,11 @@ class LogEntryProcessor:
         python 3.5 strftime does not have millis; strftime is implemented on by the
         C library on the target OS - trying for something that is portable
         """
-        now = datetime.datetime.utcnow()
-        millis = '{:3d}'.format(int(now.microsecond / 1000))
-        event_dict["timestamp"] = "%s.%sZ" % (now.strftime('%Y-%m-%dT%H:%M:%S'), millis)
+        now = time.time()
+        second = int(now)
+        if LogEntryProcessor._SECOND[0] != second:
+            LogEntryProcessor._SECOND = (second, time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(second)))
+        event_dict["timestamp"] = "%s.%03dZ" % (LogEntryProcessor._SECOND[1], int((now - second) * 1000))
         return event_dict
 
     @staticmethod
@@ -125,7 +133,7 @@ def initialize_logging() -> None:
             structlog.processors.StackInfoRenderer(),
             structlog.processors.format_exc_info,
             LogEntryProcessor.cleanup_keynames,
-            structlog.twisted.JSONRenderer()
+            structlog.processors.JSONRenderer()
         ]
 
     structlog.configure_once(
@@ -136,13 +144,36 @@ def initialize_logging() -> None:
         cache_logger_on_first_use=True,
     )
 
-    structlog.configure_once(
-        processors=chain,
-        context_class=dict,
-        logger_factory=structlog.twisted.LoggerFactory(),
-        wrapper_class=structlog.twisted.BoundLogger,
-        cache_logger_on_first_use=True,
-    )
+
+class CallSite(object):
+    """
+    Sampling and rate limiting state for a single logging call site.
+    """
+    __slots__ = ("calls", "tokens", "updated_at", "suppressed")
+
+    def __init__(self, max_per_second: float):
+        self.calls = 0
+        self.tokens = max(max_per_second, 1.0)
+        self.updated_at = time.monotonic()
+        self.suppressed = 0
+
+    def admit(self, sample_every: int, max_per_second: float) -> bool:
+        self.calls += 1
+        if sample_every > 1 and self.calls % sample_every != 1:
+            self.suppressed += 1
+            return False
+        if max_per_second > 0:
+            now = time.monotonic()
+            self.tokens = min(max(max_per_second, 1.0), self.tokens + (now - self.updated_at) * max_per_second)
+            self.updated_at = now
+            if self.tokens < 1:
+                self.suppressed += 1
+                return False
+            self.tokens -= 1
+        return True
+
+
+_CALL_SITES: Dict[Tuple, CallSite] = {}
 
 
 class LoggerMixin:
@@ -150,8 +181,15 @@ class LoggerMixin:
     A structured logger that is mixed in to each class
     The mixin methods follow structlog method signatures
     To record an exception in the log: exception type, message, and traceback::
-        self._error("During shutdown, worker raised {} exception: {}".format(
-                    type(exc).__name__, exc), exc_info=exc)
+        self._error("During shutdown, worker raised {} exception: {}",
+                    type(exc).__name__, exc, exc_info=exc)
+    Positional arguments are only formatted into the message once the level is known to be
+    enabled, so hot paths should pass them instead of calling format() themselves::
+        self._debug("CTRL -> {0} SIZE -> {1}", message_type, size)
+    A call site can also be sampled or rate limited, the number of entries skipped since the
+    last one written is attached as `suppressed`::
+        self._warning("QUEUE FULL FOR: {}", identifier, sample_every=100)
+        self._warning("QUEUE FULL FOR: {}", identifier, max_per_second=1)
     """
 
     @property
@@ -160,17 +198,44 @@ class LoggerMixin:
             self.__logger__ = structlog.get_logger(type(self).__name__)
         return self.__logger__
 
+    def _is_enabled(self, level: int) -> bool:
+        if not getattr(self, '__level_source__', None):
+            self.__level_source__ = logging.getLogger(type(self).__name__)
+        return self.__level_source__.isEnabledFor(level)
+
     def _debug(self, msg, *args, **kwargs) -> None:
-        self._logger.debug(msg, *args, level="Debug", **kwargs)
+        self._emit(logging.DEBUG, "debug", msg, args, kwargs, level="Debug")
 
     def _error(self, msg, *args, **kwargs) -> None:
-        self._logger.error(msg, *args, level="Error", **kwargs)
+        self._emit(logging.ERROR, "error", msg, args, kwargs, level="Error")
 
     def _info(self, msg, *args, **kwargs) -> None:
-        self._logger.info(msg, *args, level="Info", **kwargs)
+        self._emit(logging.INFO, "info", msg, args, kwargs, level="Info")
 
     def _warning(self, msg, *args, **kwargs) -> None:
-        self._logger.warning(msg, *args, level="Warn", **kwargs)
+        self._emit(logging.WARNING, "warning", msg, args, kwargs, level="Warn")
+
+    def _emit(self, severity: int, method: str, msg, args: Tuple, kwargs: Dict, **fields) -> None:
+        if not self._is_enabled(severity):
+            return
+        sample_every: int = kwargs.pop("sample_every", 0)
+        max_per_second: float = kwargs.pop("max_per_second", 0)
+        if sample_every or max_per_second:
+            # Two frames up is whoever called _info and friends
+            caller = sys._getframe(2)
+            key = (caller.f_code, caller.f_lineno)
+            call_site = _CALL_SITES.get(key)
+            if call_site is None:
+                call_site = _CALL_SITES.setdefault(key, CallSite(max_per_second=max_per_second))
+            if not call_site.admit(sample_every=sample_every, max_per_second=max_per_second):
+                return
+            if call_site.suppressed:
+                kwargs["suppressed"] = call_site.suppressed
+                call_site.suppressed = 0
+        if args:
+            msg = msg.format(*args)
+        kwargs.update(fields)
+        getattr(self._logger, method)(msg, **kwargs)
 
 
 class Logger(LoggerMixin):
@@ -187,15 +252,22 @@ class Logger(LoggerMixin):
         """
         if name is not None and not getattr(self, '__logger__', None):
             self.__logger__ = structlog.get_logger(name)
+            self.__level_source__ = logging.getLogger(name)
 
     def debug(self, msg, *args, **kwargs) -> None:
-        self._logger.debug(msg, *args, **kwargs)
+        self._emit(logging.DEBUG, "debug", msg, args, kwargs)
 
     def error(self, msg, *args, **kwargs) -> None:
-        self._logger.error(msg, *args, **kwargs)
+        self._emit(logging.ERROR, "error", msg, args, kwargs)
 
     def info(self, msg, *args, **kwargs) -> None:
-        self._logger.info(msg, *args, **kwargs)
+        self._emit(logging.INFO, "info", msg, args, kwargs)
 
     def warning(self, msg, *args, **kwargs) -> None:
-        self._logger.warning(msg, *args, **kwargs)
\ No newline at end of file
+        self._emit(logging.WARNING, "warning", msg, args, kwargs)
+
+    def log(self, level: int, msg, *args, **kwargs) -> None:
+        """
+        stdlib style entry point, used by the command bus logging middleware
+        """
+        self._emit(level, logging.getLevelName(level).lower(), msg, args, kwargs)
@@ -0,0 +1,141 @@
+import math
+import random
+from collections import OrderedDict
+from typing import Dict, Optional
+
+IDENTIFICATION_RATE = float(200.0)
+IDENTIFICATION_BURST = float(400.0)
+SOURCE_RATE = float(2.0)
+SOURCE_BURST = float(10.0)
+MAX_SOURCES = int(100000)
+MAX_PENDING_IDENTIFICATIONS = int(10000)
+BASE_BACKOFF = float(1.0)
+MAX_BACKOFF = float(60.0)
+
+
+class AdmissionConfiguration(object):
+    def __init__(self, content_map: Dict):
+        self.identification_rate = float(content_map.get("identification_rate", IDENTIFICATION_RATE))
+        self.identification_burst = float(content_map.get("identification_burst", IDENTIFICATION_BURST))
+        self.source_rate = float(content_map.get("source_rate", SOURCE_RATE))
+        self.source_burst = float(content_map.get("source_burst", SOURCE_BURST))
+        self.max_sources = int(content_map.get("max_sources", MAX_SOURCES))
+        self.max_pending_identifications = int(content_map.get("max_pending_identifications",
+                                                               MAX_PENDING_IDENTIFICATIONS))
+        self.base_backoff = float(content_map.get("base_backoff", BASE_BACKOFF))
+        self.max_backoff = float(content_map.get("max_backoff", MAX_BACKOFF))
+
+
+class TokenBucket(object):
+    __slots__ = ("rate", "burst", "tokens", "updated_at")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = now
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def available(self, now: float) -> bool:
+        self.refill(now=now)
+        return self.tokens >= 1
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+    def wait_time(self) -> float:
+        if self.tokens >= 1 or self.rate <= 0:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class Source(object):
+    __slots__ = ("bucket", "strikes")
+
+    def __init__(self, bucket: TokenBucket):
+        self.bucket = bucket
+        self.strikes = 0
+
+
+class AdmissionController(object):
+    """
+    Smooths identification storms after a deploy or a network blip.
+    An identification needs a token from the global bucket and from the bucket of its
+    source address, the latter kept for at most `max_sources` addresses in least recently
+    used order. New connections are turned away while `max_pending_identifications` are
+    already waiting. Every refusal comes with a retry-after that doubles for each refusal
+    of the same source in a row and is at least as long as the global rate needs to work
+    through everyone refused so far. It is drawn at random from the upper half of that
+    backoff so clients refused together come back spread out.
+    """
+
+    def __init__(self, configuration: AdmissionConfiguration, reactor, random_source: random.Random = None):
+        self.__configuration = configuration
+        self.__reactor = reactor
+        self.__random = random_source or random.Random()
+        self.__bucket = TokenBucket(rate=configuration.identification_rate,
+                                    burst=configuration.identification_burst,
+                                    now=reactor.seconds())
+        self.__sources: 'OrderedDict[str, Source]' = OrderedDict()
+        # Refused clients expected back, drains at the global rate
+        self.__backlog: float = 0.0
+        self.__backlog_updated_at: float = reactor.seconds()
+        self.__refused: int = 0
+
+    def refused(self) -> int:
+        return self.__refused
+
+    def admit_connection(self, source: str, pending: int) -> Optional[int]:
+        """
+        Returns None when the connection may wait for identification, otherwise the seconds it should back off
+        """
+        if pending < self.__configuration.max_pending_identifications:
+            return None
+        return self.__refuse(source=self.__source(address=source), wait=self.__backlog_wait())
+
+    def admit_identification(self, source: str) -> Optional[int]:
+        """
+        Returns None when the identification may go ahead, otherwise the seconds it should back off
+        """
+        now = self.__reactor.seconds()
+        entry = self.__source(address=source)
+        if not entry.bucket.available(now=now):
+            return self.__refuse(source=entry, wait=entry.bucket.wait_time())
+        if not self.__bucket.available(now=now):
+            return self.__refuse(source=entry, wait=max(self.__bucket.wait_time(), self.__backlog_wait()))
+        entry.bucket.take()
+        self.__bucket.take()
+        entry.strikes = 0
+        return None
+
+    def __source(self, address: str) -> Source:
+        entry = self.__sources.get(address)
+        if entry is None:
+            entry = Source(bucket=TokenBucket(rate=self.__configuration.source_rate,
+                                              burst=self.__configuration.source_burst,
+                                              now=self.__reactor.seconds()))
+            self.__sources[address] = entry
+            if len(self.__sources) > self.__configuration.max_sources:
+                self.__sources.popitem(last=False)
+        else:
+            self.__sources.move_to_end(address)
+        return entry
+
+    def __backlog_wait(self) -> float:
+        now = self.__reactor.seconds()
+        drained = (now - self.__backlog_updated_at) * self.__configuration.identification_rate
+        self.__backlog = max(self.__backlog - drained, 0.0) + 1
+        self.__backlog_updated_at = now
+        if self.__configuration.identification_rate <= 0:
+            return self.__configuration.max_backoff
+        return self.__backlog / self.__configuration.identification_rate
+
+    def __refuse(self, source: Source, wait: float) -> int:
+        self.__refused += 1
+        backoff = self.__configuration.base_backoff * (2 ** min(source.strikes, 32))
+        source.strikes += 1
+        backoff = min(max(backoff, wait), self.__configuration.max_backoff)
+        return max(int(math.ceil(self.__random.uniform(backoff / 2, backoff))), 1)
@@ -0,0 +1,73 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional, Tuple
+
+from app.core.security.claims import Claims
+
+CLAIMS_CACHE_SIZE = int(100000)
+
+
+class CacheStatistics(NamedTuple):
+    hits: int
+    misses: int
+    expirations: int
+    evictions: int
+    size: int
+
+
+class ClaimsCache(object):
+    """
+    Remembers the claims of tokens that were already decrypted and verified, keyed by a
+    digest of the token so the tokens themselves are not kept around.
+    Entries leave in least recently used order once `capacity` is reached and are never
+    served past the token's own expiry. Only verified claims carrying an expiry are
+    admitted, a rejected token always goes through decryption again.
+    """
+
+    def __init__(self, capacity: int = CLAIMS_CACHE_SIZE, clock: Callable[[], float] = time.time):
+        self.__capacity = capacity
+        self.__clock = clock
+        self.__entries: 'OrderedDict[bytes, Tuple[float, Claims]]' = OrderedDict()
+        self.__hits: int = 0
+        self.__misses: int = 0
+        self.__expirations: int = 0
+        self.__evictions: int = 0
+
+    @staticmethod
+    def digest(token: bytes) -> bytes:
+        return hashlib.sha256(token).digest()
+
+    def get(self, digest: bytes) -> Optional[Claims]:
+        entry = self.__entries.get(digest)
+        if entry is None:
+            self.__misses += 1
+            return None
+        expires_at, claims = entry
+        if expires_at <= self.__clock():
+            del self.__entries[digest]
+            self.__expirations += 1
+            self.__misses += 1
+            return None
+        self.__entries.move_to_end(digest)
+        self.__hits += 1
+        return claims
+
+    def put(self, digest: bytes, claims: Claims) -> None:
+        expiry = claims.expiry()
+        if self.__capacity <= 0 or expiry is None:
+            return
+        self.__entries[digest] = (expiry.timestamp(), claims)
+        self.__entries.move_to_end(digest)
+        while len(self.__entries) > self.__capacity:
+            self.__entries.popitem(last=False)
+            self.__evictions += 1
+
+    def statistics(self) -> CacheStatistics:
+        return CacheStatistics(
+            hits=self.__hits,
+            misses=self.__misses,
+            expirations=self.__expirations,
+            evictions=self.__evictions,
+            size=len(self.__entries)
+        )
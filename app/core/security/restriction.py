@@ -1,24 +1,84 @@
+import enum
 from datetime import datetime
-from typing import Tuple, Optional
+from typing import Dict, Tuple, Optional
 
 from jwcrypto import jwe, jwk
 
+from app.core.security.cache import ClaimsCache, CLAIMS_CACHE_SIZE
 from app.core.security.claims import Claims
 from app.settings import PRIVATE_RSA_KEY
 
 
+DECRYPTION_WORKERS = int(2)
+MAX_PENDING_DECRYPTIONS = int(256)
+MIN_RETRY_AFTER = int(1)
+MAX_RETRY_AFTER = int(30)
+
+
+class DecryptionExecutor(enum.Enum):
+    PROCESS = "process"
+    THREAD = "thread"
+
+
+class IdentificationConfiguration(object):
+    def __init__(self, content_map: Dict):
+        self.claims_cache_size = int(content_map.get("claims_cache_size", CLAIMS_CACHE_SIZE))
+        self.decryption_executor = DecryptionExecutor(
+            content_map.get("decryption_executor", DecryptionExecutor.PROCESS.value))
+        self.decryption_workers = int(content_map.get("decryption_workers", DECRYPTION_WORKERS))
+        self.max_pending_decryptions = int(content_map.get("max_pending_decryptions", MAX_PENDING_DECRYPTIONS))
+        self.min_retry_after = int(content_map.get("min_retry_after", MIN_RETRY_AFTER))
+        self.max_retry_after = int(content_map.get("max_retry_after", MAX_RETRY_AFTER))
+
+
 class Restrictions(object):
-    def __init__(self):
-        self.__private_key = self.read_private_key(path=PRIVATE_RSA_KEY)
+    def __init__(self, cache: Optional[ClaimsCache] = None, private_key_path: str = PRIVATE_RSA_KEY):
+        self.__private_key_path = private_key_path
+        self.__private_key = self.read_private_key(path=private_key_path)
+        self.__cache = cache
 
     def extract_token_claims(self, encrypted_token: bytearray) -> Optional[Claims]:
+        digest, claims = self.cached_claims(encrypted_token=bytes(encrypted_token))
+        if claims is not None:
+            return claims
+        payload = self.decrypt_token(private_key=self.__private_key, encrypted_token=bytes(encrypted_token))
+        return self.admit(digest=digest, payload=payload)
+
+    def admit(self, digest: Optional[bytes], payload: Optional[bytes]) -> Optional[Claims]:
+        """
+        Parses a decrypted payload and caches the claims once they verify
+        """
+        if payload is None:
+            return None
+        claims = Claims.parse(content=payload)
+        if digest is not None and self.__cache is not None and self.verify_claim(claims=claims)[0]:
+            self.__cache.put(digest=digest, claims=claims)
+        return claims
+
+    def cached_claims(self, encrypted_token: bytes) -> Tuple[Optional[bytes], Optional[Claims]]:
+        if self.__cache is None:
+            return None, None
+        digest = ClaimsCache.digest(token=encrypted_token)
+        return digest, self.__cache.get(digest=digest)
+
+    @staticmethod
+    def decrypt_token(private_key: jwk.JWK, encrypted_token: bytes) -> Optional[bytes]:
         try:
             jwe_token = jwe.JWE()
-            jwe_token.deserialize(encrypted_token.decode('utf-8'), key=self.__private_key)
-            return Claims.parse(content=jwe_token.payload)
-        except jwe.JWException as err:
+            jwe_token.deserialize(encrypted_token.decode('utf-8'), key=private_key)
+            return jwe_token.payload
+        except (jwe.JWException, UnicodeDecodeError, ValueError):
             return None
 
+    def cache(self) -> Optional[ClaimsCache]:
+        return self.__cache
+
+    def private_key(self) -> jwk.JWK:
+        return self.__private_key
+
+    def private_key_path(self) -> str:
+        return self.__private_key_path
+
     @staticmethod
     def read_private_key(path: str) -> jwk.JWK:
         with open(path, "rb") as private_key_file:
@@ -30,6 +90,8 @@ class Restrictions(object):
     def verify_claim(claims: Claims) -> Tuple[str, bool]:
         if claims is None:
             return False, "Claim was invalid"
+        if claims.expiry() is None:
+            return False, "This token does not expire"
         if claims.expiry() < datetime.now():
             return False, "This token is already expired"
         return True, ""
@@ -0,0 +1,116 @@
+import math
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from jwcrypto import jwk
+from twisted.internet import defer
+
+from app.core.logging.loggers import LoggerMixin
+from app.core.security.claims import Claims
+from app.core.security.restriction import Restrictions, IdentificationConfiguration, DecryptionExecutor
+
+# Decryptions are cheap to start and expensive to finish, weigh new samples in slowly
+LATENCY_SMOOTHING = float(0.1)
+
+__private_key__: Optional[jwk.JWK] = None
+
+
+def _load_private_key(path: str) -> None:
+    global __private_key__
+    __private_key__ = Restrictions.read_private_key(path=path)
+
+
+def _decrypt_token(encrypted_token: bytes) -> Optional[bytes]:
+    return Restrictions.decrypt_token(private_key=__private_key__, encrypted_token=encrypted_token)
+
+
+class IdentificationOverloaded(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__("too many identifications are waiting on decryption")
+        self.retry_after = retry_after
+
+
+class IdentityVerifier(LoggerMixin):
+    """
+    Resolves identity tokens to claims without blocking the reactor.
+    Cached claims are answered straight away, anything else is decrypted on a process
+    or thread pool and the result is handed back on the reactor thread. At most
+    `max_pending_decryptions` tokens wait on the pool, beyond that identification fails
+    at once with an estimate of when the backlog will have drained.
+    """
+
+    def __init__(self, configuration: IdentificationConfiguration, restrictions: Restrictions, reactor):
+        self.__configuration = configuration
+        self.__restrictions = restrictions
+        self.__reactor = reactor
+        self.__executor: Optional[Executor] = None
+        self.__pending: int = 0
+        self.__latency: float = 0.0
+        self.__rejected: int = 0
+
+    def start(self) -> None:
+        if self.__configuration.decryption_executor is DecryptionExecutor.PROCESS:
+            self.__executor = ProcessPoolExecutor(max_workers=self.__configuration.decryption_workers,
+                                                  initializer=_load_private_key,
+                                                  initargs=(self.__restrictions.private_key_path(),))
+        else:
+            _load_private_key(path=self.__restrictions.private_key_path())
+            self.__executor = ThreadPoolExecutor(max_workers=self.__configuration.decryption_workers,
+                                                 thread_name_prefix="token-decryption")
+
+    def stop(self) -> None:
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=False)
+            self.__executor = None
+
+    def pending(self) -> int:
+        return self.__pending
+
+    def rejected(self) -> int:
+        return self.__rejected
+
+    def identify(self, encrypted_token: bytes) -> defer.Deferred:
+        encrypted_token = bytes(encrypted_token)
+        digest, claims = self.__restrictions.cached_claims(encrypted_token=encrypted_token)
+        if claims is not None:
+            return defer.succeed(claims)
+        if self.__pending >= self.__configuration.max_pending_decryptions:
+            self.__rejected += 1
+            return defer.fail(IdentificationOverloaded(retry_after=self.__retry_after()))
+        deferred = defer.Deferred()
+        submitted_at = time.monotonic()
+        try:
+            future = self.__executor.submit(_decrypt_token, encrypted_token)
+        except Exception as error:
+            # A broken or stopped pool, counted as pending it would never be released
+            self._error("COULD NOT SUBMIT TOKEN FOR DECRYPTION: {0}", error, max_per_second=1)
+            return defer.fail(error)
+        self.__pending += 1
+        future.add_done_callback(lambda done: self.__reactor.callFromThread(
+            self.__on_decrypted, deferred, digest, submitted_at, done))
+        return deferred
+
+    def __on_decrypted(self, deferred: defer.Deferred, digest: Optional[bytes], submitted_at: float,
+                       future: Future) -> None:
+        self.__pending -= 1
+        self.__latency += (time.monotonic() - submitted_at - self.__latency) * LATENCY_SMOOTHING
+        error = future.exception()
+        if error is not None:
+            self._error("TOKEN DECRYPTION FAILED: {0}", error)
+            deferred.callback(None)
+            return
+        try:
+            claims: Optional[Claims] = self.__restrictions.admit(digest=digest, payload=future.result())
+            Restrictions.verify_claim(claims=claims)
+        except Exception as error:
+            # Decrypted but not readable claims, rejected like a token that does not decrypt
+            self._error("TOKEN HOLDS MALFORMED CLAIMS: {0}", error, max_per_second=1)
+            deferred.callback(None)
+            return
+        deferred.callback(claims)
+
+    def __retry_after(self) -> int:
+        # With the queue full, the time tokens currently spend in the pool is about how long it takes to drain
+        return int(min(max(math.ceil(self.__latency), self.__configuration.min_retry_after),
+                       self.__configuration.max_retry_after))
@@ -1,23 +1,34 @@
 from asyncio import AbstractEventLoop
 from threading import Thread
-from typing import Tuple
+from typing import Dict, Tuple
 
 from decouple import config
 from pymessagebus import CommandBus
 from pymessagebus.middleware.logger import get_logger_middleware
 from twisted.internet import protocol
+from twisted.internet.interfaces import IReactorTime
 
 from app.configuration import Configuration
 from app.core.database.provider import SQLProvider
 from app.core.logging.loggers import LoggerMixin, Logger
-from app.core.security.restriction import Restrictions
+from app.core.security.admission import AdmissionController, AdmissionConfiguration
+from app.core.security.cache import ClaimsCache
+from app.core.security.restriction import Restrictions, IdentificationConfiguration
+from app.core.security.verification import IdentityVerifier
+from app.domain.chat.framing import TransportConfiguration
+from app.domain.chat.messages.persistence import MessagePersistence, PersistenceConfiguration
 from app.domain.chat.messages.repository import MessageRepository
 from app.domain.chat.messages.sql_repository import SQLMessageRepository
+from app.domain.chat.participant.accounts import AccountServiceClient, AccountServiceConfiguration
 from app.domain.chat.participant.connections import ConnectionRegistry
+from app.domain.chat.participant.directory import ParticipantDirectory
 from app.domain.chat.participant.factory import get_client
+from app.domain.chat.participant.liveness import LivenessMonitor, LivenessConfiguration
 from app.domain.chat.participant.participant import ConnectedClientProtocol, ParticipantService
 from app.domain.chat.participant.repository import ParticipantRepository
+from app.domain.chat.participant.resumption import ResumptionTickets, ResumptionConfiguration
 from app.domain.chat.participant.sql_repository import SQLParticipantRepository
+from app.domain.chat.participant.transfers import TransferService, TransferConfiguration
 
 
 class ServiceFactory(protocol.ServerFactory, LoggerMixin):
@@ -26,39 +37,144 @@ class ServiceFactory(protocol.ServerFactory, LoggerMixin):
     def __init__(
             self,
             configuration: Configuration,
-            event_loop: AbstractEventLoop
+            event_loop: AbstractEventLoop,
+            reactor: IReactorTime
     ):
         self.logger = Logger(__file__)
         self.__event_loop = event_loop
+        self.__reactor = reactor
         self.__participant_repository: ParticipantRepository = None
         self.__message_repository: MessageRepository = None
         self.__configuration: Configuration = configuration
+        self.__transport_configuration = TransportConfiguration(
+            content_map=self.__configuration.transport_configuration())
         logging_middleware = get_logger_middleware(self.logger)
         self.__command_bus: CommandBus = CommandBus(middlewares=[logging_middleware])
-        self.__registry = ConnectionRegistry(command_bus=self.__command_bus, restrictions=Restrictions())
+        self.__liveness_monitor = LivenessMonitor(
+            configuration=LivenessConfiguration(content_map=self.__configuration.liveness_configuration()),
+            reactor=self.__reactor)
+        identification_configuration = IdentificationConfiguration(
+            content_map=self.__configuration.identification_configuration())
+        self.__restrictions = Restrictions(cache=ClaimsCache(capacity=identification_configuration.claims_cache_size))
+        self.__identity_verifier = IdentityVerifier(configuration=identification_configuration,
+                                                    restrictions=self.__restrictions,
+                                                    reactor=self.__reactor)
+        self.__admission_controller = AdmissionController(
+            configuration=AdmissionConfiguration(content_map=self.__configuration.admission_configuration()),
+            reactor=self.__reactor)
+        resumption_secret = self.__configuration.resumption_secret()
+        resumption_tickets = ResumptionTickets(
+            configuration=ResumptionConfiguration(content_map=self.__configuration.resumption_configuration()),
+            reactor=self.__reactor,
+            secret=resumption_secret.encode() if resumption_secret else None)
+        self.__directory = ParticipantDirectory()
+        self.__registry = ConnectionRegistry(command_bus=self.__command_bus,
+                                             identity_verifier=self.__identity_verifier,
+                                             liveness_monitor=self.__liveness_monitor,
+                                             admission_controller=self.__admission_controller,
+                                             resumption_tickets=resumption_tickets,
+                                             directory=self.__directory)
+        self.__account_client = AccountServiceClient(
+            configuration=AccountServiceConfiguration(content_map=self.__configuration.account_service_configuration()),
+            reactor=self.__reactor)
+        self.__message_persistence: MessagePersistence = None
         self.__participant_service: ParticipantService = None
+        self.__transfer_service: TransferService = None
         self.__database_provider = SQLProvider(
             uri=self.__configuration.database_uri(),
             debug=config('DEBUG', default=True, cast=bool))
 
     def buildProtocol(self, address: Tuple[str, int]):
-        return ConnectedClientProtocol(registry=self.__registry, participant_service=self.__participant_service)
+        return ConnectedClientProtocol(registry=self.__registry,
+                                       source_address=getattr(address, "host", str(address)),
+                                       participant_service=self.__participant_service,
+                                       transfer_service=self.__transfer_service,
+                                       transport_configuration=self.__transport_configuration,
+                                       reactor=self.__reactor)
+
+    def health(self) -> Dict:
+        return {
+            "connections": self.__registry.connection_count(),
+            "participants": self.__registry.participant_count(),
+            "pending": self.__registry.pending_count(),
+            "tracked": self.__liveness_monitor.tracked(),
+            "claims_cache": self.__restrictions.cache().statistics()._asdict(),
+            "pending_decryptions": self.__identity_verifier.pending(),
+            "overloaded_identifications": self.__identity_verifier.rejected(),
+            "throttled_identifications": self.__admission_controller.refused(),
+            "account_requests": self.__account_client.requests(),
+            "account_requests_in_flight": self.__account_client.in_flight(),
+            "profiles": self.__profile_statistics(),
+            "contacts": self.__contact_statistics(),
+            "receipts": self.__receipt_statistics(),
+            "watermarks": self.__watermark_statistics(),
+            "persistence": self.__persistence_statistics()
+        }
+
+    def __profile_statistics(self) -> Dict:
+        if self.__participant_service is None:
+            return {}
+        statistics = self.__participant_service.profile_statistics()
+        return dict(statistics._asdict(), hit_rate=statistics.hit_rate)
+
+    def __contact_statistics(self) -> Dict:
+        if self.__participant_service is None:
+            return {}
+        statistics = self.__participant_service.contact_statistics()
+        return dict(statistics._asdict(), hit_rate=statistics.hit_rate)
+
+    def __receipt_statistics(self) -> Dict:
+        if self.__participant_service is None:
+            return {}
+        statistics = self.__participant_service.receipt_statistics()
+        return dict(statistics._asdict(), receipts_per_frame=statistics.receipts_per_frame)
+
+    def __watermark_statistics(self) -> Dict:
+        if self.__participant_service is None:
+            return {}
+        return self.__participant_service.watermark_statistics()._asdict()
+
+    def __persistence_statistics(self) -> Dict:
+        if self.__message_persistence is None:
+            return {}
+        statistics = self.__message_persistence.statistics()
+        return dict(statistics._asdict(), messages_per_commit=statistics.messages_per_commit)
 
     def startFactory(self):
         self._logger.info("ACTIVATED SERVICE RESOURCES")
         self.__database_provider.initialize()
         self.initialize_repositories()
         self.initialize_services()
+        self.__identity_verifier.start()
+        self.__liveness_monitor.start()
 
     def stopFactory(self):
+        self.__account_client.close()
+        self.__liveness_monitor.stop()
+        self.__identity_verifier.stop()
+        if self.__message_persistence is not None:
+            self.__message_persistence.stop()
         self.__database_provider.close()
         get_client().shutdown()
 
     def initialize_services(self) -> None:
+        self.__message_persistence = MessagePersistence(
+            configuration=PersistenceConfiguration(content_map=self.__configuration.persistence_configuration()),
+            repository=self.__message_repository,
+            reactor=self.__reactor)
+        self.__message_persistence.start()
         self.__participant_service = ParticipantService(configuration=self.__configuration,
                                                         command_bus=self.__command_bus,
                                                         participant_repository=self.__participant_repository,
-                                                        message_repository=self.__message_repository)
+                                                        message_repository=self.__message_repository,
+                                                        account_client=self.__account_client,
+                                                        directory=self.__directory,
+                                                        persistence=self.__message_persistence,
+                                                        reactor=self.__reactor)
+        self.__transfer_service = TransferService(
+            configuration=TransferConfiguration(content_map=self.__configuration.transfer_configuration()),
+            command_bus=self.__command_bus,
+            participant_service=self.__participant_service)
         get_client().register_subscriber(subscriber=self.__participant_service)
 
     def initialize_repositories(self) -> None:
@@ -0,0 +1,123 @@
+from typing import Dict, List, Optional
+
+from autobahn.twisted.websocket import WebSocketServerFactory, WebSocketServerProtocol
+from autobahn.websocket.compress import PerMessageDeflateOffer, PerMessageDeflateOfferAccept
+from autobahn.websocket.types import ConnectionRequest
+from twisted.internet import protocol
+from twisted.internet.interfaces import IReactorTime, ITransport
+from twisted.python import failure
+from zope.interface import implementer
+
+from app.core.logging.loggers import LoggerMixin
+from app.domain.chat.framing import MAX_FRAME_SIZE
+from app.domain.chat.types import MESSAGE_HEADER
+
+WEBSOCKET_PORT = int(5201)
+SUBPROTOCOL = "chat-frames"
+
+
+class WebSocketConfiguration(object):
+    def __init__(self, content_map: Dict):
+        self.enabled = bool(content_map.get("enabled", False))
+        self.port = int(content_map.get("port", WEBSOCKET_PORT))
+        self.url: Optional[str] = content_map.get("url", None)
+        self.compression_enabled = bool(content_map.get("compression_enabled", False))
+        self.max_message_size = int(content_map.get("max_message_size", MAX_FRAME_SIZE + MESSAGE_HEADER))
+
+
+@implementer(ITransport)
+class WebSocketFrameTransport(object):
+    """
+    Presents a WebSocket connection to the wrapped protocol as a plain stream transport.
+    Each writeSequence call, which is one flush of coalesced frames, goes out as a single
+    binary message, so the frames keep their usual `!HL` header and clients decode a message
+    exactly like a read from the raw TCP port.
+    """
+
+    def __init__(self, connection: 'WebSocketConnection'):
+        self.__connection = connection
+
+    def write(self, data: bytes) -> None:
+        self.writeSequence([data])
+
+    def writeSequence(self, data: List[bytes]) -> None:
+        if self.__connection.state != WebSocketServerProtocol.STATE_OPEN:
+            # Closing already, like a TCP transport we quietly drop whatever comes after
+            return
+        self.__connection.sendMessage(b"".join(data), isBinary=True)
+
+    def loseConnection(self) -> None:
+        self.__connection.sendClose()
+
+    def abortConnection(self) -> None:
+        self.__connection.dropConnection(abort=True)
+
+    def registerProducer(self, producer, streaming: bool) -> None:
+        # Back pressure comes from the socket underneath, so pause the wrapped protocol on that
+        self.__connection.registerProducer(producer, streaming)
+
+    def unregisterProducer(self) -> None:
+        self.__connection.unregisterProducer()
+
+    def getPeer(self):
+        return self.__connection.transport.getPeer()
+
+    def getHost(self):
+        return self.__connection.transport.getHost()
+
+
+class WebSocketConnection(WebSocketServerProtocol, LoggerMixin):
+    def __init__(self):
+        super().__init__()
+        self.__wrapped: Optional[protocol.Protocol] = None
+
+    def onConnect(self, request: ConnectionRequest) -> Optional[str]:
+        self._info("WEBSOCKET CONNECTION FROM: {0}", request.peer)
+        if SUBPROTOCOL in request.protocols:
+            return SUBPROTOCOL
+        return None
+
+    def onOpen(self) -> None:
+        self.__wrapped = self.factory.wrapped_factory.buildProtocol(self.transport.getPeer())
+        self.__wrapped.makeConnection(WebSocketFrameTransport(connection=self))
+
+    def onMessage(self, payload: bytes, isBinary: bool) -> None:
+        if not isBinary:
+            self._warning("DROPPING WEBSOCKET CONNECTION: TEXT MESSAGES ARE NOT SUPPORTED", max_per_second=1)
+            self.sendClose(code=self.CLOSE_STATUS_CODE_UNSUPPORTED_DATA, reason="binary messages only")
+            return
+        self.__wrapped.dataReceived(payload)
+
+    def onClose(self, wasClean: bool, code: Optional[int], reason: Optional[str]) -> None:
+        if self.__wrapped is None:
+            # The opening handshake never completed
+            return
+        wrapped = self.__wrapped
+        self.__wrapped = None
+        wrapped.connectionLost(failure.Failure(ConnectionError(reason or "websocket closed")))
+
+
+class WebSocketServiceFactory(WebSocketServerFactory):
+    """
+    Serves the chat protocol to browsers and other clients that can only speak WebSocket.
+    Protocols are built by the wrapped factory, so connections share its registry and
+    services with the raw TCP listener. Per-message deflate is accepted when enabled,
+    clients negotiating the zlib capability as well would compress twice and should not.
+    """
+
+    def __init__(self, wrapped_factory: protocol.Factory, configuration: WebSocketConfiguration,
+                 reactor: IReactorTime):
+        super().__init__(url=configuration.url, protocols=[SUBPROTOCOL], reactor=reactor)
+        self.protocol = WebSocketConnection
+        self.wrapped_factory = wrapped_factory
+        self.setProtocolOptions(
+            maxMessagePayloadSize=configuration.max_message_size,
+            perMessageCompressionAccept=self.accept_compression if configuration.compression_enabled else None
+        )
+
+    @staticmethod
+    def accept_compression(offers: List) -> Optional[PerMessageDeflateOfferAccept]:
+        for offer in offers:
+            if isinstance(offer, PerMessageDeflateOffer):
+                return PerMessageDeflateOfferAccept(offer)
+        return None
@@ -0,0 +1,237 @@
+import enum
+import os
+import signal
+import socket
+from typing import Callable, Dict, List, Optional
+
+import simplejson
+from twisted.internet import protocol
+from twisted.internet.interfaces import IDelayedCall, IListeningPort
+from twisted.internet.task import LoopingCall
+from twisted.python import failure
+from twisted.web import resource, server
+
+from app.core.logging.loggers import LoggerMixin
+
+WORKER_COUNT = int(0)
+HEALTH_PORT = int(5210)
+REPORT_INTERVAL = float(5.0)
+RESTART_DELAY = float(1.0)
+MAX_RESTART_DELAY = float(30.0)
+LISTEN_BACKLOG = int(1024)
+# Workers write their health reports to this descriptor, the supervisor reads the other end
+HEALTH_DESCRIPTOR = int(3)
+
+
+class WorkerConfiguration(object):
+    def __init__(self, content_map: Dict):
+        self.count = int(content_map.get("count", WORKER_COUNT))
+        self.health_port = int(content_map.get("health_port", HEALTH_PORT))
+        self.report_interval = float(content_map.get("report_interval", REPORT_INTERVAL))
+        self.restart_delay = float(content_map.get("restart_delay", RESTART_DELAY))
+        self.max_restart_delay = float(content_map.get("max_restart_delay", MAX_RESTART_DELAY))
+
+
+class HealthStatus(enum.Enum):
+    UP = "UP"
+    DEGRADED = "DEGRADED"
+    DOWN = "DOWN"
+
+
+def listen_reusable(reactor, port: int, factory: protocol.Factory, interface: str = "") -> IListeningPort:
+    """
+    Listens with SO_REUSEPORT so every worker can bind the same port,
+    the kernel then spreads incoming connections across them.
+    """
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        listener.bind((interface, port))
+        listener.listen(LISTEN_BACKLOG)
+        listener.setblocking(False)
+        return reactor.adoptStreamPort(listener.fileno(), socket.AF_INET, factory)
+    finally:
+        # The reactor keeps a duplicate of the descriptor
+        listener.close()
+
+
+class HealthReporter(LoggerMixin):
+    """
+    Runs inside a worker and writes a JSON line describing it to the supervisor every interval.
+    Once the supervisor is gone the write fails and the worker shuts itself down.
+    """
+
+    def __init__(self, reactor, interval: float, index: int, node: str, probe: Callable[[], Dict]):
+        self.__reactor = reactor
+        self.__interval = interval
+        self.__index = index
+        self.__node = node
+        self.__probe = probe
+        self.__channel = None
+        self.__ticker: Optional[LoopingCall] = None
+
+    def start(self) -> None:
+        self.__channel = os.fdopen(HEALTH_DESCRIPTOR, "wb", buffering=0)
+        self.__ticker = LoopingCall(self.report)
+        self.__ticker.clock = self.__reactor
+        self.__ticker.start(self.__interval, now=True)
+
+    def report(self) -> None:
+        report = {"index": self.__index, "node": self.__node, "pid": os.getpid()}
+        report.update(self.__probe())
+        try:
+            self.__channel.write(simplejson.dumps(report).encode() + b"\n")
+        except OSError as error:
+            self._error("SUPERVISOR IS GONE, STOPPING WORKER {0}: {1}", self.__index, error)
+            self.__ticker.stop()
+            self.__reactor.stop()
+
+
+class WorkerProcess(protocol.ProcessProtocol):
+    def __init__(self, supervisor: 'Supervisor', index: int):
+        self.__supervisor = supervisor
+        self.__index = index
+        self.__pending = b""
+
+    def childDataReceived(self, childFD: int, data: bytes) -> None:
+        if childFD != HEALTH_DESCRIPTOR:
+            return
+        lines = (self.__pending + data).split(b"\n")
+        self.__pending = lines.pop()
+        for line in lines:
+            if line:
+                self.__supervisor.record_report(index=self.__index, report=simplejson.loads(line))
+
+    def processEnded(self, reason: failure.Failure) -> None:
+        self.__supervisor.worker_exited(index=self.__index, reason=reason)
+
+
+class Worker(object):
+    def __init__(self, index: int):
+        self.index = index
+        self.process: Optional[protocol.ProcessProtocol] = None
+        self.transport = None
+        self.started_at: float = 0
+        self.restarts: int = 0
+        self.crashes: int = 0
+        self.report: Dict = {}
+        self.reported_at: Optional[float] = None
+        self.restart: Optional[IDelayedCall] = None
+
+
+class Supervisor(LoggerMixin):
+    """
+    Starts `count` copies of the service, each in its own process and each a node of its own.
+    They all listen on the same port through SO_REUSEPORT, the supervisor holds no client
+    sockets itself. A worker that exits is started again after a delay that doubles with every
+    crash in a row, and the reports of all workers are served together on the health port.
+    """
+
+    def __init__(self, configuration: WorkerConfiguration, reactor, arguments: List[str]):
+        self.__configuration = configuration
+        self.__reactor = reactor
+        self.__arguments = arguments
+        self.__workers: Dict[int, Worker] = {index: Worker(index=index) for index in range(configuration.count)}
+        self.__stopping = False
+
+    def run(self) -> None:
+        for worker in self.__workers.values():
+            self.__spawn(worker=worker)
+        self.__reactor.listenTCP(self.__configuration.health_port, server.Site(HealthResource(probe=self.health)))
+        self.__reactor.addSystemEventTrigger("before", "shutdown", self.stop)
+        self.__reactor.run()
+
+    def stop(self) -> None:
+        self.__stopping = True
+        for worker in self.__workers.values():
+            if worker.restart is not None and worker.restart.active():
+                worker.restart.cancel()
+            if worker.transport is not None:
+                worker.transport.signalProcess(signal.SIGTERM)
+
+    def record_report(self, index: int, report: Dict) -> None:
+        worker = self.__workers[index]
+        worker.report = report
+        worker.reported_at = self.__reactor.seconds()
+
+    def worker_exited(self, index: int, reason: failure.Failure) -> None:
+        worker = self.__workers[index]
+        worker.transport = None
+        worker.report = {}
+        worker.reported_at = None
+        if self.__stopping:
+            return
+        if self.__reactor.seconds() - worker.started_at > self.__configuration.max_restart_delay:
+            # It ran long enough that this is not a crash loop
+            worker.crashes = 0
+        delay = min(self.__configuration.restart_delay * (2 ** worker.crashes), self.__configuration.max_restart_delay)
+        worker.crashes += 1
+        self._error("WORKER {0} EXITED ({1}), RESTARTING IN {2:.1f}s", index, reason.value, delay)
+        worker.restart = self.__reactor.callLater(delay, self.__restart, worker)
+
+    def health(self) -> Dict:
+        now = self.__reactor.seconds()
+        deadline = self.__configuration.report_interval * 3
+        workers = []
+        healthy = 0
+        for worker in self.__workers.values():
+            alive = worker.reported_at is not None and now - worker.reported_at <= deadline
+            healthy += int(alive)
+            entry = dict(worker.report)
+            entry.update({
+                "index": worker.index,
+                "status": HealthStatus.UP.value if alive else HealthStatus.DOWN.value,
+                "restarts": worker.restarts,
+                "uptime": now - worker.started_at if worker.transport is not None else 0,
+            })
+            workers.append(entry)
+        if healthy == len(self.__workers):
+            status = HealthStatus.UP
+        elif healthy == 0:
+            status = HealthStatus.DOWN
+        else:
+            status = HealthStatus.DEGRADED
+        return {
+            "status": status.value,
+            "connections": sum(entry.get("connections", 0) for entry in workers),
+            "pending": sum(entry.get("pending", 0) for entry in workers),
+            "workers": workers
+        }
+
+    def __restart(self, worker: Worker) -> None:
+        worker.restart = None
+        worker.restarts += 1
+        self.__spawn(worker=worker)
+
+    def __spawn(self, worker: Worker) -> None:
+        environment = dict(os.environ, WORKER_INDEX=str(worker.index))
+        worker.process = WorkerProcess(supervisor=self, index=worker.index)
+        worker.started_at = self.__reactor.seconds()
+        worker.transport = self.__reactor.spawnProcess(
+            worker.process,
+            self.__arguments[0],
+            args=self.__arguments,
+            env=environment,
+            childFDs={0: 0, 1: 1, 2: 2, HEALTH_DESCRIPTOR: "r"}
+        )
+        self._info("STARTED WORKER {0} PID: {1}", worker.index, worker.transport.pid)
+
+
+class HealthResource(resource.Resource):
+    """
+    Serves what `probe` reports, the supervisor's view of all workers or the health of a single process
+    """
+    isLeaf = True
+    # Consul treats 429 as a warning, so a partly running node is not taken out of rotation
+    STATUS_CODES = {HealthStatus.UP.value: 200, HealthStatus.DEGRADED.value: 429, HealthStatus.DOWN.value: 503}
+
+    def __init__(self, probe: Callable[[], Dict]):
+        super().__init__()
+        self.__probe = probe
+
+    def render_GET(self, request) -> bytes:
+        health = self.__probe()
+        request.setResponseCode(self.STATUS_CODES[health["status"]])
+        request.setHeader(b"Content-Type", b"application/json")
+        return simplejson.dumps(health).encode()
@@ -0,0 +1,245 @@
+import enum
+import struct
+import zlib
+from typing import Dict, List, NamedTuple, Optional
+
+from twisted.internet.defer import Deferred, succeed
+from twisted.internet.interfaces import IDelayedCall, IReactorTime, ITransport
+
+from app.domain.chat.types import MESSAGE_HEADER
+
+# Every frame on the wire is a 2 byte message type followed by a 4 byte payload length
+HEADER = struct.Struct("!HL")
+# The top bit of the message type marks a payload deflated with the connection's zlib stream
+FLAG_COMPRESSED = int(0x8000)
+MESSAGE_TYPE_MASK = int(0x7FFF)
+
+MAX_FRAME_SIZE = int(1024 * 1024)
+FLUSH_THRESHOLD = int(64 * 1024)
+MAX_QUEUED_BYTES = int(4 * 1024 * 1024)
+MAX_QUEUED_FRAMES = int(4096)
+COMPRESSION_THRESHOLD = int(256)
+COMPRESSION_LEVEL = int(6)
+
+
+class FrameSizeExceeded(ValueError):
+    pass
+
+
+class SlowConsumerPolicy(enum.Enum):
+    DROP_EPHEMERAL = "drop-ephemeral"
+    STORE_AND_FORWARD = "store-and-forward"
+    DISCONNECT = "disconnect"
+
+
+class OutboundStatistics(NamedTuple):
+    queued_bytes: int
+    queued_frames: int
+    dropped_frames: int
+    stored_frames: int
+
+
+class Frame(NamedTuple):
+    message_type: int
+    payload: memoryview
+    compressed: bool
+
+
+class TransportConfiguration(object):
+    def __init__(self, content_map: Dict):
+        self.max_frame_size = int(content_map.get("max_frame_size", MAX_FRAME_SIZE))
+        self.flush_threshold = int(content_map.get("flush_threshold", FLUSH_THRESHOLD))
+        self.max_queued_bytes = int(content_map.get("max_queued_bytes", MAX_QUEUED_BYTES))
+        self.max_queued_frames = int(content_map.get("max_queued_frames", MAX_QUEUED_FRAMES))
+        self.slow_consumer_policy = SlowConsumerPolicy(
+            content_map.get("slow_consumer_policy", SlowConsumerPolicy.DROP_EPHEMERAL.value))
+        self.compression_enabled = bool(content_map.get("compression_enabled", True))
+        self.compression_threshold = int(content_map.get("compression_threshold", COMPRESSION_THRESHOLD))
+        self.compression_level = int(content_map.get("compression_level", COMPRESSION_LEVEL))
+
+
+class FrameDecoder(object):
+    """
+    Incrementally splits a TCP byte stream into frames.
+    A single read may carry several frames or only part of one, so any trailing
+    partial frame is kept until the rest of it arrives. Payloads are handed out as
+    memoryview slices over immutable bytes, so decoding never copies a frame.
+    """
+
+    def __init__(self, max_frame_size: int = MAX_FRAME_SIZE):
+        self.__max_frame_size = max_frame_size
+        self.__pending: bytearray = bytearray()
+        self.__required: int = MESSAGE_HEADER
+
+    def buffered(self) -> int:
+        return len(self.__pending)
+
+    def feed(self, data: bytes) -> List[Frame]:
+        if self.__pending:
+            self.__pending += data
+            if len(self.__pending) < self.__required:
+                # Still waiting on the rest of a large frame, avoid re-copying what we hold
+                return []
+            data = bytes(self.__pending)
+            self.__pending = bytearray()
+        return self.__decode(view=memoryview(data))
+
+    def __decode(self, view: memoryview) -> List[Frame]:
+        frames: List[Frame] = []
+        offset = 0
+        available = len(view)
+        self.__required = MESSAGE_HEADER
+        while available - offset >= MESSAGE_HEADER:
+            message_type, size = HEADER.unpack_from(view, offset)
+            if size > self.__max_frame_size:
+                raise FrameSizeExceeded("frame of {0} bytes exceeds the limit of {1} bytes".format(
+                    size,
+                    self.__max_frame_size
+                ))
+            end = offset + MESSAGE_HEADER + size
+            if end > available:
+                self.__required = MESSAGE_HEADER + size
+                break
+            frames.append(Frame(message_type=message_type & MESSAGE_TYPE_MASK,
+                                payload=view[offset + MESSAGE_HEADER:end],
+                                compressed=bool(message_type & FLAG_COMPRESSED)))
+            offset = end
+        if offset < available:
+            self.__pending += view[offset:]
+        return frames
+
+
+class FrameWriter(object):
+    """
+    Coalesces outbound frames into a single vectored write per reactor iteration.
+    Headers and payloads are queued as separate segments so payloads are never
+    concatenated, the queue is handed to writeSequence once the current tick ends
+    or as soon as the buffered bytes reach the flush threshold.
+    While the transport has paused us the queue is held back, bounded by
+    max_queued_bytes and max_queued_frames.
+    Once compression is enabled, payloads above the threshold are deflated through
+    one zlib stream for the lifetime of the connection, so later frames reuse the
+    dictionary built up by earlier ones.
+    Anyone pacing what it queues can wait for the queue to be handed to the transport.
+    """
+
+    def __init__(self,
+                 transport: ITransport,
+                 reactor: IReactorTime,
+                 flush_threshold: int = FLUSH_THRESHOLD,
+                 max_queued_bytes: int = MAX_QUEUED_BYTES,
+                 max_queued_frames: int = MAX_QUEUED_FRAMES):
+        self.__transport = transport
+        self.__reactor = reactor
+        self.__flush_threshold = flush_threshold
+        self.__max_queued_bytes = max_queued_bytes
+        self.__max_queued_frames = max_queued_frames
+        self.__segments: List[bytes] = []
+        self.__buffered: int = 0
+        self.__frames: int = 0
+        self.__paused: bool = False
+        self.__scheduled: Optional[IDelayedCall] = None
+        self.__flush_waiters: List[Deferred] = []
+        self.__compressor = None
+        self.__compression_threshold: int = COMPRESSION_THRESHOLD
+
+    def enable_compression(self, threshold: int = COMPRESSION_THRESHOLD, level: int = COMPRESSION_LEVEL) -> None:
+        self.__compressor = zlib.compressobj(level)
+        self.__compression_threshold = threshold
+
+    def buffered(self) -> int:
+        return self.__buffered
+
+    def queued(self) -> int:
+        return self.__frames
+
+    def is_paused(self) -> bool:
+        return self.__paused
+
+    def write(self, message_type: int, payload: bytes, force: bool = False) -> bool:
+        if not isinstance(payload, bytes):
+            payload = bytes(payload)
+        size = MESSAGE_HEADER + len(payload)
+        if not force and (self.__buffered + size > self.__max_queued_bytes or
+                          self.__frames >= self.__max_queued_frames):
+            return False
+        if self.__compressor is not None and len(payload) >= self.__compression_threshold:
+            # Compress only once the frame is accepted, a frame skipped after this would break the stream
+            payload = self.__compressor.compress(payload) + self.__compressor.flush(zlib.Z_SYNC_FLUSH)
+            message_type |= FLAG_COMPRESSED
+            size = MESSAGE_HEADER + len(payload)
+        self.__segments.append(HEADER.pack(message_type, len(payload)))
+        if payload:
+            self.__segments.append(payload)
+        self.__buffered += size
+        self.__frames += 1
+        if self.__paused:
+            return True
+        if self.__buffered >= self.__flush_threshold:
+            self.flush()
+        elif self.__scheduled is None:
+            self.__scheduled = self.__reactor.callLater(0, self.flush)
+        return True
+
+    def when_flushed(self) -> Deferred:
+        """
+        Fires once every frame queued so far was written and the transport is not holding us back
+        """
+        if not self.__segments and not self.__paused:
+            return succeed(None)
+        waiter = Deferred()
+        self.__flush_waiters.append(waiter)
+        return waiter
+
+    def flush(self, force: bool = False) -> None:
+        self.__cancel_scheduled_flush()
+        if self.__paused and not force:
+            return
+        if self.__segments:
+            segments = self.__segments
+            self.__segments = []
+            self.__buffered = 0
+            self.__frames = 0
+            self.__transport.writeSequence(segments)
+        # Writing may well have paused us, the waiters are then released on resume
+        if not self.__paused:
+            self.__release_flush_waiters()
+
+    def pause(self) -> None:
+        self.__paused = True
+        self.__cancel_scheduled_flush()
+
+    def resume(self) -> None:
+        self.__paused = False
+        self.flush()
+
+    def discard(self) -> None:
+        self.__cancel_scheduled_flush()
+        self.__segments = []
+        self.__buffered = 0
+        self.__frames = 0
+        # Nothing is left to wait for
+        self.__release_flush_waiters()
+
+    def __release_flush_waiters(self) -> None:
+        waiters = self.__flush_waiters
+        self.__flush_waiters = []
+        for waiter in waiters:
+            waiter.callback(None)
+
+    def __cancel_scheduled_flush(self) -> None:
+        if self.__scheduled is not None and self.__scheduled.active():
+            self.__scheduled.cancel()
+        self.__scheduled = None
+
+
+class FrameInflater(object):
+    def __init__(self, max_frame_size: int = MAX_FRAME_SIZE):
+        self.__max_frame_size = max_frame_size
+        self.__decompressor = zlib.decompressobj()
+
+    def inflate(self, payload: memoryview) -> bytes:
+        content = self.__decompressor.decompress(payload, self.__max_frame_size)
+        if self.__decompressor.unconsumed_tail:
+            raise FrameSizeExceeded("inflated frame exceeds the limit of {0} bytes".format(self.__max_frame_size))
+        return content
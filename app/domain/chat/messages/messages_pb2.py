@@ -20,7 +20,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   syntax='proto3',
   serialized_options=None,
   create_key=_descriptor._internal_create_key,
-  serialized_pb=b'\n\x0emessages.proto\x1a\x1fgoogle/protobuf/timestamp.proto\"\xed\x01\n\rDirectMessage\x12!\n\x04type\x18\x01 \x01(\x0e\x32\x13.DirectMessage.Type\x12\x0f\n\x07\x63ontent\x18\x02 \x01(\x0c\x12\x19\n\x11sender_identifier\x18\x03 \x01(\t\x12\x19\n\x11target_identifier\x18\x04 \x01(\t\x12+\n\x07sent_at\x18\x05 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\"E\n\x04Type\x12\x08\n\x04\x46ILE\x10\x00\x12\x08\n\x04TEXT\x10\x01\x12\x08\n\x04LINK\x10\x02\x12\t\n\x05VIDEO\x10\x03\x12\t\n\x05\x41UDIO\x10\x04\x12\t\n\x05OTHER\x10\x05\"F\n\nAttachment\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0e\n\x06length\x18\x02 \x01(\x03\x12\x0b\n\x03uri\x18\x03 \x01(\t\x12\r\n\x05token\x18\x04 \x01(\t\"\xc1\x01\n\x08\x44\x65livery\x12\x0f\n\x07message\x18\x01 \x01(\t\x12\x1e\n\x05state\x18\x02 \x01(\x0e\x32\x0f.Delivery.State\x12\x0e\n\x06marker\x18\x03 \x01(\t\x12\x19\n\x11target_identifier\x18\x04 \x01(\t\x12+\n\x07sent_at\x18\x05 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\",\n\x05State\x12\r\n\tDELIVERED\x10\x00\x12\x08\n\x04READ\x10\x01\x12\n\n\x06\x46\x41ILED\x10\x02\x62\x06proto3'
+  serialized_pb=b'\n\x0emessages.proto\x1a\x1fgoogle/protobuf/timestamp.proto\"\x8f\x02\n\rDirectMessage\x12!\n\x04type\x18\x01 \x01(\x0e\x32\x13.DirectMessage.Type\x12\x0f\n\x07\x63ontent\x18\x02 \x01(\x0c\x12\x19\n\x11sender_identifier\x18\x03 \x01(\t\x12\x19\n\x11target_identifier\x18\x04 \x01(\t\x12+\n\x07sent_at\x18\x05 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x0e\n\x06marker\x18\x06 \x01(\t\x12\x10\n\x08sequence\x18\x07 \x01(\x04\"E\n\x04Type\x12\x08\n\x04\x46ILE\x10\x00\x12\x08\n\x04TEXT\x10\x01\x12\x08\n\x04LINK\x10\x02\x12\t\n\x05VIDEO\x10\x03\x12\t\n\x05\x41UDIO\x10\x04\x12\t\n\x05OTHER\x10\x05\"F\n\nAttachment\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0e\n\x06length\x18\x02 \x01(\x03\x12\x0b\n\x03uri\x18\x03 \x01(\t\x12\r\n\x05token\x18\x04 \x01(\t\"\xd3\x01\n\x08\x44\x65livery\x12\x0f\n\x07message\x18\x01 \x01(\t\x12\x1e\n\x05state\x18\x02 \x01(\x0e\x32\x0f.Delivery.State\x12\x0e\n\x06marker\x18\x03 \x01(\t\x12\x19\n\x11target_identifier\x18\x04 \x01(\t\x12+\n\x07sent_at\x18\x05 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x10\n\x08sequence\x18\x06 \x01(\x04\",\n\x05State\x12\r\n\tDELIVERED\x10\x00\x12\x08\n\x04READ\x10\x01\x12\n\n\x06\x46\x41ILED\x10\x02\".\n\rDeliveryBatch\x12\x1d\n\ndeliveries\x18\x01 \x03(\x0b\x32\t.Delivery\"\x7f\n\rReadWatermark\x12\x1f\n\x17\x63onversation_identifier\x18\x01 \x01(\t\x12\x10\n\x08sequence\x18\x02 \x01(\x04\x12\x0e\n\x06marker\x18\x03 \x01(\t\x12+\n\x07read_at\x18\x04 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\"8\n\x12ReadWatermarkBatch\x12\"\n\nwatermarks\x18\x01 \x03(\x0b\x32\x0e.ReadWatermark\"l\n\x0bUnreadCount\x12\x1f\n\x17\x63onversation_identifier\x18\x01 \x01(\t\x12\x0e\n\x06unread\x18\x02 \x01(\x04\x12\x15\n\rread_sequence\x18\x03 \x01(\x04\x12\x15\n\rlast_sequence\x18\x04 \x01(\x04\"3\n\x0cUnreadCounts\x12#\n\rconversations\x18\x01 \x03(\x0b\x32\x0c.UnreadCount\"0\n\x0fRequestEnvelope\x12\x0c\n\x04type\x18\x01 \x01(\r\x12\x0f\n\x07payload\x18\x02 \x01(\x0c\"2\n\x0cRequestBatch\x12\"\n\x08requests\x18\x01 \x03(\x0b\x32\x10.RequestEnvelope\"\xa3\x01\n\rTransferOffer\x12\x1b\n\x13transfer_identifier\x18\x01 \x01(\t\x12\x19\n\x11target_identifier\x18\x02 \x01(\t\x12!\n\x04type\x18\x03 \x01(\x0e\x32\x13.DirectMessage.Type\x12\x0c\n\x04name\x18\x04 \x01(\t\x12\x0e\n\x06length\x18\x05 \x01(\x04\x12\x19\n\x11sender_identifier\x18\x06 \x01(\t\"n\n\rTransferChunk\x12\x1b\n\x13transfer_identifier\x18\x01 \x01(\t\x12\x10\n\x08sequence\x18\x02 \x01(\r\x12\x0f\n\x07\x63ontent\x18\x03 \x01(\x0c\x12\x0c\n\x04last\x18\x04 \x01(\x08\x12\x0f\n\x07\x61\x62orted\x18\x05 \x01(\x08\"c\n\x0eTransferCredit\x12\x1b\n\x13transfer_identifier\x18\x01 \x01(\t\x12\x14\n\x0c\x61\x63knowledged\x18\x02 \x01(\r\x12\x0e\n\x06window\x18\x03 \x01(\r\x12\x0e\n\x06reason\x18\x04 \x01(\tb\x06proto3'
   ,
   dependencies=[google_dot_protobuf_dot_timestamp__pb2.DESCRIPTOR,])
 
@@ -66,8 +66,8 @@ _DIRECTMESSAGE_TYPE = _descriptor.EnumDescriptor(
   ],
   containing_type=None,
   serialized_options=None,
-  serialized_start=220,
-  serialized_end=289,
+  serialized_start=254,
+  serialized_end=323,
 )
 _sym_db.RegisterEnumDescriptor(_DIRECTMESSAGE_TYPE)
 
@@ -96,8 +96,8 @@ _DELIVERY_STATE = _descriptor.EnumDescriptor(
   ],
   containing_type=None,
   serialized_options=None,
-  serialized_start=513,
-  serialized_end=557,
+  serialized_start=565,
+  serialized_end=609,
 )
 _sym_db.RegisterEnumDescriptor(_DELIVERY_STATE)
 
@@ -145,6 +145,20 @@ _DIRECTMESSAGE = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='marker', full_name='DirectMessage.marker', index=5,
+      number=6, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='sequence', full_name='DirectMessage.sequence', index=6,
+      number=7, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
   ],
   extensions=[
   ],
@@ -159,7 +173,7 @@ _DIRECTMESSAGE = _descriptor.Descriptor(
   oneofs=[
   ],
   serialized_start=52,
-  serialized_end=289,
+  serialized_end=323,
 )
 
 
@@ -211,8 +225,8 @@ _ATTACHMENT = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=291,
-  serialized_end=361,
+  serialized_start=325,
+  serialized_end=395,
 )
 
 
@@ -259,6 +273,13 @@ _DELIVERY = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='sequence', full_name='Delivery.sequence', index=5,
+      number=6, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
   ],
   extensions=[
   ],
@@ -272,8 +293,461 @@ _DELIVERY = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=364,
-  serialized_end=557,
+  serialized_start=398,
+  serialized_end=609,
+)
+
+
+_DELIVERYBATCH = _descriptor.Descriptor(
+  name='DeliveryBatch',
+  full_name='DeliveryBatch',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='deliveries', full_name='DeliveryBatch.deliveries', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=611,
+  serialized_end=657,
+)
+
+
+_READWATERMARK = _descriptor.Descriptor(
+  name='ReadWatermark',
+  full_name='ReadWatermark',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='conversation_identifier', full_name='ReadWatermark.conversation_identifier', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='sequence', full_name='ReadWatermark.sequence', index=1,
+      number=2, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='marker', full_name='ReadWatermark.marker', index=2,
+      number=3, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='read_at', full_name='ReadWatermark.read_at', index=3,
+      number=4, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=659,
+  serialized_end=786,
+)
+
+
+_READWATERMARKBATCH = _descriptor.Descriptor(
+  name='ReadWatermarkBatch',
+  full_name='ReadWatermarkBatch',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='watermarks', full_name='ReadWatermarkBatch.watermarks', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=788,
+  serialized_end=844,
+)
+
+
+_UNREADCOUNT = _descriptor.Descriptor(
+  name='UnreadCount',
+  full_name='UnreadCount',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='conversation_identifier', full_name='UnreadCount.conversation_identifier', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='unread', full_name='UnreadCount.unread', index=1,
+      number=2, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='read_sequence', full_name='UnreadCount.read_sequence', index=2,
+      number=3, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='last_sequence', full_name='UnreadCount.last_sequence', index=3,
+      number=4, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=846,
+  serialized_end=954,
+)
+
+
+_UNREADCOUNTS = _descriptor.Descriptor(
+  name='UnreadCounts',
+  full_name='UnreadCounts',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='conversations', full_name='UnreadCounts.conversations', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=956,
+  serialized_end=1007,
+)
+
+
+_REQUESTENVELOPE = _descriptor.Descriptor(
+  name='RequestEnvelope',
+  full_name='RequestEnvelope',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='type', full_name='RequestEnvelope.type', index=0,
+      number=1, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='payload', full_name='RequestEnvelope.payload', index=1,
+      number=2, type=12, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"",
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1009,
+  serialized_end=1057,
+)
+
+
+_REQUESTBATCH = _descriptor.Descriptor(
+  name='RequestBatch',
+  full_name='RequestBatch',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='requests', full_name='RequestBatch.requests', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1059,
+  serialized_end=1109,
+)
+
+
+_TRANSFEROFFER = _descriptor.Descriptor(
+  name='TransferOffer',
+  full_name='TransferOffer',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='transfer_identifier', full_name='TransferOffer.transfer_identifier', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='target_identifier', full_name='TransferOffer.target_identifier', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='type', full_name='TransferOffer.type', index=2,
+      number=3, type=14, cpp_type=8, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='name', full_name='TransferOffer.name', index=3,
+      number=4, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='length', full_name='TransferOffer.length', index=4,
+      number=5, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='sender_identifier', full_name='TransferOffer.sender_identifier', index=5,
+      number=6, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1112,
+  serialized_end=1275,
+)
+
+
+_TRANSFERCHUNK = _descriptor.Descriptor(
+  name='TransferChunk',
+  full_name='TransferChunk',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='transfer_identifier', full_name='TransferChunk.transfer_identifier', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='sequence', full_name='TransferChunk.sequence', index=1,
+      number=2, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='content', full_name='TransferChunk.content', index=2,
+      number=3, type=12, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"",
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='last', full_name='TransferChunk.last', index=3,
+      number=4, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='aborted', full_name='TransferChunk.aborted', index=4,
+      number=5, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1277,
+  serialized_end=1387,
+)
+
+
+_TRANSFERCREDIT = _descriptor.Descriptor(
+  name='TransferCredit',
+  full_name='TransferCredit',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='transfer_identifier', full_name='TransferCredit.transfer_identifier', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='acknowledged', full_name='TransferCredit.acknowledged', index=1,
+      number=2, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='window', full_name='TransferCredit.window', index=2,
+      number=3, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='reason', full_name='TransferCredit.reason', index=3,
+      number=4, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1389,
+  serialized_end=1488,
 )
 
 _DIRECTMESSAGE.fields_by_name['type'].enum_type = _DIRECTMESSAGE_TYPE
@@ -282,9 +756,25 @@ _DIRECTMESSAGE_TYPE.containing_type = _DIRECTMESSAGE
 _DELIVERY.fields_by_name['state'].enum_type = _DELIVERY_STATE
 _DELIVERY.fields_by_name['sent_at'].message_type = google_dot_protobuf_dot_timestamp__pb2._TIMESTAMP
 _DELIVERY_STATE.containing_type = _DELIVERY
+_DELIVERYBATCH.fields_by_name['deliveries'].message_type = _DELIVERY
+_READWATERMARK.fields_by_name['read_at'].message_type = google_dot_protobuf_dot_timestamp__pb2._TIMESTAMP
+_READWATERMARKBATCH.fields_by_name['watermarks'].message_type = _READWATERMARK
+_UNREADCOUNTS.fields_by_name['conversations'].message_type = _UNREADCOUNT
+_REQUESTBATCH.fields_by_name['requests'].message_type = _REQUESTENVELOPE
+_TRANSFEROFFER.fields_by_name['type'].enum_type = _DIRECTMESSAGE_TYPE
 DESCRIPTOR.message_types_by_name['DirectMessage'] = _DIRECTMESSAGE
 DESCRIPTOR.message_types_by_name['Attachment'] = _ATTACHMENT
 DESCRIPTOR.message_types_by_name['Delivery'] = _DELIVERY
+DESCRIPTOR.message_types_by_name['DeliveryBatch'] = _DELIVERYBATCH
+DESCRIPTOR.message_types_by_name['ReadWatermark'] = _READWATERMARK
+DESCRIPTOR.message_types_by_name['ReadWatermarkBatch'] = _READWATERMARKBATCH
+DESCRIPTOR.message_types_by_name['UnreadCount'] = _UNREADCOUNT
+DESCRIPTOR.message_types_by_name['UnreadCounts'] = _UNREADCOUNTS
+DESCRIPTOR.message_types_by_name['RequestEnvelope'] = _REQUESTENVELOPE
+DESCRIPTOR.message_types_by_name['RequestBatch'] = _REQUESTBATCH
+DESCRIPTOR.message_types_by_name['TransferOffer'] = _TRANSFEROFFER
+DESCRIPTOR.message_types_by_name['TransferChunk'] = _TRANSFERCHUNK
+DESCRIPTOR.message_types_by_name['TransferCredit'] = _TRANSFERCREDIT
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
 
 DirectMessage = _reflection.GeneratedProtocolMessageType('DirectMessage', (_message.Message,), {
@@ -308,5 +798,75 @@ Delivery = _reflection.GeneratedProtocolMessageType('Delivery', (_message.Messag
   })
 _sym_db.RegisterMessage(Delivery)
 
+DeliveryBatch = _reflection.GeneratedProtocolMessageType('DeliveryBatch', (_message.Message,), {
+  'DESCRIPTOR' : _DELIVERYBATCH,
+  '__module__' : 'messages_pb2'
+  # @@protoc_insertion_point(class_scope:DeliveryBatch)
+  })
+_sym_db.RegisterMessage(DeliveryBatch)
+
+ReadWatermark = _reflection.GeneratedProtocolMessageType('ReadWatermark', (_message.Message,), {
+  'DESCRIPTOR' : _READWATERMARK,
+  '__module__' : 'messages_pb2'
+  # @@protoc_insertion_point(class_scope:ReadWatermark)
+  })
+_sym_db.RegisterMessage(ReadWatermark)
+
+ReadWatermarkBatch = _reflection.GeneratedProtocolMessageType('ReadWatermarkBatch', (_message.Message,), {
+  'DESCRIPTOR' : _READWATERMARKBATCH,
+  '__module__' : 'messages_pb2'
+  # @@protoc_insertion_point(class_scope:ReadWatermarkBatch)
+  })
+_sym_db.RegisterMessage(ReadWatermarkBatch)
+
+UnreadCount = _reflection.GeneratedProtocolMessageType('UnreadCount', (_message.Message,), {
+  'DESCRIPTOR' : _UNREADCOUNT,
+  '__module__' : 'messages_pb2'
+  # @@protoc_insertion_point(class_scope:UnreadCount)
+  })
+_sym_db.RegisterMessage(UnreadCount)
+
+UnreadCounts = _reflection.GeneratedProtocolMessageType('UnreadCounts', (_message.Message,), {
+  'DESCRIPTOR' : _UNREADCOUNTS,
+  '__module__' : 'messages_pb2'
+  # @@protoc_insertion_point(class_scope:UnreadCounts)
+  })
+_sym_db.RegisterMessage(UnreadCounts)
+
+RequestEnvelope = _reflection.GeneratedProtocolMessageType('RequestEnvelope', (_message.Message,), {
+  'DESCRIPTOR' : _REQUESTENVELOPE,
+  '__module__' : 'messages_pb2'
+  # @@protoc_insertion_point(class_scope:RequestEnvelope)
+  })
+_sym_db.RegisterMessage(RequestEnvelope)
+
+RequestBatch = _reflection.GeneratedProtocolMessageType('RequestBatch', (_message.Message,), {
+  'DESCRIPTOR' : _REQUESTBATCH,
+  '__module__' : 'messages_pb2'
+  # @@protoc_insertion_point(class_scope:RequestBatch)
+  })
+_sym_db.RegisterMessage(RequestBatch)
+
+TransferOffer = _reflection.GeneratedProtocolMessageType('TransferOffer', (_message.Message,), {
+  'DESCRIPTOR' : _TRANSFEROFFER,
+  '__module__' : 'messages_pb2'
+  # @@protoc_insertion_point(class_scope:TransferOffer)
+  })
+_sym_db.RegisterMessage(TransferOffer)
+
+TransferChunk = _reflection.GeneratedProtocolMessageType('TransferChunk', (_message.Message,), {
+  'DESCRIPTOR' : _TRANSFERCHUNK,
+  '__module__' : 'messages_pb2'
+  # @@protoc_insertion_point(class_scope:TransferChunk)
+  })
+_sym_db.RegisterMessage(TransferChunk)
+
+TransferCredit = _reflection.GeneratedProtocolMessageType('TransferCredit', (_message.Message,), {
+  'DESCRIPTOR' : _TRANSFERCREDIT,
+  '__module__' : 'messages_pb2'
+  # @@protoc_insertion_point(class_scope:TransferCredit)
+  })
+_sym_db.RegisterMessage(TransferCredit)
+
 
 # @@protoc_insertion_point(module_scope)
@@ -0,0 +1,177 @@
+import queue
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from twisted.internet import defer
+
+from app.core.logging.loggers import LoggerMixin
+from app.domain.chat.messages.repository import DirectMessageRecord, MessageRepository
+
+PERSISTENCE_QUEUE_CAPACITY = int(10000)
+PERSISTENCE_BATCH_SIZE = int(500)
+PERSISTENCE_MAX_BATCH_AGE = float(0.005)
+PERSISTENCE_STOP_TIMEOUT = float(5.0)
+# Commits are noisy, weigh new samples in slowly
+LATENCY_SMOOTHING = float(0.1)
+
+
+class PersistenceConfiguration(object):
+    def __init__(self, content_map: Dict):
+        self.queue_capacity = int(content_map.get("queue_capacity", PERSISTENCE_QUEUE_CAPACITY))
+        self.batch_size = int(content_map.get("batch_size", PERSISTENCE_BATCH_SIZE))
+        self.max_batch_age = float(content_map.get("max_batch_age", PERSISTENCE_MAX_BATCH_AGE))
+        self.stop_timeout = float(content_map.get("stop_timeout", PERSISTENCE_STOP_TIMEOUT))
+
+
+class PersistenceOverloaded(Exception):
+    def __init__(self, queued: int):
+        super().__init__("{0} messages are already waiting to be saved".format(queued))
+        self.queued = queued
+
+
+class PersistenceStatistics(NamedTuple):
+    queued: int
+    saved: int
+    failed: int
+    rejected: int
+    commits: int
+    # Seconds, smoothed over recent commits
+    commit_latency: float
+    max_commit_latency: float
+
+    @property
+    def messages_per_commit(self) -> float:
+        return self.saved / self.commits if self.commits else 0.0
+
+
+class PendingSave(NamedTuple):
+    messages: List[DirectMessageRecord]
+    deferred: defer.Deferred
+    queued_at: float
+
+
+# Tells the writer thread to finish what is queued and stop
+STOP = object()
+
+
+class MessagePersistence(LoggerMixin):
+    """
+    Saves direct messages behind the reactor. Saves wait in a queue of at most `queue_capacity`
+    messages that a dedicated thread drains, committing once a batch holds `batch_size` messages
+    or its oldest one has waited `max_batch_age` seconds. A batch that fails is retried one save
+    at a time, so a bad message only fails its own save.
+    The Deferred returned by `save` fires on the reactor thread once its messages are committed,
+    a full queue fails it at once with PersistenceOverloaded.
+    """
+
+    def __init__(self, configuration: PersistenceConfiguration, repository: MessageRepository, reactor):
+        self.__configuration = configuration
+        self.__repository = repository
+        self.__reactor = reactor
+        self.__queue: 'queue.Queue' = queue.Queue()
+        self.__writer: Optional[threading.Thread] = None
+        # Only touched on the reactor thread
+        self.__queued: int = 0
+        self.__saved: int = 0
+        self.__failed: int = 0
+        self.__rejected: int = 0
+        self.__commits: int = 0
+        self.__commit_latency: float = 0.0
+        self.__max_commit_latency: float = 0.0
+
+    def start(self) -> None:
+        self.__writer = threading.Thread(target=self.__write, name="message-persistence", daemon=True)
+        self.__writer.start()
+
+    def stop(self) -> None:
+        """
+        Saves whatever is still queued, waiting at most `stop_timeout` seconds for it
+        """
+        if self.__writer is None:
+            return
+        self.__queue.put(STOP)
+        self.__writer.join(timeout=self.__configuration.stop_timeout)
+        if self.__writer.is_alive():
+            self._error("GAVE UP ON {0} UNSAVED MESSAGES", self.__queued)
+        self.__writer = None
+
+    def has_room(self, messages: int) -> bool:
+        return self.__queued + messages <= self.__configuration.queue_capacity
+
+    def save(self, messages: List[DirectMessageRecord]) -> defer.Deferred:
+        if len(messages) == 0:
+            return defer.succeed(None)
+        if not self.has_room(messages=len(messages)):
+            self.__rejected += len(messages)
+            self._warning("PERSISTENCE QUEUE FULL, REFUSING {0} MESSAGES", len(messages), max_per_second=1)
+            return defer.fail(PersistenceOverloaded(queued=self.__queued))
+        self.__queued += len(messages)
+        deferred = defer.Deferred()
+        self.__queue.put(PendingSave(messages=messages, deferred=deferred, queued_at=time.monotonic()))
+        return deferred
+
+    def statistics(self) -> PersistenceStatistics:
+        return PersistenceStatistics(
+            queued=self.__queued,
+            saved=self.__saved,
+            failed=self.__failed,
+            rejected=self.__rejected,
+            commits=self.__commits,
+            commit_latency=self.__commit_latency,
+            max_commit_latency=self.__max_commit_latency
+        )
+
+    def __write(self) -> None:
+        stopping = False
+        while not stopping:
+            pending = self.__queue.get()
+            if pending is STOP:
+                return
+            batch: List[PendingSave] = [pending]
+            size = len(pending.messages)
+            deadline = pending.queued_at + self.__configuration.max_batch_age
+            while size < self.__configuration.batch_size:
+                try:
+                    pending = self.__queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if pending is STOP:
+                    stopping = True
+                    break
+                batch.append(pending)
+                size += len(pending.messages)
+            self.__commit(batch=batch)
+
+    def __commit(self, batch: List[PendingSave]) -> None:
+        started = time.monotonic()
+        try:
+            self.__repository.save_many(messages=[message for pending in batch for message in pending.messages])
+            outcomes: List[Tuple[PendingSave, Optional[Exception]]] = [(pending, None) for pending in batch]
+        except Exception as error:
+            if len(batch) == 1:
+                outcomes = [(batch[0], error)]
+            else:
+                outcomes = [(pending, self.__save_alone(pending=pending)) for pending in batch]
+        self.__reactor.callFromThread(self.__on_committed, outcomes, time.monotonic() - started)
+
+    def __save_alone(self, pending: PendingSave) -> Optional[Exception]:
+        try:
+            self.__repository.save_many(messages=pending.messages)
+        except Exception as error:
+            return error
+        return None
+
+    def __on_committed(self, outcomes: List[Tuple[PendingSave, Optional[Exception]]], latency: float) -> None:
+        self.__commits += 1
+        self.__commit_latency += (latency - self.__commit_latency) * LATENCY_SMOOTHING
+        self.__max_commit_latency = max(self.__max_commit_latency, latency)
+        for pending, error in outcomes:
+            self.__queued -= len(pending.messages)
+            if error is None:
+                self.__saved += len(pending.messages)
+                pending.deferred.callback(None)
+                continue
+            self.__failed += len(pending.messages)
+            self._error("FAILED TO SAVE {0} MESSAGES -> {1}", len(pending.messages), error)
+            pending.deferred.errback(error)
@@ -1,6 +1,24 @@
 import abc
 from datetime import datetime
-from typing import List
+from typing import List, NamedTuple, Optional, Tuple
+
+
+class DirectMessageRecord(NamedTuple):
+    sender: str
+    target: str
+    payload: bytes
+    received_at: datetime
+    node: str
+    marker: str
+
+
+class ConversationRecord(NamedTuple):
+    # Participant identifier of the reader and routing identifier of the other participant
+    reader: str
+    conversation: str
+    last_sequence: int
+    read_sequence: int
+    read_marker: Optional[str]
 
 
 class MessageRepository(abc.ABC):
@@ -9,6 +27,37 @@ class MessageRepository(abc.ABC):
     def save(self, sender: str, target: str, payload: bytearray, received_at: datetime, node: str, marker: str) -> None:
         pass
 
+    @abc.abstractmethod
+    def save_many(self, messages: List[DirectMessageRecord]) -> None:
+        pass
+
+    @abc.abstractmethod
+    def ingest(self, messages: List[DirectMessageRecord]) -> None:
+        """
+        Stores a backlog of messages in one transaction the fastest way the database allows
+        """
+        pass
+
+    @abc.abstractmethod
+    def store_undelivered(self, participant_identifier: str, response_type: int, payload: bytes,
+                          stored_at: datetime) -> None:
+        pass
+
+    @abc.abstractmethod
+    def drain_undelivered(self, participant_identifier: str) -> List[Tuple[int, bytes]]:
+        pass
+
+    @abc.abstractmethod
+    def fetch_conversations(self, reader: str) -> List[ConversationRecord]:
+        pass
+
+    @abc.abstractmethod
+    def save_conversations(self, conversations: List[ConversationRecord]) -> None:
+        """
+        Stores a single row per reader and conversation, neither sequence ever moves back
+        """
+        pass
+
     @abc.abstractmethod
     def fetch_for_group(self, group_identifier: str, limit: int, offset: int) -> List:
         pass
@@ -1,31 +1,198 @@
+import csv
+import io
 from datetime import datetime
-from typing import List
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from app.core.database.connection import DataSource
-from app.domain.chat.messages.repository import MessageRepository
+from app.domain.chat.messages.repository import MessageRepository, DirectMessageRecord, ConversationRecord
+
+MESSAGE_RECEIVED: str = "RECEIVED"
+# Column of identity_tb holding the participant identifier, the schemas of each dialect name it differently
+IDENTITY_COLUMNS: Dict[str, str] = {"sqlite": "participant_identity", "postgresql": "participant_identifier"}
+# Keeps every statement well below the bound parameter limits of sqlite and postgres
+ROWS_PER_INSERT: int = 100
+
+INSERT_DIRECT_MESSAGE_COLUMNS: str = "INSERT INTO direct_message_tb" \
+                                     "(sender_id,target_id,message,received_at,node,marker,status) "
+INSERT_DIRECT_MESSAGES: str = INSERT_DIRECT_MESSAGE_COLUMNS + "VALUES "
+DIRECT_MESSAGE_ROW: str = "(" \
+                          "(SELECT id FROM identity_tb WHERE {identity}=:sender_{index})," \
+                          "(SELECT id FROM identity_tb WHERE {identity}=:target_{index})," \
+                          ":payload_{index}," \
+                          ":received_at_{index}," \
+                          ":node_{index}," \
+                          ":marker_{index}," \
+                          ":status)"
+INSERT_DIRECT_MESSAGE: str = INSERT_DIRECT_MESSAGES + "(" \
+                             "(SELECT id FROM identity_tb WHERE {identity}=:sender)," \
+                             "(SELECT id FROM identity_tb WHERE {identity}=:target)," \
+                             ":payload,:received_at,:node,:marker,:status)"
+# Batches at least this large go through COPY on postgres, below it the round trips COPY adds cost more
+COPY_THRESHOLD: int = 500
+# Rows turned into CSV each time COPY asks for more
+COPY_ROWS_PER_READ: int = 1000
+# Lives as long as the connection, its rows as long as the transaction
+CREATE_STAGED_DIRECT_MESSAGES: str = "CREATE TEMPORARY TABLE IF NOT EXISTS direct_message_staging_tb" \
+                                     "(sender UUID,target UUID,message BYTEA,received_at TIMESTAMP," \
+                                     "node VARCHAR,marker UUID) ON COMMIT DELETE ROWS"
+COPY_DIRECT_MESSAGES: str = "COPY direct_message_staging_tb(sender,target,message,received_at,node,marker) " \
+                            "FROM STDIN WITH (FORMAT csv)"
+INSERT_STAGED_DIRECT_MESSAGES: str = INSERT_DIRECT_MESSAGE_COLUMNS + \
+                                     "SELECT " \
+                                     "(SELECT id FROM identity_tb WHERE {identity}=staged.sender)," \
+                                     "(SELECT id FROM identity_tb WHERE {identity}=staged.target)," \
+                                     "staged.message,staged.received_at,staged.node,staged.marker,:status " \
+                                     "FROM direct_message_staging_tb staged"
+UPSERT_CONVERSATION: str = "INSERT INTO conversation_tb" \
+                           "(reader_identifier,conversation_identifier,last_sequence,read_sequence,read_marker) " \
+                           "VALUES(:reader,:conversation,:last_sequence,:read_sequence,:read_marker) " \
+                           "ON CONFLICT(reader_identifier,conversation_identifier) DO UPDATE SET " \
+                           "last_sequence=CASE WHEN excluded.last_sequence > conversation_tb.last_sequence " \
+                           "THEN excluded.last_sequence ELSE conversation_tb.last_sequence END," \
+                           "read_sequence=CASE WHEN excluded.read_sequence > conversation_tb.read_sequence " \
+                           "THEN excluded.read_sequence ELSE conversation_tb.read_sequence END," \
+                           "read_marker=CASE WHEN excluded.read_sequence > conversation_tb.read_sequence " \
+                           "THEN excluded.read_marker ELSE conversation_tb.read_marker END," \
+                           "updated_at=CURRENT_TIMESTAMP"
+
+
+class CopyStream(object):
+    """
+    Hands direct messages to COPY as CSV a few rows at a time, the whole batch is never held as text.
+    """
+
+    def __init__(self, messages: List[DirectMessageRecord]):
+        self.__rows: Iterator[Tuple] = ((message.sender,
+                                         message.target,
+                                         "\\x" + bytes(message.payload).hex(),
+                                         message.received_at.isoformat(sep=" "),
+                                         message.node,
+                                         message.marker) for message in messages)
+        self.__buffer = io.StringIO()
+        self.__writer = csv.writer(self.__buffer, lineterminator="\n")
+        self.__pending: str = ""
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self.__pending) < size:
+            rows = list(islice(self.__rows, COPY_ROWS_PER_READ))
+            if len(rows) == 0:
+                break
+            self.__buffer.seek(0)
+            self.__buffer.truncate()
+            self.__writer.writerows(rows)
+            self.__pending += self.__buffer.getvalue()
+        if size < 0:
+            size = len(self.__pending)
+        chunk, self.__pending = self.__pending[:size], self.__pending[size:]
+        return chunk
 
 
 class SQLMessageRepository(MessageRepository):
     def __init__(self, data_source: DataSource):
         self.__data_source = data_source
+        self.__dialect: Optional[str] = None
 
     def save(self, sender: str, target: str, payload: bytearray, received_at: datetime, node: str, marker: str) -> None:
-        sql: str = "INSERT INTO direct_message_tb(sender_id,target_id,message,received_at, node, marker) " \
-                   "VALUES(" \
-                   "SELECT id FROM identity_tb WHERE routing_identity=:sender_identifier," \
-                   "SELECT id FROM identity_tb WHERE routing_identity=:target_identifier," \
-                   ":payload," \
-                   ":received_at," \
-                   ":node," \
-                   ":marker)"
+        self.save_many(messages=[DirectMessageRecord(
+            sender=sender,
+            target=target,
+            payload=payload,
+            received_at=received_at,
+            node=node,
+            marker=marker
+        )])
+
+    def save_many(self, messages: List[DirectMessageRecord]) -> None:
+        if len(messages) == 0:
+            return
+        if len(messages) >= COPY_THRESHOLD and self.__copies():
+            self.ingest(messages=messages)
+            return
+        identity = self.__identity()
+        with self.__data_source.session as session:
+            for start in range(0, len(messages), ROWS_PER_INSERT):
+                rows: List[str] = []
+                params: Dict = {'status': MESSAGE_RECEIVED}
+                for index, message in enumerate(messages[start:start + ROWS_PER_INSERT]):
+                    rows.append(DIRECT_MESSAGE_ROW.format(identity=identity, index=index))
+                    params['sender_{}'.format(index)] = message.sender
+                    params['target_{}'.format(index)] = message.target
+                    params['payload_{}'.format(index)] = message.payload
+                    params['received_at_{}'.format(index)] = message.received_at
+                    params['node_{}'.format(index)] = message.node
+                    params['marker_{}'.format(index)] = message.marker
+                session.execute(statement=INSERT_DIRECT_MESSAGES + ",".join(rows), params=params)
+
+    def ingest(self, messages: List[DirectMessageRecord]) -> None:
+        """
+        Streams the messages through COPY into a staging table on postgres and moves them over with a
+        single INSERT ... SELECT, other databases get an executemany of a single row INSERT.
+        """
+        if len(messages) == 0:
+            return
+        with self.__data_source.session as session:
+            if not self.__copies():
+                session.execute(statement=INSERT_DIRECT_MESSAGE.format(identity=self.__identity()),
+                                params=[{'sender': message.sender,
+                                         'target': message.target,
+                                         'payload': message.payload,
+                                         'received_at': message.received_at,
+                                         'node': message.node,
+                                         'marker': message.marker,
+                                         'status': MESSAGE_RECEIVED} for message in messages])
+                return
+            session.execute(statement=CREATE_STAGED_DIRECT_MESSAGES)
+            cursor = session.connection().connection.cursor()
+            try:
+                cursor.copy_expert(COPY_DIRECT_MESSAGES, CopyStream(messages=messages))
+            finally:
+                cursor.close()
+            session.execute(statement=INSERT_STAGED_DIRECT_MESSAGES.format(identity=self.__identity()),
+                            params={'status': MESSAGE_RECEIVED})
+
+    def store_undelivered(self, participant_identifier: str, response_type: int, payload: bytes,
+                          stored_at: datetime) -> None:
+        sql: str = "INSERT INTO undelivered_frame_tb(participant_identifier, response_type, payload, stored_at) " \
+                   "VALUES(:participant_identifier, :response_type, :payload, :stored_at)"
         with self.__data_source.session as session:
             session.execute(statement=sql,
-                            params={'sender_identifier': sender,
-                                    'target_identifier': target,
+                            params={'participant_identifier': participant_identifier,
+                                    'response_type': response_type,
                                     'payload': payload,
-                                    'received_at': received_at,
-                                    'node': node,
-                                    'marker': marker})
+                                    'stored_at': stored_at})
+
+    def drain_undelivered(self, participant_identifier: str) -> List[Tuple[int, bytes]]:
+        query: str = "SELECT id, response_type, payload FROM undelivered_frame_tb " \
+                     "WHERE participant_identifier=:participant_identifier ORDER BY id"
+        with self.__data_source.session as session:
+            rows = session.execute(statement=query,
+                                   params={'participant_identifier': participant_identifier}).fetchall()
+            if len(rows) == 0:
+                return []
+            session.execute(statement="DELETE FROM undelivered_frame_tb "
+                                      "WHERE participant_identifier=:participant_identifier AND id <= :last_id",
+                            params={'participant_identifier': participant_identifier,
+                                    'last_id': rows[-1]['id']})
+        return [(row['response_type'], bytes(row['payload'])) for row in rows]
+
+    def fetch_conversations(self, reader: str) -> List[ConversationRecord]:
+        query: str = "SELECT conversation_identifier, last_sequence, read_sequence, read_marker " \
+                     "FROM conversation_tb WHERE reader_identifier=:reader"
+        with self.__data_source.session as session:
+            rows = session.execute(statement=query, params={'reader': reader}).fetchall()
+        return [ConversationRecord(reader=reader,
+                                   conversation=row['conversation_identifier'],
+                                   last_sequence=row['last_sequence'],
+                                   read_sequence=row['read_sequence'],
+                                   read_marker=row['read_marker']) for row in rows]
+
+    def save_conversations(self, conversations: List[ConversationRecord]) -> None:
+        if len(conversations) == 0:
+            return
+        with self.__data_source.session as session:
+            session.execute(statement=UPSERT_CONVERSATION,
+                            params=[conversation._asdict() for conversation in conversations])
 
     def fetch_for_group(self, group_identifier: str, limit: int, offset: int) -> List:
         pass
@@ -35,3 +202,15 @@ class SQLMessageRepository(MessageRepository):
 
     def remove_for_participant(self, participant_identifier: str, message_identifier: str) -> None:
         pass
+
+    def __copies(self) -> bool:
+        return self.__dialect_name() == "postgresql"
+
+    def __identity(self) -> str:
+        return IDENTITY_COLUMNS[self.__dialect_name()]
+
+    def __dialect_name(self) -> str:
+        if self.__dialect is None:
+            with self.__data_source.session as session:
+                self.__dialect = session.get_bind().dialect.name
+        return self.__dialect
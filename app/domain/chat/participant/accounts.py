@@ -0,0 +1,165 @@
+from io import BytesIO
+from typing import Dict, List, Optional, Union
+
+import simplejson
+from twisted.internet import defer
+from twisted.internet.interfaces import IDelayedCall
+from twisted.python import failure
+from twisted.web.client import Agent, FileBodyProducer, HTTPConnectionPool, readBody
+from twisted.web.http_headers import Headers
+from twisted.web.iweb import IResponse
+
+from app.core.logging.loggers import LoggerMixin
+
+REQUEST_TIMEOUT = float(2.0)
+MAX_CONNECTIONS = int(8)
+IDLE_TIMEOUT = float(60.0)
+BULK_LOOKUPS = bool(True)
+BATCH_WINDOW = float(0.005)
+MAX_BATCH_SIZE = int(200)
+DETAILS_PATH = "/api/v1/account-service/users/details"
+BULK_DETAILS_PATH = "/api/v1/account-service/users/details/bulk"
+
+
+class AccountServiceConfiguration(object):
+    def __init__(self, content_map: Dict):
+        self.url = str(content_map["url"]).rstrip("/")
+        self.request_timeout = float(content_map.get("request_timeout", REQUEST_TIMEOUT))
+        self.max_connections = int(content_map.get("max_connections", MAX_CONNECTIONS))
+        self.idle_timeout = float(content_map.get("idle_timeout", IDLE_TIMEOUT))
+        self.bulk_lookups = bool(content_map.get("bulk_lookups", BULK_LOOKUPS))
+        self.batch_window = float(content_map.get("batch_window", BATCH_WINDOW))
+        self.max_batch_size = int(content_map.get("max_batch_size", MAX_BATCH_SIZE))
+
+
+class AccountServiceUnavailable(Exception):
+    pass
+
+
+class AccountServiceClient(LoggerMixin):
+    """
+    Looks up account details without blocking the reactor.
+    Requests go over a pool of at most `max_connections` keep-alive connections to the
+    account service and are abandoned after `request_timeout`. Lookups for an identifier
+    that is already being fetched wait on that request instead of sending another.
+    With `bulk_lookups` new identifiers are collected for up to `batch_window` seconds or
+    `max_batch_size` identifiers and fetched together in one request to the bulk endpoint.
+    The returned Deferreds fire with the details, None for an account that does not exist,
+    or fail when the account service could not answer.
+    """
+
+    def __init__(self, configuration: AccountServiceConfiguration, reactor):
+        self.__configuration = configuration
+        self.__reactor = reactor
+        self.__pool = HTTPConnectionPool(reactor=reactor, persistent=True)
+        self.__pool.maxPersistentPerHost = configuration.max_connections
+        self.__pool.cachedConnectionTimeout = configuration.idle_timeout
+        self.__agent = Agent(reactor=reactor, pool=self.__pool)
+        self.__in_flight: Dict[str, List[defer.Deferred]] = {}
+        self.__batch: List[str] = []
+        self.__batch_call: Optional[IDelayedCall] = None
+        self.__requests: int = 0
+
+    def requests(self) -> int:
+        return self.__requests
+
+    def in_flight(self) -> int:
+        return len(self.__in_flight)
+
+    def fetch_details(self, identifier: str) -> defer.Deferred:
+        deferred = defer.Deferred()
+        waiting = self.__in_flight.get(identifier)
+        if waiting is not None:
+            waiting.append(deferred)
+            return deferred
+        self.__in_flight[identifier] = [deferred]
+        if self.__configuration.bulk_lookups:
+            self.__add_to_batch(identifier=identifier)
+            return deferred
+        self.__requests += 1
+        url = "{0}{1}/{2}".format(self.__configuration.url, DETAILS_PATH, identifier)
+        request = self.__agent.request(b"GET", url.encode("utf-8"), Headers({b"Accept": [b"application/json"]}))
+        request.addCallback(self.__on_response, identifier=identifier)
+        request.addTimeout(self.__configuration.request_timeout, self.__reactor)
+        request.addCallbacks(self.__settle, self.__on_failure,
+                             callbackKeywords={"identifier": identifier},
+                             errbackKeywords={"identifier": identifier})
+        return deferred
+
+    def close(self) -> defer.Deferred:
+        if self.__batch_call is not None and self.__batch_call.active():
+            self.__batch_call.cancel()
+        self.__batch_call = None
+        return self.__pool.closeCachedConnections()
+
+    def __add_to_batch(self, identifier: str) -> None:
+        self.__batch.append(identifier)
+        if len(self.__batch) >= self.__configuration.max_batch_size:
+            self.__flush_batch()
+        elif self.__batch_call is None:
+            self.__batch_call = self.__reactor.callLater(self.__configuration.batch_window, self.__flush_batch)
+
+    def __flush_batch(self) -> None:
+        if self.__batch_call is not None and self.__batch_call.active():
+            self.__batch_call.cancel()
+        self.__batch_call = None
+        identifiers = self.__batch
+        self.__batch = []
+        if not identifiers:
+            return
+        self.__requests += 1
+        url = "{0}{1}".format(self.__configuration.url, BULK_DETAILS_PATH)
+        body = FileBodyProducer(BytesIO(simplejson.dumps({"identifiers": identifiers}).encode("utf-8")))
+        request = self.__agent.request(b"POST", url.encode("utf-8"),
+                                       Headers({b"Accept": [b"application/json"],
+                                                b"Content-Type": [b"application/json"]}),
+                                       body)
+        request.addCallback(self.__on_bulk_response)
+        request.addTimeout(self.__configuration.request_timeout, self.__reactor)
+        request.addCallbacks(self.__settle_batch, self.__on_batch_failure,
+                             callbackKeywords={"identifiers": identifiers},
+                             errbackKeywords={"identifiers": identifiers})
+
+    def __on_bulk_response(self, response: IResponse) -> defer.Deferred:
+        body = readBody(response)
+        if response.code == 200:
+            body.addCallback(simplejson.loads)
+        else:
+            body.addCallback(self.__on_rejected, code=response.code)
+        return body
+
+    def __settle_batch(self, content_map: Dict, identifiers: List[str]) -> None:
+        found: Dict[str, Dict] = {details["identifier"]: details for details in content_map.get("users", [])}
+        for identifier in identifiers:
+            # Left out of the answer means there is no such account
+            self.__settle(details=found.get(identifier), identifier=identifier)
+
+    def __on_batch_failure(self, reason: failure.Failure, identifiers: List[str]) -> None:
+        self._error("FAILED TO FETCH {0} USERS -> {1}", len(identifiers), reason.getErrorMessage())
+        for identifier in identifiers:
+            self.__settle(details=reason, identifier=identifier)
+
+    def __on_response(self, response: IResponse, identifier: str) -> defer.Deferred:
+        body = readBody(response)
+        if response.code == 200:
+            body.addCallback(simplejson.loads)
+        elif response.code == 404:
+            body.addCallback(self.__on_unknown, identifier=identifier)
+        else:
+            body.addCallback(self.__on_rejected, code=response.code)
+        return body
+
+    def __on_unknown(self, body: bytes, identifier: str) -> None:
+        self._info("NO ACCOUNT FOR: {}", identifier)
+        return None
+
+    def __on_rejected(self, body: bytes, code: int) -> None:
+        raise AccountServiceUnavailable("{0} {1}".format(code, body))
+
+    def __on_failure(self, reason: failure.Failure, identifier: str) -> None:
+        self._error("FAILED TO FETCH USER: {0} -> {1}", identifier, reason.getErrorMessage())
+        self.__settle(details=reason, identifier=identifier)
+
+    def __settle(self, details: Union[Optional[Dict], failure.Failure], identifier: str) -> None:
+        for deferred in self.__in_flight.pop(identifier, []):
+            deferred.callback(details)
@@ -180,11 +180,12 @@ class NATSParticipantClient(ParticipantClient, LoggerMixin, SingletonMixin):
 
     async def __register_all_subscriptions(self):
         for subject, method in self.subscription_methods.items():
+            # Bind the handler now, the loop variable would leave every subscription calling the last one
             await self.__client.subscribe(
                 subject=subject,
-                cb=lambda msg: method(
-                    self=self.subscribers[self.subscription_classes[method]],
-                    event=self.parse_information(subject=msg.subject, content=msg.data))
+                cb=lambda msg, handler=method, on_subject=subject: handler(
+                    self=self.subscribers[self.subscription_classes[handler]],
+                    event=self.parse_information(subject=on_subject, content=msg.data))
             )
         await self.test_subscription()
 
@@ -14,3 +14,8 @@ class MessageDispatchCommand(NamedTuple):
     participant_identifier: str
     payload: bytearray
     response_type: ResponseType
+
+
+class ParticipantArrivedCommand(NamedTuple):
+    participant_identifier: str
+    routing_identifier: str
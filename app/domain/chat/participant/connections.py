@@ -1,16 +1,25 @@
 import abc
+import sys
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, Optional, List, Set, Union
 import simplejson
 from google.protobuf.timestamp_pb2 import Timestamp
 from pymessagebus import CommandBus
+from twisted.internet.defer import Deferred, succeed
 from twisted.internet.protocol import Protocol
+from twisted.python import failure
 
 from app.core.logging.loggers import LoggerMixin
+from app.core.security.admission import AdmissionController
 from app.core.security.claims import Claims
 from app.core.security.restriction import Restrictions
-from app.domain.chat.participant.commands import DeviceBroadcastCommand, MessageDispatchCommand
-from app.domain.chat.participant.identification_pb2 import Identification, Device, RoutingIdentity
+from app.core.security.verification import IdentityVerifier, IdentificationOverloaded
+from app.domain.chat.participant.commands import DeviceBroadcastCommand, MessageDispatchCommand, \
+    ParticipantArrivedCommand
+from app.domain.chat.participant.directory import ParticipantDirectory
+from app.domain.chat.participant.identification_pb2 import Identification, Device, RoutingIdentity, Resumption
+from app.domain.chat.participant.liveness import LivenessMonitor
+from app.domain.chat.participant.resumption import ResumptionTickets
 from app.domain.chat.participant.responses_pb2 import Info, Failure
 from app.domain.chat.types import ResponseType
 
@@ -82,6 +91,11 @@ class ClientConnection(abc.ABC, Protocol):
     def resolve_participant(self, identifier: str, device_information: DeviceDetails) -> None:
         pass
 
+    @abc.abstractmethod
+    def load_profile(self, participant_identifier: str) -> Deferred:
+        # Fires with whether the account details of the participant could be loaded
+        pass
+
     @abc.abstractmethod
     def participant_identifier(self) -> Optional[str]:
         pass
@@ -90,38 +104,46 @@ class ClientConnection(abc.ABC, Protocol):
     def routing_identity(self) -> Optional[str]:
         pass
 
+    @abc.abstractmethod
+    def supported_capabilities(self) -> List[int]:
+        pass
 
-class DeviceCollective(object):
-    def __init__(self, participant_identifier: str):
-        self.__participant_identifier = participant_identifier
-        self.__connections: Dict[ClientConnection] = {}
+    @abc.abstractmethod
+    def enable_capabilities(self, capabilities: List[int]) -> None:
+        pass
 
-    def add_connection(self, connection: ClientConnection, device_information: DeviceDetails) -> bool:
-        self.__connections[connection.unique_identifier()] = connection
-        connection.resolve_participant(identifier=self.__participant_identifier, device_information=device_information)
+    @abc.abstractmethod
+    def source_address(self) -> str:
+        pass
 
-    def remove_connection(self, connection: ClientConnection) -> bool:
-        if connection.unique_identifier() in self.__connections:
-            del self.__connections[connection.unique_identifier()]
-            return True
-        return False
+    @abc.abstractmethod
+    def disconnect(self, error: str, details: str, retry_after: int = 0) -> None:
+        # Tell the client why and close once the notice is written
+        pass
 
-    def send_to_other_devices(self, unique_identifier: str, response_type: ResponseType, payload: bytearray) -> bool:
-        [connection.send_message(response_type=response_type, payload=payload)
-         for identifier, connection in self.__connections if identifier is not unique_identifier]
-        return True
+    @abc.abstractmethod
+    def abort(self) -> None:
+        # Close without waiting on anything still queued for the client
+        pass
 
-    def relay_to_devices(self, response_type: ResponseType, payload: bytearray) -> bool:
-        [connection.send_message(response_type=response_type, payload=payload)
-         for identifier, connection in self.__connections]
-        return True
+    @abc.abstractmethod
+    def when_flushed(self) -> Deferred:
+        # Fires once everything queued for the client so far was handed to the transport
+        pass
 
 
 class ConnectionRegistry(LoggerMixin):
-    def __init__(self, command_bus: CommandBus, restrictions: Restrictions):
-        self.__connections: Dict[DeviceCollective] = {}
+    def __init__(self, command_bus: CommandBus, identity_verifier: IdentityVerifier,
+                 liveness_monitor: LivenessMonitor, admission_controller: AdmissionController,
+                 resumption_tickets: ResumptionTickets, directory: ParticipantDirectory):
+        self.__command_bus: CommandBus = command_bus
+        self.__directory: ParticipantDirectory = directory
         self.__pending_registration: Dict[ClientConnection] = {}
-        self.__restrictions: Restrictions = restrictions
+        self.__identifying: Set[str] = set()
+        self.__identity_verifier: IdentityVerifier = identity_verifier
+        self.__liveness_monitor: LivenessMonitor = liveness_monitor
+        self.__admission_controller: AdmissionController = admission_controller
+        self.__resumption_tickets: ResumptionTickets = resumption_tickets
         command_bus.add_handler(DeviceBroadcastCommand, self.__handle_device_broadcast)
         command_bus.add_handler(MessageDispatchCommand, self.__handle_message_delivery)
 
@@ -132,36 +154,174 @@ class ConnectionRegistry(LoggerMixin):
         current_time.FromDatetime(utc_now)
         return current_time
 
-    def register(self, payload: bytearray, connection: ClientConnection) -> None:
+    def register(self, payload: bytearray, connection: ClientConnection) -> Deferred:
+        """
+        Identifies a pending connection, the returned Deferred fires with whether it was accepted.
+        The connection stays pending until its token has been decrypted off the reactor thread.
+        """
         identification: Identification = Identification()
         identification.ParseFromString(payload)
-        device_information = parse_from_device_proto(device=identification.device)
-        claims: Claims = self.__restrictions.extract_token_claims(encrypted_token=identification.token)
+        if connection.unique_identifier() in self.__identifying:
+            self._warning("IDENTIFICATION ALREADY IN PROGRESS FOR: {}", connection.unique_identifier(),
+                          max_per_second=1)
+            return succeed(False)
+        retry_after = self.__admission_controller.admit_identification(source=connection.source_address())
+        if retry_after is not None:
+            self._warning("IDENTIFICATION THROTTLED FOR: {0} FROM {1}", connection.unique_identifier(),
+                          connection.source_address(), max_per_second=1)
+            self.__reject(connection=connection, error="IDENTITY-THROTTLED",
+                          details="Too many identifications, try again later", retry_after=retry_after)
+            return succeed(False)
+        self.__identifying.add(connection.unique_identifier())
+        deferred = self.__identity_verifier.identify(encrypted_token=identification.token)
+        deferred.addCallbacks(self.__on_identified, self.__on_identification_failed,
+                              callbackKeywords={"identification": identification, "connection": connection},
+                              errbackKeywords={"connection": connection})
+        deferred.addErrback(self.__on_registration_error, connection=connection)
+        return deferred
+
+    def __on_identified(self, claims: Optional[Claims], identification: Identification,
+                        connection: ClientConnection) -> Union[bool, Deferred]:
+        if connection.unique_identifier() not in self.__pending_registration:
+            # Gone while its token was being decrypted
+            self.__identifying.discard(connection.unique_identifier())
+            return False
         is_valid, error_message = Restrictions.verify_claim(claims=claims)
 
         if not is_valid:
+            self.__identifying.discard(connection.unique_identifier())
             self._info("CONNECTION WAS REJECTED")
-            failure = Failure(
-                error="IDENTITY-REJECTED",
-                details=error_message,
-                occurred_at=self.current_timestamp()
-            )
-            self._info("SENDING FAILURE MESSAGE")
-            connection.send_message(response_type=ResponseType.IDENTITY_REJECTION, payload=failure.SerializeToString())
-            self._logger.error("IDENTIFICATION REJECTED FOR: {}".format(connection.unique_identifier()))
-        self.__add_connection(claims=claims, connection=connection, device_information=device_information)
-
+            self.__reject(connection=connection, error="IDENTITY-REJECTED", details=error_message, retry_after=0)
+            self._error("IDENTIFICATION REJECTED FOR: {}", connection.unique_identifier())
+            # Left pending, the liveness monitor evicts it if no valid identification follows
+            return False
+        return self.__accept(participant_identifier=claims.id(),
+                             device=identification.device,
+                             requested_capabilities=identification.capabilities,
+                             not_after=claims.expiry().timestamp(),
+                             connection=connection)
+
+    def resume(self, payload: bytearray, connection: ClientConnection) -> Deferred:
+        """
+        Restores a pending connection from a resumption ticket, skipping the token decryption.
+        The returned Deferred fires with whether it was accepted.
+        """
+        resumption: Resumption = Resumption()
+        resumption.ParseFromString(payload)
+        if connection.unique_identifier() in self.__identifying or \
+                connection.unique_identifier() not in self.__pending_registration:
+            self._warning("IGNORING RESUMPTION FOR: {}", connection.unique_identifier(), max_per_second=1)
+            return succeed(False)
+        ticket = self.__resumption_tickets.open(sealed_ticket=resumption.ticket)
+        if ticket is None:
+            self._info("RESUMPTION REJECTED FOR: {}", connection.unique_identifier())
+            self.__reject(connection=connection, error="RESUMPTION-REJECTED",
+                          details="The ticket is invalid or expired, identify again", retry_after=0)
+            return succeed(False)
+        self.__identifying.add(connection.unique_identifier())
+        deferred = self.__accept(participant_identifier=ticket.participant_identifier,
+                                 device=ticket.device,
+                                 requested_capabilities=resumption.capabilities,
+                                 not_after=ticket.not_after,
+                                 connection=connection)
+        deferred.addErrback(self.__on_registration_error, connection=connection)
+        return deferred
+
+    def __accept(self, participant_identifier: str, device: Device, requested_capabilities: List[int],
+                 not_after: float, connection: ClientConnection) -> Deferred:
+        # Welcomed only once the account details are in, the welcome carries the nickname and routing identity
+        deferred = connection.load_profile(participant_identifier=participant_identifier)
+        deferred.addCallback(self.__on_profile_loaded,
+                             participant_identifier=participant_identifier,
+                             device=device,
+                             requested_capabilities=requested_capabilities,
+                             not_after=not_after,
+                             connection=connection)
+        return deferred
+
+    def __on_profile_loaded(self, loaded: bool, participant_identifier: str, device: Device,
+                            requested_capabilities: List[int], not_after: float, connection: ClientConnection) -> bool:
+        self.__identifying.discard(connection.unique_identifier())
+        if connection.unique_identifier() not in self.__pending_registration:
+            # Gone while its account details were being fetched
+            return False
+        if not loaded:
+            self._warning("NO ACCOUNT DETAILS FOR: {}", participant_identifier, max_per_second=1)
+            self.__reject(connection=connection, error="PROFILE-UNAVAILABLE",
+                          details="Account details could not be loaded, try again later", retry_after=0)
+            return False
+        device_information = parse_from_device_proto(device=device)
+        if not self.__add_connection(participant_identifier=participant_identifier, connection=connection,
+                                     device_information=device_information):
+            self._warning("NO ROUTING IDENTITY FOR: {}", participant_identifier, max_per_second=1)
+            self.__reject(connection=connection, error="PROFILE-UNAVAILABLE",
+                          details="Account details could not be loaded, try again later", retry_after=0)
+            return False
+
+        supported_capabilities = connection.supported_capabilities()
+        capabilities = [capability for capability in requested_capabilities
+                        if capability in supported_capabilities]
         identity = RoutingIdentity(
             identifier=connection.routing_identity(),
-            nickname=connection.nickname()
+            nickname=connection.nickname(),
+            capabilities=capabilities
         )
+        if self.__resumption_tickets.enabled():
+            identity.resumption_ticket = self.__resumption_tickets.issue(
+                participant_identifier=participant_identifier, device=device, not_after=not_after)
 
         connection.send_message(response_type=ResponseType.IDENTITY_ACCEPTED, payload=identity.SerializeToString())
-        self._logger.info("IDENTIFICATION ACCEPTED -> WELCOME: {}".format(connection.nickname()))
+        # The client only learns what was accepted from the frame above, so switch over after it is queued
+        connection.enable_capabilities(capabilities=capabilities)
+        self._info("IDENTIFICATION ACCEPTED -> WELCOME: {}", connection.nickname())
         self._info("CLEARING REGISTRATION PENDING LIST")
-        del self.__pending_registration[connection.unique_identifier()]
+        self.__pending_registration.pop(connection.unique_identifier(), None)
+        self.__liveness_monitor.identified(connection=connection)
+        return True
+
+    def __on_identification_failed(self, reason: failure.Failure, connection: ClientConnection) -> bool:
+        self.__identifying.discard(connection.unique_identifier())
+        if reason.check(IdentificationOverloaded):
+            self._warning("IDENTIFICATION OVERLOADED, TURNING AWAY: {}", connection.unique_identifier(),
+                          max_per_second=1)
+            self.__reject(connection=connection, error="IDENTITY-OVERLOADED",
+                          details="Identification is busy, try again later",
+                          retry_after=reason.value.retry_after)
+            return False
+        self._error("IDENTIFICATION FAILED FOR: {0} -> {1}", connection.unique_identifier(), reason.value)
+        self.__reject(connection=connection, error="IDENTITY-REJECTED", details="Identification failed",
+                      retry_after=0)
+        return False
+
+    def __on_registration_error(self, reason: failure.Failure, connection: ClientConnection) -> bool:
+        self.__identifying.discard(connection.unique_identifier())
+        self._error("REGISTRATION FAILED FOR: {0} -> {1}", connection.unique_identifier(), reason.getTraceback())
+        return False
+
+    def __reject(self, connection: ClientConnection, error: str, details: str, retry_after: int) -> None:
+        rejection = Failure(
+            error=error,
+            details=details,
+            occurred_at=self.current_timestamp(),
+            retry_after=retry_after
+        )
+        self._info("SENDING FAILURE MESSAGE")
+        connection.send_message(response_type=ResponseType.IDENTITY_REJECTION, payload=rejection.SerializeToString())
+
+    def connection_count(self) -> int:
+        return self.__directory.connection_count()
+
+    def participant_count(self) -> int:
+        return self.__directory.participant_count()
+
+    def pending_count(self) -> int:
+        return len(self.__pending_registration)
+
+    def record_activity(self, connection: ClientConnection) -> None:
+        self.__liveness_monitor.record_activity(connection=connection)
 
     def remove(self, connection: ClientConnection):
+        self.__liveness_monitor.forget(connection=connection)
         info = Info(
             message="CONNECTION ENDED",
             details="We are initiating a disconnection sequence for your connection",
@@ -171,49 +331,77 @@ class ConnectionRegistry(LoggerMixin):
             response_type=ResponseType.DISCONNECTION_ACCEPTED,
             payload=info.SerializeToString()
         )
+        # The cached profile holding the nickname may be long gone from a connection that stayed quiet
         if self.__remove_connection(connection=connection):
 
             if connection.connected == 1:
-                self._logger.info("GRACEFUL DISCONNECTION: -> {}".format(connection.nickname()))
+                self._info("GRACEFUL DISCONNECTION: -> {0} {1}", connection.participant_identifier(),
+                           connection.unique_identifier())
             else:
-                self._logger.warning("CONNECTION LOST: -> {}".format(connection.nickname()))
+                self._warning("CONNECTION LOST: -> {0} {1}", connection.participant_identifier(),
+                              connection.unique_identifier())
         else:
-            self._logger.error(
-                "NO MATCHING CONNECTION FOUND: -> {0} {1} \n DEVICE: {2}".format(
-                    connection.nickname(),
-                    connection.unique_identifier(),
-                    connection.device()
-                ))
-
-    def __add_connection(self, claims: Claims, device_information: DeviceDetails, connection: ClientConnection) -> bool:
-        if claims.id() not in self.__connections:
-            self.__connections[claims.id()] = DeviceCollective(participant_identifier=claims.id())
-        self.__connections[claims.id()].add_connection(connection=connection,
-                                                       device_information=device_information)
+            self._error(
+                "NO MATCHING CONNECTION FOUND: -> {0} {1} \n DEVICE: {2}",
+                connection.participant_identifier(),
+                connection.unique_identifier(),
+                connection.device()
+            )
+
+    def __add_connection(self, participant_identifier: str, device_information: DeviceDetails,
+                         connection: ClientConnection) -> bool:
+        # Shared by the connection, the directory and the cached profile instead of a copy in each
+        participant_identifier = sys.intern(participant_identifier)
+        connection.resolve_participant(identifier=participant_identifier, device_information=device_information)
+        routing_identifier = connection.routing_identity()
+        if routing_identifier is None:
+            return False
+        participant = self.__directory.add(participant_identifier=participant_identifier,
+                                           routing_identifier=routing_identifier,
+                                           connection=connection)
+        if len(participant.connections) == 1:
+            self.__command_bus.handle(ParticipantArrivedCommand(participant_identifier=participant_identifier,
+                                                                routing_identifier=participant.routing_identifier))
+        return True
 
     def __remove_connection(self, connection: ClientConnection) -> bool:
         if connection.unique_identifier() in self.__pending_registration:
             del self.__pending_registration[connection.unique_identifier()]
             return True
-        elif connection.participant_identifier() is not None and \
-                connection.participant_identifier() in self.__connections:
-            return self.__connections[connection.participant_identifier()].remove_connection(connection=connection)
-
-    def add_to_pending_identification(self, connection: ClientConnection):
-        self._logger.info("ADDED CONNECTION TO PENDING IDENTIFICATION")
+        if connection.participant_identifier() is None:
+            return False
+        return self.__directory.remove(participant_identifier=connection.participant_identifier(),
+                                       connection=connection)
+
+    def add_to_pending_identification(self, connection: ClientConnection) -> Optional[int]:
+        """
+        Returns None once the connection waits for identification, otherwise the seconds it should back off
+        """
+        retry_after = self.__admission_controller.admit_connection(source=connection.source_address(),
+                                                                   pending=self.pending_count())
+        if retry_after is not None:
+            self._warning("TOO MANY CONNECTIONS PENDING IDENTIFICATION, TURNING AWAY: {}",
+                          connection.source_address(), max_per_second=1)
+            return retry_after
+        self._info("ADDED CONNECTION TO PENDING IDENTIFICATION")
         self.__pending_registration[connection.unique_identifier()] = connection
+        self.__liveness_monitor.track(connection=connection)
+        return None
 
     def __handle_device_broadcast(self, command: DeviceBroadcastCommand) -> None:
-        self._logger.info("Received a broad cast for the other devices that are connected")
-        self.__connections[command.participant_identifier].send_to_other_devices(
-            unique_identifier=command.unique_identifier,
-            payload=command.payload,
-            response_type=command.response_type
-        )
+        self._debug("Received a broad cast for the other devices that are connected")
+        participant = self.__directory.find(participant_identifier=command.participant_identifier)
+        if participant is None:
+            # Every device of the participant disconnected in the meantime
+            return
+        for connection in participant.connections:
+            if connection.unique_identifier() != command.unique_identifier:
+                connection.send_message(response_type=command.response_type, payload=command.payload)
 
     def __handle_message_delivery(self, command: MessageDispatchCommand) -> None:
-        self._logger.info("Received a broad cast for the other devices that are connected")
-        self.__connections[command.participant_identifier].relay_to_devices(
-            payload=command.payload,
-            response_type=command.response_type
-        )
+        self._debug("Received a broad cast for the other devices that are connected")
+        participant = self.__directory.find(participant_identifier=command.participant_identifier)
+        if participant is None:
+            return
+        for connection in participant.connections:
+            connection.send_message(response_type=command.response_type, payload=command.payload)
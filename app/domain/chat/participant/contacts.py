@@ -0,0 +1,326 @@
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from app.core.logging.loggers import LoggerMixin
+from app.domain.chat.participant.contacts_pb2 import ContactRequest, ContactSyncRequest, ContactSyncResponse, Contact
+from app.domain.chat.participant.repository import ParticipantRepository, ContactRecord, ContactBucketRecord, \
+    ContactRootRecord
+
+HOT_CAPACITY = int(200000)
+HOT_TTL = float(600.0)
+NEGATIVE_TTL = float(30.0)
+DEFAULT_COUNTRY_CODE = ""
+# E.164 bounds on the digits of a number, country code included
+MINIMUM_PHONE_DIGITS = int(7)
+MAXIMUM_PHONE_DIGITS = int(15)
+# Dialled before a country code when calling abroad, North America has its own
+INTERNATIONAL_PREFIX = "00"
+NANP_COUNTRY_CODE = "1"
+NANP_INTERNATIONAL_PREFIX = "011"
+TRUNK_PREFIX = "0"
+# Countries whose numbers keep the leading zero after the country code
+LEADING_ZERO_COUNTRIES = frozenset({"39"})
+EXTENSION_MARKERS = ("ext", "x", "#", ",", ";")
+# Bytes of SHA-256 kept for bucket and root digests
+DIGEST_SIZE = int(16)
+MAX_BUCKETS = int(4096)
+SEPARATORS = str.maketrans("", "", " -./()\u00a0\t")
+
+
+class ContactIndexConfiguration(object):
+    def __init__(self, content_map: Dict):
+        self.hot_capacity = int(content_map.get("hot_capacity", HOT_CAPACITY))
+        self.hot_ttl = float(content_map.get("hot_ttl", HOT_TTL))
+        self.negative_ttl = float(content_map.get("negative_ttl", NEGATIVE_TTL))
+        self.default_country_code = str(content_map.get("default_country_code", DEFAULT_COUNTRY_CODE) or "")
+
+
+class ContactIndexStatistics(NamedTuple):
+    lookups: int
+    hot_hits: int
+    matches: int
+    database_lookups: int
+    size: int
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hot_hits / self.lookups if self.lookups else 0.0
+
+
+def normalize_email(value: str) -> Optional[str]:
+    value = value.strip().lower()
+    if "@" not in value:
+        return None
+    return value
+
+
+def normalize_phone(value: str, country_code: str = DEFAULT_COUNTRY_CODE) -> Optional[str]:
+    """
+    Brings a number to its E.164 form, "+" and digits only. Numbers written without a country code
+    are taken to be national numbers of `country_code`, None when there is none or the value can not be
+    a phone number.
+    """
+    value = value.strip().lower()
+    for marker in EXTENSION_MARKERS:
+        position = value.find(marker)
+        if position > 0:
+            value = value[:position]
+    international = value.startswith("+")
+    if international:
+        # As in +44 (0)20 7946 0958, the trunk prefix is only dialled from within the country
+        value = value[1:].replace("(0)", "")
+    digits = value.translate(SEPARATORS)
+    if not (digits.isascii() and digits.isdigit()):
+        return None
+    if not international:
+        international_prefix = NANP_INTERNATIONAL_PREFIX if country_code == NANP_COUNTRY_CODE \
+            else INTERNATIONAL_PREFIX
+        if digits.startswith(international_prefix):
+            digits = digits[len(international_prefix):]
+        elif not country_code:
+            return None
+        elif country_code == NANP_COUNTRY_CODE:
+            if len(digits) == 11 and digits.startswith(NANP_COUNTRY_CODE):
+                digits = digits[1:]
+            digits = country_code + digits
+        else:
+            if digits.startswith(TRUNK_PREFIX) and country_code not in LEADING_ZERO_COUNTRIES:
+                digits = digits[1:]
+            digits = country_code + digits
+    if digits.startswith("0") or not MINIMUM_PHONE_DIGITS <= len(digits) <= MAXIMUM_PHONE_DIGITS:
+        return None
+    return "+" + digits
+
+
+def valid_country_code(value: str) -> bool:
+    return 1 <= len(value) <= 3 and value.isascii() and value.isdigit() and not value.startswith("0")
+
+
+def contact_hash(contact_type: int, value: str, country_code: str = DEFAULT_COUNTRY_CODE) -> Optional[bytes]:
+    """
+    Hashes the normalized form of a contact, None when the value is not a usable email address or phone number
+    """
+    if contact_type == ContactRequest.ContactType.EMAIL:
+        normalized = normalize_email(value)
+    elif contact_type == ContactRequest.ContactType.PHONE:
+        normalized = normalize_phone(value, country_code=country_code)
+    else:
+        normalized = None
+    if normalized is None:
+        return None
+    return hashlib.sha256("{0}:{1}".format(contact_type, normalized).encode("utf-8")).digest()
+
+
+def bucket_of(request: ContactRequest, bucket_count: int) -> int:
+    """
+    The bucket a contact belongs to, taken from the value as the address book holds it
+    """
+    hashed = hashlib.sha256("{0}:{1}".format(request.type, request.value).encode("utf-8")).digest()
+    return int.from_bytes(hashed[:4], "big") % bucket_count
+
+
+def bucket_digest(requests: Iterable[ContactRequest]) -> bytes:
+    lines = sorted("{0}:{1}\n".format(request.type, request.value) for request in requests)
+    return hashlib.sha256("".join(lines).encode("utf-8")).digest()[:DIGEST_SIZE]
+
+
+def root_digest(digests: Iterable[bytes]) -> bytes:
+    return hashlib.sha256(b"".join(digests)).digest()[:DIGEST_SIZE]
+
+
+EMPTY_DIGEST = bucket_digest([])
+
+
+class ContactIndex(LoggerMixin):
+    """
+    Matches contacts against every participant that ever had a profile loaded, online or not.
+    Participants are stored under the SHA-256 of their normalized email address and E.164 phone number,
+    so a whole batch of contacts is answered with a handful of indexed queries.
+    Matches are kept in a least recently used map of at most `hot_capacity` entries for `hot_ttl`
+    seconds. Contacts without a match are remembered as such for `negative_ttl` only, so a
+    participant that just signed up is found by other nodes soon after.
+    """
+
+    def __init__(self, configuration: ContactIndexConfiguration, repository: ParticipantRepository, reactor):
+        self.__configuration = configuration
+        self.__repository = repository
+        self.__reactor = reactor
+        self.__hot: 'OrderedDict[bytes, Tuple[Optional[ContactRecord], float]]' = OrderedDict()
+        self.__lookups: int = 0
+        self.__hot_hits: int = 0
+        self.__matches: int = 0
+        self.__database_lookups: int = 0
+
+    def index(self, contact: ContactRecord, email_address: Optional[str], phone_number: Optional[str] = None) -> None:
+        contact_hashes: List[Tuple[int, bytes]] = []
+        for contact_type, value in ((ContactRequest.ContactType.EMAIL, email_address),
+                                    (ContactRequest.ContactType.PHONE, phone_number)):
+            hashed = contact_hash(contact_type=contact_type, value=value,
+                                  country_code=self.__configuration.default_country_code) if value else None
+            if hashed is not None:
+                contact_hashes.append((contact_type, hashed))
+        self.__repository.index_contacts(contact=contact, contact_hashes=contact_hashes)
+        for _, hashed in contact_hashes:
+            self.__remember(hashed=hashed, contact=contact)
+
+    def match(self, requests: Iterable[ContactRequest], country_code: str = "") -> List[ContactRecord]:
+        """
+        Returns the participants the contacts belong to, once each and in the order they were first asked for.
+        Phone numbers without a country code are read as national numbers of `country_code`, or of the
+        configured default when the client did not say.
+        """
+        return self.match_buckets(buckets={0: requests}, country_code=country_code)[0]
+
+    def match_buckets(self, buckets: Dict[int, Iterable[ContactRequest]],
+                      country_code: str = "") -> Dict[int, List[ContactRecord]]:
+        """
+        Matches several groups of contacts with a single lookup, see `match`
+        """
+        if not valid_country_code(country_code):
+            country_code = self.__configuration.default_country_code
+        hashed_buckets: Dict[int, List[bytes]] = {}
+        unique: 'OrderedDict[bytes, None]' = OrderedDict()
+        for index, requests in buckets.items():
+            hashes: List[bytes] = []
+            for request in requests:
+                hashed = contact_hash(contact_type=request.type, value=request.value, country_code=country_code)
+                if hashed is not None:
+                    hashes.append(hashed)
+                    unique[hashed] = None
+            hashed_buckets[index] = hashes
+        found = self.__resolve(hashes=unique)
+        matched: Dict[int, List[ContactRecord]] = {}
+        for index, hashes in hashed_buckets.items():
+            participants: Dict[str, ContactRecord] = {}
+            for hashed in hashes:
+                contact = found.get(hashed)
+                if contact is not None and contact.participant_identifier not in participants:
+                    participants[contact.participant_identifier] = contact
+            self.__matches += len(participants)
+            matched[index] = list(participants.values())
+        return matched
+
+    def statistics(self) -> ContactIndexStatistics:
+        return ContactIndexStatistics(
+            lookups=self.__lookups,
+            hot_hits=self.__hot_hits,
+            matches=self.__matches,
+            database_lookups=self.__database_lookups,
+            size=len(self.__hot)
+        )
+
+    def __resolve(self, hashes: Iterable[bytes]) -> Dict[bytes, ContactRecord]:
+        now = self.__reactor.seconds()
+        found: Dict[bytes, ContactRecord] = {}
+        missing: List[bytes] = []
+        for hashed in hashes:
+            self.__lookups += 1
+            entry = self.__hot.get(hashed)
+            if entry is not None and entry[1] > now:
+                self.__hot.move_to_end(hashed)
+                self.__hot_hits += 1
+                if entry[0] is not None:
+                    found[hashed] = entry[0]
+            else:
+                missing.append(hashed)
+        if missing:
+            self.__database_lookups += 1
+            matches = self.__repository.match_contacts(contact_hashes=missing)
+            for hashed in missing:
+                contact = matches.get(hashed)
+                if contact is not None:
+                    found[hashed] = contact
+                self.__remember(hashed=hashed, contact=contact)
+        return found
+
+    def __remember(self, hashed: bytes, contact: Optional[ContactRecord]) -> None:
+        if self.__configuration.hot_capacity <= 0:
+            return
+        ttl = self.__configuration.hot_ttl if contact is not None else self.__configuration.negative_ttl
+        self.__hot[hashed] = (contact, self.__reactor.seconds() + ttl)
+        self.__hot.move_to_end(hashed)
+        while len(self.__hot) > self.__configuration.hot_capacity:
+            self.__hot.popitem(last=False)
+
+
+class ContactSync(LoggerMixin):
+    """
+    Keeps the matches of an address book up to date without resolving all of it on every launch.
+    Clients split their contacts into `bucket_count` buckets with `bucket_of` and send the root digest
+    of the bucket digests, and only when it changed the digest of every bucket along with the buckets
+    that changed. Per participant the server remembers the digest and the matches of each bucket,
+    never the contacts themselves, and answers with the matches added and removed since the last sync.
+    A bucket whose digest the server does not share is asked for again in full.
+    Participants that sign up after a contact was synced show up with the next full sync only.
+    """
+
+    def __init__(self, index: ContactIndex, repository: ParticipantRepository):
+        self.__index = index
+        self.__repository = repository
+
+    def sync(self, participant_identifier: str, request: ContactSyncRequest) -> ContactSyncResponse:
+        response = ContactSyncResponse()
+        bucket_count = request.bucket_count
+        if not 0 < bucket_count <= MAX_BUCKETS:
+            self._warning("INVALID BUCKET COUNT {0} FROM: {1}", bucket_count, participant_identifier,
+                          max_per_second=1)
+            return response
+        if len(request.digests) == 0 and len(request.buckets) == 0:
+            # What a relaunch with an unchanged address book costs, a single row
+            stored_root = self.__repository.fetch_contact_root(participant_identifier=participant_identifier)
+            if stored_root is None or stored_root.bucket_count != bucket_count or stored_root.root != request.root:
+                response.send_digests = True
+            return response
+        if len(request.digests) != bucket_count:
+            response.send_digests = True
+            return response
+        stored: Dict[int, ContactBucketRecord] = {
+            bucket.bucket: bucket for bucket in self.__repository.fetch_contact_buckets(
+                participant_identifier=participant_identifier)}
+        # Buckets split another way can not be compared, all of them are synced anew
+        reset = any(bucket.bucket_count != bucket_count for bucket in stored.values())
+        current: Dict[int, ContactBucketRecord] = {} if reset else stored
+        digests = [current[index].digest if index in current else EMPTY_DIGEST for index in range(bucket_count)]
+
+        received = {bucket.index: bucket.requests for bucket in request.buckets if bucket.index < bucket_count}
+        for index in range(bucket_count):
+            if index not in received and request.digests[index] != digests[index]:
+                response.resend.append(index)
+        resolved = self.__index.match_buckets(buckets=received, country_code=request.country_code)
+
+        saved: List[ContactBucketRecord] = []
+        emptied: List[int] = []
+        for index, requests in received.items():
+            digest = bucket_digest(requests)
+            digests[index] = digest
+            if digest == EMPTY_DIGEST:
+                emptied.append(index)
+            else:
+                saved.append(ContactBucketRecord(bucket=index, bucket_count=bucket_count, digest=digest,
+                                                 matches=[contact.routing_identifier for contact in resolved[index]]))
+        previous = {routing_identifier for bucket in stored.values() for routing_identifier in bucket.matches}
+        kept = {routing_identifier for index, bucket in current.items() if index not in received
+                for routing_identifier in bucket.matches}
+        matched = kept.union(routing_identifier for bucket in saved for routing_identifier in bucket.matches)
+        added: Set[str] = set()
+        for contacts in resolved.values():
+            for contact in contacts:
+                if contact.routing_identifier in previous or contact.routing_identifier in added:
+                    continue
+                added.add(contact.routing_identifier)
+                response.added.append(Contact(
+                    profile_picture_url=contact.photo_url or "",
+                    nickname=contact.nickname,
+                    identifier=contact.routing_identifier
+                ))
+        response.removed.extend(sorted(previous - matched))
+        self.__repository.save_contact_buckets(
+            participant_identifier=participant_identifier,
+            root=ContactRootRecord(bucket_count=bucket_count, root=root_digest(digests)),
+            buckets=saved,
+            emptied=emptied,
+            reset=reset)
+        self._debug("SYNCED {0} BUCKETS FOR: {1} +{2} -{3}", len(received), participant_identifier,
+                    len(response.added), len(response.removed))
+        return response
@@ -19,7 +19,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   syntax='proto3',
   serialized_options=None,
   create_key=_descriptor._internal_create_key,
-  serialized_pb=b'\n\x0e\x63ontacts.proto\"o\n\x0e\x43ontactRequest\x12\r\n\x05value\x18\x01 \x01(\t\x12)\n\x04type\x18\x02 \x01(\x0e\x32\x1b.ContactRequest.ContactType\"#\n\x0b\x43ontactType\x12\t\n\x05\x45MAIL\x10\x00\x12\t\n\x05PHONE\x10\x01\"=\n\x18\x42\x61tchContactMatchRequest\x12!\n\x08requests\x18\x01 \x03(\x0b\x32\x0f.ContactRequest\"L\n\x07\x43ontact\x12\x10\n\x08nickname\x18\x01 \x01(\t\x12\x12\n\nidentifier\x18\x02 \x01(\t\x12\x1b\n\x13profile_picture_url\x18\x03 \x01(\t\"7\n\x19\x42\x61tchContactMatchResponse\x12\x1a\n\x08\x63ontacts\x18\x02 \x03(\x0b\x32\x08.Contactb\x06proto3'
+  serialized_pb=b'\n\x0e\x63ontacts.proto\"o\n\x0e\x43ontactRequest\x12\r\n\x05value\x18\x01 \x01(\t\x12)\n\x04type\x18\x02 \x01(\x0e\x32\x1b.ContactRequest.ContactType\"#\n\x0b\x43ontactType\x12\t\n\x05\x45MAIL\x10\x00\x12\t\n\x05PHONE\x10\x01\"S\n\x18\x42\x61tchContactMatchRequest\x12!\n\x08requests\x18\x01 \x03(\x0b\x32\x0f.ContactRequest\x12\x14\n\x0c\x63ountry_code\x18\x02 \x01(\t\"L\n\x07\x43ontact\x12\x10\n\x08nickname\x18\x01 \x01(\t\x12\x12\n\nidentifier\x18\x02 \x01(\t\x12\x1b\n\x13profile_picture_url\x18\x03 \x01(\t\"7\n\x19\x42\x61tchContactMatchResponse\x12\x1a\n\x08\x63ontacts\x18\x02 \x03(\x0b\x32\x08.Contact\"A\n\rContactBucket\x12\r\n\x05index\x18\x01 \x01(\r\x12!\n\x08requests\x18\x02 \x03(\x0b\x32\x0f.ContactRequest\"\x80\x01\n\x12\x43ontactSyncRequest\x12\x14\n\x0c\x63ountry_code\x18\x01 \x01(\t\x12\x14\n\x0c\x62ucket_count\x18\x02 \x01(\r\x12\x0c\n\x04root\x18\x03 \x01(\x0c\x12\x0f\n\x07\x64igests\x18\x04 \x03(\x0c\x12\x1f\n\x07\x62uckets\x18\x05 \x03(\x0b\x32\x0e.ContactBucket\"e\n\x13\x43ontactSyncResponse\x12\x17\n\x05\x61\x64\x64\x65\x64\x18\x01 \x03(\x0b\x32\x08.Contact\x12\x0f\n\x07removed\x18\x02 \x03(\t\x12\x14\n\x0csend_digests\x18\x03 \x01(\x08\x12\x0e\n\x06resend\x18\x04 \x03(\rb\x06proto3'
 )
 
 
@@ -105,6 +105,13 @@ _BATCHCONTACTMATCHREQUEST = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='country_code', full_name='BatchContactMatchRequest.country_code', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
   ],
   extensions=[
   ],
@@ -118,7 +125,7 @@ _BATCHCONTACTMATCHREQUEST = _descriptor.Descriptor(
   oneofs=[
   ],
   serialized_start=131,
-  serialized_end=192,
+  serialized_end=214,
 )
 
 
@@ -163,8 +170,8 @@ _CONTACT = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=194,
-  serialized_end=270,
+  serialized_start=216,
+  serialized_end=292,
 )
 
 
@@ -195,18 +202,176 @@ _BATCHCONTACTMATCHRESPONSE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=272,
-  serialized_end=327,
+  serialized_start=294,
+  serialized_end=349,
+)
+
+
+_CONTACTBUCKET = _descriptor.Descriptor(
+  name='ContactBucket',
+  full_name='ContactBucket',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='index', full_name='ContactBucket.index', index=0,
+      number=1, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='requests', full_name='ContactBucket.requests', index=1,
+      number=2, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=351,
+  serialized_end=416,
+)
+
+
+_CONTACTSYNCREQUEST = _descriptor.Descriptor(
+  name='ContactSyncRequest',
+  full_name='ContactSyncRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='country_code', full_name='ContactSyncRequest.country_code', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='bucket_count', full_name='ContactSyncRequest.bucket_count', index=1,
+      number=2, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='root', full_name='ContactSyncRequest.root', index=2,
+      number=3, type=12, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"",
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='digests', full_name='ContactSyncRequest.digests', index=3,
+      number=4, type=12, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='buckets', full_name='ContactSyncRequest.buckets', index=4,
+      number=5, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=419,
+  serialized_end=547,
+)
+
+
+_CONTACTSYNCRESPONSE = _descriptor.Descriptor(
+  name='ContactSyncResponse',
+  full_name='ContactSyncResponse',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='added', full_name='ContactSyncResponse.added', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='removed', full_name='ContactSyncResponse.removed', index=1,
+      number=2, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='send_digests', full_name='ContactSyncResponse.send_digests', index=2,
+      number=3, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='resend', full_name='ContactSyncResponse.resend', index=3,
+      number=4, type=13, cpp_type=3, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=549,
+  serialized_end=650,
 )
 
 _CONTACTREQUEST.fields_by_name['type'].enum_type = _CONTACTREQUEST_CONTACTTYPE
 _CONTACTREQUEST_CONTACTTYPE.containing_type = _CONTACTREQUEST
 _BATCHCONTACTMATCHREQUEST.fields_by_name['requests'].message_type = _CONTACTREQUEST
 _BATCHCONTACTMATCHRESPONSE.fields_by_name['contacts'].message_type = _CONTACT
+_CONTACTBUCKET.fields_by_name['requests'].message_type = _CONTACTREQUEST
+_CONTACTSYNCREQUEST.fields_by_name['buckets'].message_type = _CONTACTBUCKET
+_CONTACTSYNCRESPONSE.fields_by_name['added'].message_type = _CONTACT
 DESCRIPTOR.message_types_by_name['ContactRequest'] = _CONTACTREQUEST
 DESCRIPTOR.message_types_by_name['BatchContactMatchRequest'] = _BATCHCONTACTMATCHREQUEST
 DESCRIPTOR.message_types_by_name['Contact'] = _CONTACT
 DESCRIPTOR.message_types_by_name['BatchContactMatchResponse'] = _BATCHCONTACTMATCHRESPONSE
+DESCRIPTOR.message_types_by_name['ContactBucket'] = _CONTACTBUCKET
+DESCRIPTOR.message_types_by_name['ContactSyncRequest'] = _CONTACTSYNCREQUEST
+DESCRIPTOR.message_types_by_name['ContactSyncResponse'] = _CONTACTSYNCRESPONSE
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
 
 ContactRequest = _reflection.GeneratedProtocolMessageType('ContactRequest', (_message.Message,), {
@@ -237,5 +402,26 @@ BatchContactMatchResponse = _reflection.GeneratedProtocolMessageType('BatchConta
   })
 _sym_db.RegisterMessage(BatchContactMatchResponse)
 
+ContactBucket = _reflection.GeneratedProtocolMessageType('ContactBucket', (_message.Message,), {
+  'DESCRIPTOR' : _CONTACTBUCKET,
+  '__module__' : 'contacts_pb2'
+  # @@protoc_insertion_point(class_scope:ContactBucket)
+  })
+_sym_db.RegisterMessage(ContactBucket)
+
+ContactSyncRequest = _reflection.GeneratedProtocolMessageType('ContactSyncRequest', (_message.Message,), {
+  'DESCRIPTOR' : _CONTACTSYNCREQUEST,
+  '__module__' : 'contacts_pb2'
+  # @@protoc_insertion_point(class_scope:ContactSyncRequest)
+  })
+_sym_db.RegisterMessage(ContactSyncRequest)
+
+ContactSyncResponse = _reflection.GeneratedProtocolMessageType('ContactSyncResponse', (_message.Message,), {
+  'DESCRIPTOR' : _CONTACTSYNCRESPONSE,
+  '__module__' : 'contacts_pb2'
+  # @@protoc_insertion_point(class_scope:ContactSyncResponse)
+  })
+_sym_db.RegisterMessage(ContactSyncResponse)
+
 
 # @@protoc_insertion_point(module_scope)
@@ -0,0 +1,67 @@
+import sys
+from typing import Dict, Optional, Tuple
+
+
+class LocalParticipant(object):
+    """
+    A participant with at least one device connected to this node.
+    Most participants connect a single device, a tuple of connections is the smallest container that holds it.
+    """
+    __slots__ = ("participant_identifier", "routing_identifier", "connections")
+
+    def __init__(self, participant_identifier: str, routing_identifier: str):
+        self.participant_identifier = participant_identifier
+        self.routing_identifier = routing_identifier
+        self.connections: Tuple = ()
+
+
+class ParticipantDirectory(object):
+    """
+    Every participant connected to this node, found by participant or by routing identifier.
+    Both indexes point at the same record and are keyed by the identifiers the record holds,
+    which are interned so the connections and cached profiles of a participant share them as well.
+    A participant is dropped from both indexes together when its last device disconnects.
+    """
+
+    def __init__(self):
+        self.__by_participant: Dict[str, LocalParticipant] = {}
+        self.__by_routing: Dict[str, LocalParticipant] = {}
+        self.__connections: int = 0
+
+    def add(self, participant_identifier: str, routing_identifier: str, connection) -> LocalParticipant:
+        participant = self.__by_participant.get(participant_identifier)
+        if participant is None:
+            participant = LocalParticipant(participant_identifier=sys.intern(participant_identifier),
+                                           routing_identifier=sys.intern(routing_identifier))
+            self.__by_participant[participant.participant_identifier] = participant
+            self.__by_routing[participant.routing_identifier] = participant
+        if connection not in participant.connections:
+            participant.connections += (connection,)
+            self.__connections += 1
+        return participant
+
+    def remove(self, participant_identifier: str, connection) -> bool:
+        """
+        Returns whether the connection was known, forgets the participant with its last connection
+        """
+        participant = self.__by_participant.get(participant_identifier)
+        if participant is None or connection not in participant.connections:
+            return False
+        participant.connections = tuple(known for known in participant.connections if known is not connection)
+        self.__connections -= 1
+        if len(participant.connections) == 0:
+            del self.__by_participant[participant.participant_identifier]
+            del self.__by_routing[participant.routing_identifier]
+        return True
+
+    def find(self, participant_identifier: str) -> Optional[LocalParticipant]:
+        return self.__by_participant.get(participant_identifier)
+
+    def find_by_routing(self, routing_identifier: str) -> Optional[LocalParticipant]:
+        return self.__by_routing.get(routing_identifier)
+
+    def participant_count(self) -> int:
+        return len(self.__by_participant)
+
+    def connection_count(self) -> int:
+        return self.__connections
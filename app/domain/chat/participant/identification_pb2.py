@@ -2,6 +2,7 @@
 # Generated by the protocol buffer compiler.  DO NOT EDIT!
 # source: identification.proto
 """Generated protocol buffer code."""
+from google.protobuf.internal import enum_type_wrapper
 from google.protobuf import descriptor as _descriptor
 from google.protobuf import message as _message
 from google.protobuf import reflection as _reflection
@@ -19,9 +20,37 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   syntax='proto3',
   serialized_options=None,
   create_key=_descriptor._internal_create_key,
-  serialized_pb=b'\n\x14identification.proto\"U\n\x06\x44\x65vice\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x18\n\x10operating_system\x18\x02 \x01(\t\x12\x0f\n\x07version\x18\x03 \x01(\t\x12\x12\n\nip_address\x18\x04 \x01(\t\"8\n\x0eIdentification\x12\r\n\x05token\x18\x01 \x01(\x0c\x12\x17\n\x06\x64\x65vice\x18\x02 \x01(\x0b\x32\x07.Device\"7\n\x0fRoutingIdentity\x12\x12\n\nidentifier\x18\x01 \x01(\t\x12\x10\n\x08nickname\x18\x02 \x01(\tb\x06proto3'
+  serialized_pb=b'\n\x14identification.proto\"U\n\x06\x44\x65vice\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x18\n\x10operating_system\x18\x02 \x01(\t\x12\x0f\n\x07version\x18\x03 \x01(\t\x12\x12\n\nip_address\x18\x04 \x01(\t\"[\n\x0eIdentification\x12\r\n\x05token\x18\x01 \x01(\x0c\x12\x17\n\x06\x64\x65vice\x18\x02 \x01(\x0b\x32\x07.Device\x12!\n\x0c\x63\x61pabilities\x18\x03 \x03(\x0e\x32\x0b.Capability\"u\n\x0fRoutingIdentity\x12\x12\n\nidentifier\x18\x01 \x01(\t\x12\x10\n\x08nickname\x18\x02 \x01(\t\x12!\n\x0c\x63\x61pabilities\x18\x03 \x03(\x0e\x32\x0b.Capability\x12\x19\n\x11resumption_ticket\x18\x04 \x01(\x0c\"?\n\nResumption\x12\x0e\n\x06ticket\x18\x01 \x01(\x0c\x12!\n\x0c\x63\x61pabilities\x18\x02 \x03(\x0e\x32\x0b.Capability\"r\n\x10ResumptionTicket\x12\x1e\n\x16participant_identifier\x18\x01 \x01(\t\x12\x17\n\x06\x64\x65vice\x18\x02 \x01(\x0b\x32\x07.Device\x12\x12\n\nexpires_at\x18\x03 \x01(\x03\x12\x11\n\tnot_after\x18\x04 \x01(\x03*5\n\nCapability\x12\x11\n\rNO_CAPABILITY\x10\x00\x12\x14\n\x10ZLIB_COMPRESSION\x10\x01\x62\x06proto3'
 )
 
+_CAPABILITY = _descriptor.EnumDescriptor(
+  name='Capability',
+  full_name='Capability',
+  filename=None,
+  file=DESCRIPTOR,
+  create_key=_descriptor._internal_create_key,
+  values=[
+    _descriptor.EnumValueDescriptor(
+      name='NO_CAPABILITY', index=0, number=0,
+      serialized_options=None,
+      type=None,
+      create_key=_descriptor._internal_create_key),
+    _descriptor.EnumValueDescriptor(
+      name='ZLIB_COMPRESSION', index=1, number=1,
+      serialized_options=None,
+      type=None,
+      create_key=_descriptor._internal_create_key),
+  ],
+  containing_type=None,
+  serialized_options=None,
+  serialized_start=504,
+  serialized_end=557,
+)
+_sym_db.RegisterEnumDescriptor(_CAPABILITY)
+
+Capability = enum_type_wrapper.EnumTypeWrapper(_CAPABILITY)
+NO_CAPABILITY = 0
+ZLIB_COMPRESSION = 1
 
 
 
@@ -100,6 +129,13 @@ _IDENTIFICATION = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='capabilities', full_name='Identification.capabilities', index=2,
+      number=3, type=14, cpp_type=8, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
   ],
   extensions=[
   ],
@@ -113,7 +149,7 @@ _IDENTIFICATION = _descriptor.Descriptor(
   oneofs=[
   ],
   serialized_start=111,
-  serialized_end=167,
+  serialized_end=202,
 )
 
 
@@ -139,6 +175,20 @@ _ROUTINGIDENTITY = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='capabilities', full_name='RoutingIdentity.capabilities', index=2,
+      number=3, type=14, cpp_type=8, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='resumption_ticket', full_name='RoutingIdentity.resumption_ticket', index=3,
+      number=4, type=12, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"",
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
   ],
   extensions=[
   ],
@@ -151,14 +201,113 @@ _ROUTINGIDENTITY = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=169,
-  serialized_end=224,
+  serialized_start=204,
+  serialized_end=321,
+)
+
+
+_RESUMPTION = _descriptor.Descriptor(
+  name='Resumption',
+  full_name='Resumption',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='ticket', full_name='Resumption.ticket', index=0,
+      number=1, type=12, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"",
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='capabilities', full_name='Resumption.capabilities', index=1,
+      number=2, type=14, cpp_type=8, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=323,
+  serialized_end=386,
+)
+
+
+_RESUMPTIONTICKET = _descriptor.Descriptor(
+  name='ResumptionTicket',
+  full_name='ResumptionTicket',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='participant_identifier', full_name='ResumptionTicket.participant_identifier', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='device', full_name='ResumptionTicket.device', index=1,
+      number=2, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='expires_at', full_name='ResumptionTicket.expires_at', index=2,
+      number=3, type=3, cpp_type=2, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='not_after', full_name='ResumptionTicket.not_after', index=3,
+      number=4, type=3, cpp_type=2, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=388,
+  serialized_end=502,
 )
 
 _IDENTIFICATION.fields_by_name['device'].message_type = _DEVICE
+_IDENTIFICATION.fields_by_name['capabilities'].enum_type = _CAPABILITY
+_ROUTINGIDENTITY.fields_by_name['capabilities'].enum_type = _CAPABILITY
+_RESUMPTION.fields_by_name['capabilities'].enum_type = _CAPABILITY
+_RESUMPTIONTICKET.fields_by_name['device'].message_type = _DEVICE
 DESCRIPTOR.message_types_by_name['Device'] = _DEVICE
 DESCRIPTOR.message_types_by_name['Identification'] = _IDENTIFICATION
 DESCRIPTOR.message_types_by_name['RoutingIdentity'] = _ROUTINGIDENTITY
+DESCRIPTOR.message_types_by_name['Resumption'] = _RESUMPTION
+DESCRIPTOR.message_types_by_name['ResumptionTicket'] = _RESUMPTIONTICKET
+DESCRIPTOR.enum_types_by_name['Capability'] = _CAPABILITY
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
 
 Device = _reflection.GeneratedProtocolMessageType('Device', (_message.Message,), {
@@ -182,5 +331,19 @@ RoutingIdentity = _reflection.GeneratedProtocolMessageType('RoutingIdentity', (_
   })
 _sym_db.RegisterMessage(RoutingIdentity)
 
+Resumption = _reflection.GeneratedProtocolMessageType('Resumption', (_message.Message,), {
+  'DESCRIPTOR' : _RESUMPTION,
+  '__module__' : 'identification_pb2'
+  # @@protoc_insertion_point(class_scope:Resumption)
+  })
+_sym_db.RegisterMessage(Resumption)
+
+ResumptionTicket = _reflection.GeneratedProtocolMessageType('ResumptionTicket', (_message.Message,), {
+  'DESCRIPTOR' : _RESUMPTIONTICKET,
+  '__module__' : 'identification_pb2'
+  # @@protoc_insertion_point(class_scope:ResumptionTicket)
+  })
+_sym_db.RegisterMessage(ResumptionTicket)
+
 
 # @@protoc_insertion_point(module_scope)
@@ -0,0 +1,189 @@
+import math
+from typing import Dict, List, Optional
+
+from twisted.internet.interfaces import IReactorTime
+from twisted.internet.task import LoopingCall
+
+from app.core.logging.loggers import LoggerMixin
+from app.domain.chat.types import ResponseType
+
+TICK_INTERVAL = float(1.0)
+WHEEL_SLOTS = int(512)
+IDENTIFICATION_TIMEOUT = float(10.0)
+PING_INTERVAL = float(60.0)
+IDLE_TIMEOUT = float(180.0)
+CLOSE_GRACE = float(5.0)
+
+
+class LivenessConfiguration(object):
+    def __init__(self, content_map: Dict):
+        self.tick_interval = float(content_map.get("tick_interval", TICK_INTERVAL))
+        self.wheel_slots = int(content_map.get("wheel_slots", WHEEL_SLOTS))
+        self.identification_timeout = float(content_map.get("identification_timeout", IDENTIFICATION_TIMEOUT))
+        self.ping_interval = float(content_map.get("ping_interval", PING_INTERVAL))
+        self.idle_timeout = float(content_map.get("idle_timeout", IDLE_TIMEOUT))
+        self.close_grace = float(content_map.get("close_grace", CLOSE_GRACE))
+
+
+class TimingWheel(object):
+    """
+    A hashed timing wheel, deadlines are hashed into one of `slots` buckets by the first
+    tick at or after them, so a bucket only holds deadlines that are due once its tick is
+    reached. Scheduling and cancelling are a dictionary operation, and advancing the
+    wheel only looks at the buckets of the ticks that went by. A deadline further away
+    than a full turn of the wheel simply stays in its bucket until its turn comes round.
+    """
+
+    def __init__(self, tick_interval: float, slots: int, now: float):
+        self.__tick_interval = tick_interval
+        self.__slots = slots
+        self.__buckets: List[Dict[str, float]] = [{} for _ in range(slots)]
+        self.__bucket_of: Dict[str, int] = {}
+        self.__current_tick = self.__tick_of(now)
+
+    def __len__(self) -> int:
+        return len(self.__bucket_of)
+
+    def schedule(self, key: str, deadline: float) -> None:
+        self.cancel(key)
+        # Never hash into a tick that was already processed, it would only be seen a turn later
+        bucket = max(self.__due_tick_of(deadline), self.__current_tick + 1) % self.__slots
+        self.__buckets[bucket][key] = deadline
+        self.__bucket_of[key] = bucket
+
+    def cancel(self, key: str) -> None:
+        bucket = self.__bucket_of.pop(key, None)
+        if bucket is not None:
+            del self.__buckets[bucket][key]
+
+    def advance(self, now: float) -> List[str]:
+        expired: List[str] = []
+        target = self.__tick_of(now)
+        # Visiting more than one turn would only revisit the same buckets
+        first = max(self.__current_tick + 1, target - self.__slots + 1)
+        for tick in range(first, target + 1):
+            bucket = self.__buckets[tick % self.__slots]
+            if not bucket:
+                continue
+            for key, deadline in list(bucket.items()):
+                if deadline <= now:
+                    del bucket[key]
+                    del self.__bucket_of[key]
+                    expired.append(key)
+                elif self.__due_tick_of(deadline) <= target:
+                    # Rounding put it in a tick that was reached, it must not wait a full turn
+                    del bucket[key]
+                    self.__buckets[(target + 1) % self.__slots][key] = deadline
+                    self.__bucket_of[key] = (target + 1) % self.__slots
+        self.__current_tick = max(self.__current_tick, target)
+        return expired
+
+    def __tick_of(self, moment: float) -> int:
+        return int(moment // self.__tick_interval)
+
+    def __due_tick_of(self, deadline: float) -> int:
+        return int(math.ceil(deadline / self.__tick_interval))
+
+
+class Liveness(object):
+    __slots__ = ("connection", "connected_at", "last_activity", "identified", "probed", "closing")
+
+    def __init__(self, connection, now: float):
+        self.connection = connection
+        self.connected_at = now
+        self.last_activity = now
+        self.identified = False
+        self.probed = False
+        self.closing = False
+
+
+class LivenessMonitor(LoggerMixin):
+    """
+    Evicts connections that never identify and identified connections that went quiet.
+    Recording activity only stamps the connection, it is not moved in the wheel. When its
+    slot comes up the real deadline is worked out from the latest stamp and the connection
+    is either pinged, evicted or hashed back in, so a busy connection costs nothing extra
+    and a single looping call serves every socket.
+    Connections that are still around `close_grace` seconds after eviction are aborted,
+    a half-open socket would otherwise hold on to its unsent goodbye forever.
+    """
+
+    def __init__(self, configuration: LivenessConfiguration, reactor: IReactorTime):
+        self.__configuration = configuration
+        self.__reactor = reactor
+        self.__wheel = TimingWheel(tick_interval=configuration.tick_interval,
+                                   slots=configuration.wheel_slots,
+                                   now=reactor.seconds())
+        self.__connections: Dict[str, Liveness] = {}
+        self.__ticker: Optional[LoopingCall] = None
+
+    def start(self) -> None:
+        self.__ticker = LoopingCall(self.tick)
+        self.__ticker.clock = self.__reactor
+        self.__ticker.start(self.__configuration.tick_interval, now=False)
+
+    def stop(self) -> None:
+        if self.__ticker is not None and self.__ticker.running:
+            self.__ticker.stop()
+        self.__ticker = None
+
+    def tracked(self) -> int:
+        return len(self.__connections)
+
+    def track(self, connection) -> None:
+        now = self.__reactor.seconds()
+        key = connection.unique_identifier()
+        self.__connections[key] = Liveness(connection=connection, now=now)
+        self.__wheel.schedule(key=key, deadline=now + self.__configuration.identification_timeout)
+
+    def identified(self, connection) -> None:
+        liveness = self.__connections.get(connection.unique_identifier())
+        if liveness is not None:
+            liveness.identified = True
+            liveness.last_activity = self.__reactor.seconds()
+            # The pending deadline is not reset here, the connection is re-examined when it comes up
+
+    def record_activity(self, connection) -> None:
+        liveness = self.__connections.get(connection.unique_identifier())
+        if liveness is not None:
+            liveness.last_activity = self.__reactor.seconds()
+            liveness.probed = False
+
+    def forget(self, connection) -> None:
+        key = connection.unique_identifier()
+        if self.__connections.pop(key, None) is not None:
+            self.__wheel.cancel(key)
+
+    def tick(self) -> None:
+        now = self.__reactor.seconds()
+        for key in self.__wheel.advance(now=now):
+            liveness = self.__connections.get(key)
+            if liveness is not None:
+                self.__examine(key=key, liveness=liveness, now=now)
+
+    def __examine(self, key: str, liveness: Liveness, now: float) -> None:
+        if liveness.closing:
+            self._warning("ABORTING UNRESPONSIVE CONNECTION: {0}", key, max_per_second=10)
+            self.__connections.pop(key, None)
+            liveness.connection.abort()
+            return
+        if not liveness.identified:
+            self.__evict(key=key, liveness=liveness, now=now, error="IDENTIFICATION-TIMEOUT",
+                         details="No identification was received in time")
+            return
+        idle_deadline = liveness.last_activity + self.__configuration.idle_timeout
+        if now >= idle_deadline:
+            self.__evict(key=key, liveness=liveness, now=now, error="IDLE-TIMEOUT",
+                         details="No activity was seen on this connection in time")
+            return
+        ping_deadline = liveness.last_activity + self.__configuration.ping_interval
+        if now >= ping_deadline and not liveness.probed:
+            liveness.probed = True
+            liveness.connection.send_message(response_type=ResponseType.PING, payload=b"")
+        self.__wheel.schedule(key=key, deadline=idle_deadline if liveness.probed else ping_deadline)
+
+    def __evict(self, key: str, liveness: Liveness, now: float, error: str, details: str) -> None:
+        self._info("EVICTING CONNECTION: {0} -> {1}", key, error, max_per_second=10)
+        liveness.closing = True
+        self.__wheel.schedule(key=key, deadline=now + self.__configuration.close_grace)
+        liveness.connection.disconnect(error=error, details=details)
@@ -19,7 +19,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   syntax='proto3',
   serialized_options=None,
   create_key=_descriptor._internal_create_key,
-  serialized_pb=b'\n\nnode.proto\"5\n\x11ParticipantJoined\x12\x12\n\nidentifier\x18\x01 \x01(\t\x12\x0c\n\x04node\x18\x02 \x01(\t\"3\n\x0fParticipantLeft\x12\x12\n\nidentifier\x18\x01 \x01(\t\x12\x0c\n\x04node\x18\x02 \x01(\t\"%\n\x0fLocationRequest\x12\x12\n\nidentifier\x18\x01 \x01(\t\" \n\x10LocationResponse\x12\x0c\n\x04node\x18\x02 \x01(\t\"\x86\x01\n\x13ParticipantPassOver\x12\x19\n\x11sender_identifier\x18\x01 \x01(\t\x12\x19\n\x11target_identifier\x18\x02 \x01(\t\x12\x18\n\x10originating_node\x18\x03 \x01(\t\x12\x0e\n\x06marker\x18\x04 \x01(\t\x12\x0f\n\x07payload\x18\x05 \x01(\x0c\"]\n\x06Result\x12\x1e\n\x06status\x18\x01 \x01(\x0e\x32\x0e.Result.Status\x12\x0f\n\x07message\x18\x02 \x01(\t\"\"\n\x06Status\x12\x0b\n\x07SUCCESS\x10\x00\x12\x0b\n\x07\x46\x41ILURE\x10\x01\x62\x06proto3'
+  serialized_pb=b'\n\nnode.proto\"5\n\x11ParticipantJoined\x12\x12\n\nidentifier\x18\x01 \x01(\t\x12\x0c\n\x04node\x18\x02 \x01(\t\"3\n\x0fParticipantLeft\x12\x12\n\nidentifier\x18\x01 \x01(\t\x12\x0c\n\x04node\x18\x02 \x01(\t\"$\n\x0eProfileChanged\x12\x12\n\nidentifier\x18\x01 \x01(\t\"%\n\x0fLocationRequest\x12\x12\n\nidentifier\x18\x01 \x01(\t\" \n\x10LocationResponse\x12\x0c\n\x04node\x18\x02 \x01(\t\"\xc0\x01\n\x13ParticipantPassOver\x12\x19\n\x11sender_identifier\x18\x01 \x01(\t\x12\x19\n\x11target_identifier\x18\x02 \x01(\t\x12\x18\n\x10originating_node\x18\x03 \x01(\t\x12\x0e\n\x06marker\x18\x04 \x01(\t\x12\x0f\n\x07payload\x18\x05 \x01(\x0c\x12!\n\x19sender_routing_identifier\x18\x06 \x01(\t\x12\x15\n\rresponse_type\x18\x07 \x01(\r\"]\n\x06Result\x12\x1e\n\x06status\x18\x01 \x01(\x0e\x32\x0e.Result.Status\x12\x0f\n\x07message\x18\x02 \x01(\t\"\"\n\x06Status\x12\x0b\n\x07SUCCESS\x10\x00\x12\x0b\n\x07\x46\x41ILURE\x10\x01\x62\x06proto3'
 )
 
 
@@ -44,8 +44,8 @@ _RESULT_STATUS = _descriptor.EnumDescriptor(
   ],
   containing_type=None,
   serialized_options=None,
-  serialized_start=391,
-  serialized_end=425,
+  serialized_start=487,
+  serialized_end=521,
 )
 _sym_db.RegisterEnumDescriptor(_RESULT_STATUS)
 
@@ -128,6 +128,38 @@ _PARTICIPANTLEFT = _descriptor.Descriptor(
 )
 
 
+_PROFILECHANGED = _descriptor.Descriptor(
+  name='ProfileChanged',
+  full_name='ProfileChanged',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='identifier', full_name='ProfileChanged.identifier', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=122,
+  serialized_end=158,
+)
+
+
 _LOCATIONREQUEST = _descriptor.Descriptor(
   name='LocationRequest',
   full_name='LocationRequest',
@@ -155,8 +187,8 @@ _LOCATIONREQUEST = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=122,
-  serialized_end=159,
+  serialized_start=160,
+  serialized_end=197,
 )
 
 
@@ -187,8 +219,8 @@ _LOCATIONRESPONSE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=161,
-  serialized_end=193,
+  serialized_start=199,
+  serialized_end=231,
 )
 
 
@@ -235,6 +267,20 @@ _PARTICIPANTPASSOVER = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='sender_routing_identifier', full_name='ParticipantPassOver.sender_routing_identifier', index=5,
+      number=6, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='response_type', full_name='ParticipantPassOver.response_type', index=6,
+      number=7, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
   ],
   extensions=[
   ],
@@ -247,8 +293,8 @@ _PARTICIPANTPASSOVER = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=196,
-  serialized_end=330,
+  serialized_start=234,
+  serialized_end=426,
 )
 
 
@@ -287,14 +333,15 @@ _RESULT = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=332,
-  serialized_end=425,
+  serialized_start=428,
+  serialized_end=521,
 )
 
 _RESULT.fields_by_name['status'].enum_type = _RESULT_STATUS
 _RESULT_STATUS.containing_type = _RESULT
 DESCRIPTOR.message_types_by_name['ParticipantJoined'] = _PARTICIPANTJOINED
 DESCRIPTOR.message_types_by_name['ParticipantLeft'] = _PARTICIPANTLEFT
+DESCRIPTOR.message_types_by_name['ProfileChanged'] = _PROFILECHANGED
 DESCRIPTOR.message_types_by_name['LocationRequest'] = _LOCATIONREQUEST
 DESCRIPTOR.message_types_by_name['LocationResponse'] = _LOCATIONRESPONSE
 DESCRIPTOR.message_types_by_name['ParticipantPassOver'] = _PARTICIPANTPASSOVER
@@ -315,6 +362,13 @@ ParticipantLeft = _reflection.GeneratedProtocolMessageType('ParticipantLeft', (_
   })
 _sym_db.RegisterMessage(ParticipantLeft)
 
+ProfileChanged = _reflection.GeneratedProtocolMessageType('ProfileChanged', (_message.Message,), {
+  'DESCRIPTOR' : _PROFILECHANGED,
+  '__module__' : 'node_pb2'
+  # @@protoc_insertion_point(class_scope:ProfileChanged)
+  })
+_sym_db.RegisterMessage(ProfileChanged)
+
 LocationRequest = _reflection.GeneratedProtocolMessageType('LocationRequest', (_message.Message,), {
   'DESCRIPTOR' : _LOCATIONREQUEST,
   '__module__' : 'node_pb2'
@@ -1,34 +1,58 @@
-import struct
+import os
+import sys
 import uuid
-from typing import Optional, Dict
+import zlib
+from typing import Optional, Dict, List, Tuple
 from datetime import datetime
-import requests
 from google.protobuf.timestamp_pb2 import Timestamp
 from pymessagebus import CommandBus
+from twisted.internet import defer
+from twisted.internet.interfaces import IReactorTime, IPushProducer
 from twisted.internet.protocol import connectionDone
 from twisted.python import failure
+from zope.interface import implementer
 
 from app.configuration import Configuration
 from app.core.logging.loggers import LoggerMixin
-from app.domain.chat.messages.messages_pb2 import DirectMessage, Delivery
-from app.domain.chat.messages.repository import MessageRepository
+from app.domain.chat.messages.messages_pb2 import DirectMessage, Delivery, ReadWatermark, RequestBatch, \
+    UnreadCount, UnreadCounts
+from app.domain.chat.messages.persistence import MessagePersistence
+from app.domain.chat.messages.repository import MessageRepository, DirectMessageRecord
+from app.domain.chat.participant.accounts import AccountServiceClient
 from app.domain.chat.participant.clients import ParticipantClient
-from app.domain.chat.participant.commands import MessageDispatchCommand
+from app.domain.chat.participant.commands import MessageDispatchCommand, ParticipantArrivedCommand
 from app.domain.chat.participant.connections import ClientConnection, ConnectionRegistry, DeviceDetails
-from app.domain.chat.participant.contacts_pb2 import BatchContactMatchRequest, BatchContactMatchResponse, \
-    ContactRequest, Contact
+from app.domain.chat.participant.directory import ParticipantDirectory, LocalParticipant
+from app.domain.chat.participant.contacts import ContactIndex, ContactIndexConfiguration, ContactIndexStatistics, \
+    ContactSync
+from app.domain.chat.participant.contacts_pb2 import BatchContactMatchRequest, BatchContactMatchResponse, Contact, \
+    ContactSyncRequest
 from app.domain.chat.participant.factory import get_client
 from app.domain.chat.participant.listeners import EventListener
 from app.domain.chat.participant.models import Identity
-from app.domain.chat.participant.node_pb2 import ParticipantPassOver
-from app.domain.chat.participant.repository import ParticipantRepository
-from app.domain.chat.types import MESSAGE_HEADER, RequestType, ResponseType
+from app.domain.chat.participant.node_pb2 import ParticipantPassOver, ProfileChanged
+from app.domain.chat.participant.profiles import ProfileCache, ProfileCacheConfiguration, ProfileCacheStatistics
+from app.domain.chat.participant.receipts import DeliveryReceipts, ReceiptConfiguration, ReceiptStatistics
+from app.domain.chat.participant.repository import ParticipantRepository, ContactRecord
+from app.domain.chat.framing import FrameDecoder, FrameSizeExceeded, FrameWriter, TransportConfiguration, \
+    SlowConsumerPolicy, OutboundStatistics, FrameInflater
+from app.domain.chat.participant.identification_pb2 import Capability
+from app.domain.chat.participant.responses_pb2 import Failure
+from app.domain.chat.participant.transfers import TransferService
+from app.domain.chat.participant.watermarks import ReadWatermarks, WatermarkConfiguration, WatermarkStatistics
+from app.domain.chat.types import RequestType, ResponseType, EPHEMERAL_RESPONSES, ANONYMOUS_REQUESTS
+
+
+PROFILE_CHANGED_SUBJECT = "v1/participants/profile-changed"
 
 
 class Participant(object):
+    # One of these is kept per cached profile
+    __slots__ = ("__routing_identity", "__identifier", "__nickname", "__email_address", "__photo_url")
+
     def __init__(self, routing_identity: str, content_map: Dict):
-        self.__routing_identity: str = routing_identity
-        self.__identifier: str = content_map["identifier"]
+        self.__routing_identity: str = sys.intern(routing_identity)
+        self.__identifier: str = sys.intern(content_map["identifier"])
         self.__nickname: str = content_map["nickname"]
         self.__email_address: str = content_map["email_address"]
         self.__photo_url: str = content_map["photo_url"]
@@ -45,6 +69,10 @@ class Participant(object):
     def routing_identity(self):
         return self.__routing_identity
 
+    @property
+    def email_address(self):
+        return self.__email_address
+
     @property
     def photo_url(self):
         return self.__photo_url
@@ -55,44 +83,102 @@ class ParticipantService(LoggerMixin):
                  configuration: Configuration,
                  command_bus: CommandBus,
                  participant_repository: ParticipantRepository,
-                 message_repository: MessageRepository
+                 message_repository: MessageRepository,
+                 account_client: AccountServiceClient,
+                 directory: ParticipantDirectory,
+                 persistence: MessagePersistence,
+                 reactor: IReactorTime
                  ) -> None:
         self.__configuration = configuration
-        self.__online_participants: Dict[Participant] = {}
-        self.__contact_pairing: Dict[str] = {}
-        self.__route_pairing: Dict[str] = {}
+        self.__directory: ParticipantDirectory = directory
+        self.__persistence: MessagePersistence = persistence
+        self.__account_client: AccountServiceClient = account_client
+        self.__profiles = ProfileCache(
+            configuration=ProfileCacheConfiguration(content_map=configuration.profile_cache_configuration()),
+            loader=self.__load_participant,
+            reactor=reactor)
+        self.__contacts = ContactIndex(
+            configuration=ContactIndexConfiguration(content_map=configuration.contact_index_configuration()),
+            repository=participant_repository,
+            reactor=reactor)
+        self.__contact_sync = ContactSync(index=self.__contacts, repository=participant_repository)
+        self.__receipts = DeliveryReceipts(
+            configuration=ReceiptConfiguration(content_map=configuration.receipt_configuration()),
+            dispatch=self.__dispatch_receipts,
+            reactor=reactor)
+        self.__watermarks = ReadWatermarks(
+            configuration=WatermarkConfiguration(content_map=configuration.watermark_configuration()),
+            repository=message_repository,
+            forward=self.__forward_watermarks,
+            reactor=reactor)
         self.__command_bus: CommandBus = command_bus
+        self.__command_bus.add_handler(ParticipantArrivedCommand, self.__on_participant_arrived)
         self.__participant_repository: ParticipantRepository = participant_repository
         self.__message_repository: MessageRepository = message_repository
 
-    def fetch(self, identifier) -> Participant:
-        if identifier != self.__online_participants:
-            self.__fetch_details(identifier=identifier)
-        return self.__online_participants[identifier]
+    def fetch(self, identifier) -> Optional[Participant]:
+        """
+        Returns the participant if its details are cached, see `resolve`
+        """
+        return self.__profiles.peek(identifier=identifier)
+
+    def resolve(self, identifier: str) -> defer.Deferred:
+        """
+        Loads the details of a participant through the profile cache, the Deferred fires with
+        the participant or None when the account service could not provide them
+        """
+        return self.__profiles.resolve(identifier=identifier)
+
+    def profile_statistics(self) -> ProfileCacheStatistics:
+        return self.__profiles.statistics()
+
+    def contact_statistics(self) -> ContactIndexStatistics:
+        return self.__contacts.statistics()
+
+    def receipt_statistics(self) -> ReceiptStatistics:
+        return self.__receipts.statistics()
+
+    def watermark_statistics(self) -> WatermarkStatistics:
+        return self.__watermarks.statistics()
+
+    @EventListener(subject=PROFILE_CHANGED_SUBJECT, event_type=ProfileChanged)
+    def on_profile_changed(self, event: ProfileChanged) -> None:
+        self._debug("PROFILE CHANGED: {0}", event.identifier)
+        self.__profiles.invalidate(identifier=event.identifier)
 
     @EventListener(
         subject="v1/node/{}/participants/pass-over".format(Configuration.get_instance().node()),
         event_type=ParticipantPassOver
     )
     def on_external_participant_event(self, event: ParticipantPassOver) -> None:
-        self._info("SENDER            : {0}".format(event.sender_identifier))
-        self._info("TARGET            : {0}".format(event.target_identifier))
-        self._info("ORIGINATING NODE  : {0}".format(event.originating_node))
-        self._info("MARKER            : {0}".format(event.marker))
-
-        if event.target_identifier in self.__route_pairing:
-            target_identifier = self.__route_pairing[event.target_identifier]
+        self._info("SENDER            : {0}", event.sender_identifier)
+        self._info("TARGET            : {0}", event.target_identifier)
+        self._info("ORIGINATING NODE  : {0}", event.originating_node)
+        self._info("MARKER            : {0}", event.marker)
+
+        target: Optional[LocalParticipant] = self.__directory.find_by_routing(
+            routing_identifier=event.target_identifier)
+        if target is None:
+            return
+        target_identifier = target.participant_identifier
+        if event.response_type == ResponseType.READ_WATERMARK.value:
             self.__command_bus.handle(MessageDispatchCommand(
                 participant_identifier=target_identifier,
                 payload=event.payload,
-                response_type=ResponseType.RECEIVE_DIRECT_MESSAGE
+                response_type=ResponseType.READ_WATERMARK
             ))
-            self.__save_direct_message(
-                sender_identifier=event.sender_identifier,
-                target_identifier=target_identifier,
-                message=event.payload,
-                marker=event.marker
-            )
+            return
+        payload, _ = self.__stamp(payload=event.payload,
+                                  target_identifier=target_identifier,
+                                  sender_routing_identifier=event.sender_routing_identifier,
+                                  marker=event.marker)
+        # Handed to the target once saved, like the messages of local senders
+        self.__save_direct_message(
+            sender_identifier=event.sender_identifier,
+            target_identifier=target_identifier,
+            message=payload,
+            marker=event.marker
+        )
 
     def resolve_contacts(self, content: bytearray) -> bytearray:
         contact_batch_request = BatchContactMatchRequest()
@@ -100,41 +186,51 @@ class ParticipantService(LoggerMixin):
         resolved_contact_batch = self.__resolve_contacts(contact_batch_request=contact_batch_request)
         return resolved_contact_batch.SerializeToString()
 
+    def sync_contacts(self, participant_identifier: str, content: bytearray) -> bytes:
+        request = ContactSyncRequest()
+        request.ParseFromString(content)
+        return self.__contact_sync.sync(participant_identifier=participant_identifier,
+                                        request=request).SerializeToString()
+
     def __resolve_contacts(self, contact_batch_request: BatchContactMatchRequest) -> BatchContactMatchResponse:
         response = BatchContactMatchResponse()
-        for contact_request in contact_batch_request.requests:
-            if contact_request.type is ContactRequest.ContactType.EMAIL and \
-                    contact_request.value in self.__contact_pairing:
-                participant: Participant = self.__online_participants[self.__contact_pairing[contact_request.value]]
-                response.contacts.append(Contact(
-                    profile_picture_url=participant.photo_url,
-                    nickname=participant.nickname,
-                    identifier=participant.routing_identity
-                ))
-
+        for contact in self.__contacts.match(requests=contact_batch_request.requests,
+                                             country_code=contact_batch_request.country_code):
+            response.contacts.append(Contact(
+                profile_picture_url=contact.photo_url or "",
+                nickname=contact.nickname,
+                identifier=contact.routing_identifier
+            ))
         return response
 
-    def __fetch_details(self, identifier: str) -> None:
-        url: str = "{0}/{1}/{2}".format(
-            self.__configuration.account_service_url(),
-            "/api/v1/account-service/users/details",
+    def __load_participant(self, identifier: str) -> defer.Deferred:
+        deferred = self.__account_client.fetch_details(identifier=identifier)
+        deferred.addCallback(self.__on_details, identifier=identifier)
+        return deferred
+
+    def __on_details(self, content_map: Optional[Dict], identifier: str) -> Optional[Participant]:
+        if content_map is None:
+            return None
+        if not self.is_identity_known(participant_identifier=content_map['identifier']):
+            self.create_routing_identity(participant_identifier=content_map['identifier'])
+        routing_identifier = self.fetch_routing_identity(participant_identifier=content_map['identifier'])
+        participant = Participant(
+            routing_identity=routing_identifier,
+            content_map=content_map
         )
-        response: requests.Response = requests.get(url=url)
-        if response.status_code is not 200:
-            self._error("FAILED TO FETCH USER: {}".format(response.text))
-        else:
-            content_map: Dict = response.json()
-            if not self.is_identity_known(participant_identifier=content_map['identifier']):
-                self.create_routing_identity(participant_identifier=content_map['identifier'])
-            routing_identifier = self.fetch_routing_identity(participant_identifier=content_map['identifier'])
-            self.__online_participants[identifier] = Participant(
-                routing_identity=routing_identifier,
-                content_map=response.json()
-            )
-            self.__route_pairing[routing_identifier] = content_map['identity']
-            self.__contact_pairing[response.json()["email"]] = identifier
-            self._info("ADDED PARTICIPANT ENTRY FOR: {}".format(identifier))
-            get_client().register_participant(routing_identifier=routing_identifier)
+        self.__contacts.index(
+            contact=ContactRecord(participant_identifier=identifier,
+                                  routing_identifier=routing_identifier,
+                                  nickname=participant.nickname,
+                                  photo_url=participant.photo_url),
+            email_address=participant.email_address,
+            phone_number=content_map.get("phone_number"))
+        return participant
+
+    def __on_participant_arrived(self, command: ParticipantArrivedCommand) -> None:
+        self._info("ADDED PARTICIPANT ENTRY FOR: {}", command.participant_identifier)
+        self.__watermarks.forget(reader=command.participant_identifier)
+        get_client().register_participant(routing_identifier=command.routing_identifier)
 
     def is_identity_known(self, participant_identifier: str) -> bool:
         return self.__participant_repository.has_identity(participant_identifier=participant_identifier)
@@ -150,116 +246,275 @@ class ParticipantService(LoggerMixin):
             routing_identifier=routing_identifier)
 
     def relay_direct_message(self, sender_identifier: str, payload: bytearray) -> None:
+        if not self.__persistence.has_room(messages=1):
+            self.__refuse_direct_messages(sender_identifier=sender_identifier, payloads=[payload])
+            return
+        record, delivery_note = self.__route_direct_message(sender_identifier=sender_identifier,
+                                                            payload=payload,
+                                                            received_at=datetime.utcnow(),
+                                                            delivered_at=self.__receipts.timestamp(),
+                                                            marker=str(uuid.uuid4()))
+        if record is not None:
+            self.__persist(sender_identifier=sender_identifier, records=[record], delivery_notes=[delivery_note])
+        elif delivery_note is not None:
+            self.__receipts.add(sender_identifier=sender_identifier, delivery=delivery_note)
+
+    def relay_direct_messages(self, sender_identifier: str, payloads: List[bytearray]) -> None:
+        if not self.__persistence.has_room(messages=len(payloads)):
+            self.__refuse_direct_messages(sender_identifier=sender_identifier, payloads=payloads)
+            return
+        received_at = datetime.utcnow()
+        # One timestamp for every receipt of the batch, like its rows share received_at
+        delivered_at = self.__receipts.timestamp()
+        records: List[DirectMessageRecord] = []
+        delivery_notes: List[Delivery] = []
+        for payload, marker in zip(payloads, self.__markers(count=len(payloads))):
+            record, delivery_note = self.__route_direct_message(sender_identifier=sender_identifier,
+                                                                payload=payload,
+                                                                received_at=received_at,
+                                                                delivered_at=delivered_at,
+                                                                marker=marker)
+            if record is not None:
+                records.append(record)
+                delivery_notes.append(delivery_note)
+            elif delivery_note is not None:
+                self.__receipts.add(sender_identifier=sender_identifier, delivery=delivery_note)
+        if len(records) > 0:
+            self.__persist(sender_identifier=sender_identifier, records=records, delivery_notes=delivery_notes)
+
+    @staticmethod
+    def __markers(count: int) -> List[str]:
+        # The same version 4 identifiers uuid4 hands out, drawn from the system's randomness in a single read
+        randomness = os.urandom(16 * count)
+        return [str(uuid.UUID(bytes=randomness[offset:offset + 16], version=4)) for offset in range(0, 16 * count, 16)]
+
+    def __refuse_direct_messages(self, sender_identifier: str, payloads: List[bytearray]) -> None:
+        # Nothing was passed on yet, the sender can try again once the backlog is saved
+        self._warning("PERSISTENCE BACKLOG FULL, REFUSING {0} MESSAGES FROM {1}", len(payloads), sender_identifier,
+                      max_per_second=1)
+        for payload in payloads:
+            direct_message = DirectMessage()
+            direct_message.ParseFromString(bytes(payload))
+            self.__receipts.add(sender_identifier=sender_identifier,
+                                delivery=self.__delivery_note(target_identifier=direct_message.target_identifier,
+                                                              message="Server busy, try again later",
+                                                              marker="",
+                                                              status=Delivery.State.FAILED,
+                                                              sent_at=direct_message.sent_at))
+
+    def __persist(self, sender_identifier: str, records: List[DirectMessageRecord],
+                  delivery_notes: List[Delivery]) -> None:
+        """
+        Messages reach their targets and delivery receipts go out only once the messages are saved.
+        A sender told its message was delivered never has it lost, one told it failed can resend it
+        without the target getting it twice.
+        """
+        self.__persistence.save(messages=records).addCallbacks(
+            self.__on_persisted, self.__on_persist_failed,
+            callbackArgs=(sender_identifier, records, delivery_notes),
+            errbackArgs=(sender_identifier, delivery_notes))
+
+    def __on_persisted(self, _, sender_identifier: str, records: List[DirectMessageRecord],
+                       delivery_notes: List[Delivery]) -> None:
+        self.__dispatch_saved(records=records)
+        for delivery_note in delivery_notes:
+            self.__receipts.add(sender_identifier=sender_identifier, delivery=delivery_note)
+
+    def __on_persist_failed(self, reason: failure.Failure, sender_identifier: str,
+                            delivery_notes: List[Delivery]) -> None:
+        self._warning("COULD NOT SAVE {0} MESSAGES FROM {1} -> {2}", len(delivery_notes), sender_identifier,
+                      reason.getErrorMessage(), max_per_second=1)
+        for delivery_note in delivery_notes:
+            self.__receipts.add(sender_identifier=sender_identifier,
+                                delivery=self.__delivery_note(target_identifier=delivery_note.target_identifier,
+                                                              message="Failed to store the message",
+                                                              marker=delivery_note.marker,
+                                                              status=Delivery.State.FAILED,
+                                                              sent_at=delivery_note.sent_at,
+                                                              sequence=delivery_note.sequence))
+
+    def __route_direct_message(self, sender_identifier: str, payload: bytearray, received_at: datetime,
+                               delivered_at: Timestamp,
+                               marker: str) -> Tuple[Optional[DirectMessageRecord], Optional[Delivery]]:
+        # Inbound frames are views over the read buffer, protobuf and the transports want bytes
+        payload = bytes(payload)
         direct_message = DirectMessage()
         direct_message.ParseFromString(payload)
-        marker = str(uuid.uuid4())
-        if direct_message.target_identifier in self.__route_pairing:
-            target_identifier = self.__route_pairing[direct_message.target_identifier]
-            self.__command_bus.handle(MessageDispatchCommand(
-                participant_identifier=target_identifier,
+        sender: Optional[LocalParticipant] = self.__directory.find(participant_identifier=sender_identifier)
+        sender_routing_identifier = sender.routing_identifier if sender is not None else ""
+        target: Optional[LocalParticipant] = self.__directory.find_by_routing(
+            routing_identifier=direct_message.target_identifier)
+        if target is not None:
+            target_identifier = target.participant_identifier
+            payload, sequence = self.__stamp(payload=payload,
+                                             target_identifier=target_identifier,
+                                             sender_routing_identifier=sender_routing_identifier,
+                                             marker=marker)
+            record = DirectMessageRecord(
+                sender=sender_identifier,
+                target=target_identifier,
                 payload=payload,
-                response_type=ResponseType.RECEIVE_DIRECT_MESSAGE
-            ))
-            self.__save_direct_message(
-                sender_identifier=sender_identifier,
-                target_identifier=target_identifier,
-                message=payload,
+                received_at=received_at,
+                node=self.__configuration.node(),
                 marker=marker
             )
-            self.__report_delivery_success(sender_identifier=sender_identifier,
+            return record, self.__delivery_note(target_identifier=direct_message.target_identifier,
+                                                message="Successfully delivered message",
+                                                marker=marker,
+                                                status=Delivery.State.DELIVERED,
+                                                sent_at=delivered_at,
+                                                sequence=sequence)
+        node: str = self.__resolve_last_known_node(target_identifier=direct_message.target_identifier)
+        if node is None:
+            return None, self.__delivery_note(target_identifier=direct_message.target_identifier,
+                                              message="Failed to deliver the message :(",
+                                              marker="",
+                                              status=Delivery.State.FAILED,
+                                              sent_at=direct_message.sent_at)
+        self.__send_direct_message_to_node(node=node,
+                                           sender_identifier=sender_identifier,
+                                           sender_routing_identifier=sender_routing_identifier,
                                            target_identifier=direct_message.target_identifier,
-                                           marker=marker)
-        else:
-            node: str = self.__resolve_last_known_node(target_identifier=direct_message.target_identifier)
-            if node is None:
-                self.__report_delivery_failure(sender_identifier=sender_identifier,
-                                               target_identifier=direct_message.target_identifier,
-                                               delivery_failed_at=direct_message.sent_at)
-            else:
-                self.__send_direct_message_to_node(node=node,
-                                                   sender_identifier=sender_identifier,
-                                                   target_identifier=direct_message.target_identifier,
-                                                   marker=marker,
-                                                   payload=payload)
+                                           marker=marker,
+                                           payload=payload)
+        return None, None
+
+    def __stamp(self, payload: bytes, target_identifier: str, sender_routing_identifier: str,
+                marker: str) -> Tuple[bytes, int]:
+        """
+        Numbers the message in the conversation of its target and tells the target who sent it.
+        Fields of a protobuf message are replaced by the ones that come after them, appending
+        them spares parsing and serializing the whole message again.
+        """
+        if not sender_routing_identifier:
+            return payload, 0
+        sequence = self.__watermarks.next_sequence(reader=target_identifier, conversation=sender_routing_identifier)
+        return payload + DirectMessage(sender_identifier=sender_routing_identifier,
+                                       marker=marker,
+                                       sequence=sequence).SerializeToString(), sequence
+
+    def read_up_to(self, participant_identifier: str, content: bytes) -> None:
+        reader: Optional[LocalParticipant] = self.__directory.find(participant_identifier=participant_identifier)
+        if reader is None:
+            return
+        watermark = ReadWatermark()
+        watermark.ParseFromString(content)
+        self.__watermarks.read(reader=participant_identifier,
+                               reader_routing_identifier=reader.routing_identifier,
+                               watermark=watermark)
+
+    def unread_counts(self, participant_identifier: str) -> bytes:
+        counts = UnreadCounts()
+        for conversation, state in self.__watermarks.unread(reader=participant_identifier):
+            counts.conversations.append(UnreadCount(conversation_identifier=conversation,
+                                                    unread=state.unread,
+                                                    read_sequence=state.read_sequence,
+                                                    last_sequence=state.last_sequence))
+        return counts.SerializeToString()
+
+    def __forward_watermarks(self, sender_routing_identifier: str, payload: bytes) -> None:
+        sender: Optional[LocalParticipant] = self.__directory.find_by_routing(
+            routing_identifier=sender_routing_identifier)
+        if sender is not None:
+            self.__command_bus.handle(MessageDispatchCommand(
+                participant_identifier=sender.participant_identifier,
+                payload=payload,
+                response_type=ResponseType.READ_WATERMARK
+            ))
+            return
+        node: Optional[str] = self.__resolve_last_known_node(target_identifier=sender_routing_identifier)
+        if node is None:
+            # Stored for the reader all the same, the sender only misses the live update
+            return
+        get_client().passover_direct_message_to(node=node, passover=ParticipantPassOver(
+            originating_node=self.__configuration.node(),
+            target_identifier=sender_routing_identifier,
+            payload=payload,
+            response_type=ResponseType.READ_WATERMARK.value
+        ))
+
+    def resolve_local_participant(self, routing_identifier: str) -> Optional[str]:
+        target: Optional[LocalParticipant] = self.__directory.find_by_routing(routing_identifier=routing_identifier)
+        return target.participant_identifier if target is not None else None
+
+    def local_routing_identifier(self, participant_identifier: str) -> Optional[str]:
+        participant: Optional[LocalParticipant] = self.__directory.find(participant_identifier=participant_identifier)
+        return participant.routing_identifier if participant is not None else None
+
+    def local_connections(self, participant_identifier: str) -> Tuple:
+        participant: Optional[LocalParticipant] = self.__directory.find(participant_identifier=participant_identifier)
+        return participant.connections if participant is not None else ()
+
+    def store_undelivered(self, participant_identifier: str, response_type: ResponseType, payload: bytes) -> None:
+        self.__message_repository.store_undelivered(
+            participant_identifier=participant_identifier,
+            response_type=response_type.value,
+            payload=payload,
+            stored_at=datetime.utcnow()
+        )
+
+    def drain_undelivered(self, participant_identifier: str) -> List[Tuple[ResponseType, bytes]]:
+        return [(ResponseType(response_type), payload) for response_type, payload in
+                self.__message_repository.drain_undelivered(participant_identifier=participant_identifier)]
 
     def save_device_information(self, participant_identifier: str, device_information: DeviceDetails) -> None:
         self.__participant_repository.add_device(participant_identifier=participant_identifier,
                                                  device=device_information)
 
+    def __dispatch_saved(self, records: List[DirectMessageRecord]) -> None:
+        for record in records:
+            # Records hold the stamped payload and the participant identifier of the target
+            self.__command_bus.handle(MessageDispatchCommand(
+                participant_identifier=record.target,
+                payload=record.payload,
+                response_type=ResponseType.RECEIVE_DIRECT_MESSAGE
+            ))
+
     def __save_direct_message(self, sender_identifier: str, target_identifier: str, message: bytearray,
                               marker: str) -> None:
         current_time = datetime.utcnow()
-        self.__message_repository.save(
+        record = DirectMessageRecord(
             sender=sender_identifier,
             target=target_identifier,
             payload=message,
             marker=marker,
-            received_at=current_time
+            received_at=current_time,
+            node=self.__configuration.node()
         )
+        self.__persistence.save(messages=[record]).addCallbacks(
+            self.__on_passover_persisted, self.__on_passover_persist_failed,
+            callbackArgs=([record],),
+            errbackKeywords={'marker': marker})
 
-    def __report_delivery_success(
-            self,
-            sender_identifier: str,
-            target_identifier: str,
-            marker: str) -> None:
-        utc_now = datetime.utcnow()
-        current_time = Timestamp()
-        current_time.FromDatetime(utc_now)
-        self.__send_delivery_status(
-            sender_identifier=sender_identifier,
-            target_identifier=target_identifier,
-            message="Successfully delivered message",
-            marker=marker,
-            status=Delivery.State.FAILED,
-            sent_at=current_time
-        )
-
-    def __report_message_read(self, sender_identifier: str,
-                              target_identifier: str,
-                              marker: str) -> None:
-        utc_now = datetime.utcnow()
-        current_time = Timestamp()
-        current_time.FromDatetime(utc_now)
-        self.__send_delivery_status(
-            sender_identifier=sender_identifier,
-            target_identifier=target_identifier,
-            message="Successfully delivered message",
-            marker=marker,
-            status=Delivery.State.READ,
-            sent_at=current_time
-        )
+    def __on_passover_persisted(self, _, records: List[DirectMessageRecord]) -> None:
+        self.__dispatch_saved(records=records)
 
-    def __report_delivery_failure(self, sender_identifier: str,
-                                  target_identifier: str,
-                                  sender_timestamp: Timestamp) -> None:
-        self.__send_delivery_status(
-            sender_identifier=sender_identifier,
-            target_identifier=target_identifier,
-            message="Failed to deliver the message :(",
-            marker="",
-            status=Delivery.State.FAILED,
-            sent_at=sender_timestamp
-        )
+    def __on_passover_persist_failed(self, reason: failure.Failure, marker: str) -> None:
+        # The sender is on another node and was never promised a receipt for it
+        self._warning("COULD NOT SAVE PASSED OVER MESSAGE {0}, NOT DELIVERED -> {1}", marker,
+                      reason.getErrorMessage(), max_per_second=1)
 
-    def __send_delivery_status(self,
-                               sender_identifier: str,
-                               target_identifier: str,
-                               message: str,
-                               marker: str,
-                               status: Delivery.State,
-                               sender_timestamp: Timestamp) -> None:
-        delivery_note: Delivery = Delivery(
+    @staticmethod
+    def __delivery_note(target_identifier: str,
+                        message: str,
+                        marker: str,
+                        status: Delivery.State,
+                        sent_at: Timestamp,
+                        sequence: int = 0) -> Delivery:
+        return Delivery(
             message=message,
             state=status,
             marker=marker,
             target_identifier=target_identifier,
-            sent_at=sender_timestamp
+            sent_at=sent_at,
+            sequence=sequence
         )
+
+    def __dispatch_receipts(self, sender_identifier: str, response_type: ResponseType, payload: bytes) -> None:
         self.__command_bus.handle(MessageDispatchCommand(
-            participant_identifier=self.__route_pairing[sender_identifier],
-            payload=delivery_note.SerializeToString(),
-            response_type=ResponseType.DELIVERY_STATE,
-            sent_at=sender_timestamp
+            participant_identifier=sender_identifier,
+            payload=payload,
+            response_type=response_type
         ))
 
     @staticmethod
@@ -267,53 +522,148 @@ class ParticipantService(LoggerMixin):
         client: ParticipantClient = get_client()
         return client.fetch_last_known_node(target_identifier=target_identifier)
 
-    @staticmethod
-    def __send_direct_message_to_node(node: str,
+    def __send_direct_message_to_node(self,
+                                      node: str,
                                       sender_identifier: str,
+                                      sender_routing_identifier: str,
                                       target_identifier: str,
+                                      marker: str,
                                       payload: bytearray) -> None:
         client: ParticipantClient = get_client()
         passover: ParticipantPassOver = ParticipantPassOver(
-            originating_node=node,
+            originating_node=self.__configuration.node(),
             sender_identifier=sender_identifier,
+            sender_routing_identifier=sender_routing_identifier,
             target_identifier=target_identifier,
+            marker=marker,
             payload=payload
         )
-        client.passover_direct_message_to(passover=passover)
+        client.passover_direct_message_to(node=node, passover=passover)
 
 
+@implementer(IPushProducer)
 class ConnectedClientProtocol(ClientConnection, LoggerMixin):
 
-    def __init__(self, registry: ConnectionRegistry, participant_service: ParticipantService):
+    def __init__(self,
+                 registry: ConnectionRegistry,
+                 source_address: str,
+                 participant_service: ParticipantService,
+                 transfer_service: TransferService,
+                 transport_configuration: TransportConfiguration,
+                 reactor: IReactorTime):
         self.registry: ConnectionRegistry = registry
+        self.__source_address = source_address
         self.__participant_service = participant_service
+        self.__transfer_service = transfer_service
         self.__unique_identifier: str = str(uuid.uuid4())
         self.__participant_identifier: Optional[str] = None
         self.__device_information: Optional[DeviceDetails] = None
-
-    def dataReceived(self, data: bytearray):
-        self._info("GOT A CONTROL MESSAGE")
-        header = data[0:MESSAGE_HEADER]
-        (message_type_value, message_size) = struct.unpack("!HL", header)
-        self._info("CTRL -> {0} SIZE -> {1}".format(message_type_value, message_size))
-        payload: bytes = data[MESSAGE_HEADER: message_size + MESSAGE_HEADER]
-        self.__process_message(message_type=RequestType(message_type_value), payload=payload)
+        self.__transport_configuration = transport_configuration
+        self.__reactor = reactor
+        self.__decoder = FrameDecoder(max_frame_size=transport_configuration.max_frame_size)
+        self.__writer: Optional[FrameWriter] = None
+        self.__inflater: Optional[FrameInflater] = None
+        self.__dropped_frames: int = 0
+        self.__stored_frames: int = 0
+        self.__disconnecting: bool = False
+        # Turned away before it ever reached the registry
+        self.__refused: bool = False
+        # Requests that arrive while the identity token is still being decrypted
+        self.__held_requests: Optional[List[Tuple[RequestType, bytes]]] = None
+
+    def dataReceived(self, data: bytes):
+        try:
+            frames = self.__decoder.feed(data=data)
+        except FrameSizeExceeded as error:
+            self._error("DROPPING CONNECTION: {0} -> {1}", self.__unique_identifier, error)
+            self.transport.loseConnection()
+            return
+        self.registry.record_activity(connection=self)
+        for frame in frames:
+            self._debug("CTRL -> {0} SIZE -> {1}", frame.message_type, len(frame.payload))
+            try:
+                message_type = RequestType(frame.message_type)
+            except ValueError:
+                self._warning("UNKNOWN CONTROL MESSAGE: {0}", frame.message_type, max_per_second=1)
+                continue
+            payload = frame.payload
+            if frame.compressed:
+                if self.__inflater is None:
+                    self._error("DROPPING CONNECTION: {0} -> COMPRESSION WAS NOT NEGOTIATED",
+                                self.__unique_identifier)
+                    self.transport.loseConnection()
+                    return
+                try:
+                    payload = self.__inflater.inflate(payload=payload)
+                except (FrameSizeExceeded, zlib.error) as error:
+                    self._error("DROPPING CONNECTION: {0} -> {1}", self.__unique_identifier, error)
+                    self.transport.loseConnection()
+                    return
+            if self.__held_requests is not None and message_type is not RequestType.PING:
+                self.__hold_request(message_type=message_type, payload=payload)
+                continue
+            self.__process_message(message_type=message_type, payload=payload)
+
+    def __hold_request(self, message_type: RequestType, payload: bytes) -> None:
+        if len(self.__held_requests) >= self.__transport_configuration.max_queued_frames:
+            self.disconnect(error="TOO-MANY-REQUESTS", details="Too many requests were sent ahead of identification")
+            return
+        self.__held_requests.append((message_type, bytes(payload)))
+
+    def __on_identification_settled(self, accepted: bool) -> None:
+        held_requests = self.__held_requests or []
+        self.__held_requests = None
+        if not accepted:
+            # Whatever was sent on the strength of the rejected identity goes with it
+            return
+        self.__forward_undelivered()
+        for index, (message_type, payload) in enumerate(held_requests):
+            if self.__disconnecting or not self.connected:
+                return
+            if self.__held_requests is not None:
+                # Identifying again, the rest waits on that
+                self.__held_requests.extend(held_requests[index:])
+                return
+            self.__process_message(message_type=message_type, payload=payload)
 
     def connectionMade(self):
         # Send a request for identification information
         self._info("CONNECTION RECEIVED")
-        self.registry.add_to_pending_identification(self)
+        self.__writer = FrameWriter(transport=self.transport,
+                                    reactor=self.__reactor,
+                                    flush_threshold=self.__transport_configuration.flush_threshold,
+                                    max_queued_bytes=self.__transport_configuration.max_queued_bytes,
+                                    max_queued_frames=self.__transport_configuration.max_queued_frames)
+        self.transport.registerProducer(self, True)
+        retry_after = self.registry.add_to_pending_identification(self)
+        if retry_after is not None:
+            self.__refused = True
+            self.disconnect(error="SERVER-BUSY", details="Too many connections are waiting on identification",
+                            retry_after=retry_after)
+            return
         self.send_message(response_type=ResponseType.REQUEST_IDENTITY, payload="".encode())
 
     def connectionLost(self, reason: failure.Failure = connectionDone):
         self._info("CONNECTION HAS BEEN LOST")
-        self.registry.remove(self)
+        if not self.__refused:
+            self.registry.remove(self)
+        self.__transfer_service.abort_all(connection=self)
+        self.__writer.discard()
 
     def __process_message(self, message_type: RequestType, payload: bytearray) -> None:
-        self._info("PROCESSING CONTROL MESSAGE: {0} {1}".format(message_type, payload))
+        self._debug("PROCESSING CONTROL MESSAGE: {0} {1}", message_type, payload)
+        if self.__participant_identifier is None and message_type not in ANONYMOUS_REQUESTS:
+            self._warning("IGNORING {0} BEFORE IDENTIFICATION: {1}", message_type, self.__unique_identifier,
+                          max_per_second=1)
+            return
         if message_type == RequestType.IDENTITY:
             self._info("CONTROL MESSAGE IS IDENTITY")
-            self.registry.register(connection=self, payload=payload)
+            self.__held_requests = []
+            self.registry.register(connection=self, payload=payload).addCallback(self.__on_identification_settled)
+        elif message_type == RequestType.RESUME:
+            self._info("CONTROL MESSAGE IS RESUME")
+            self.__held_requests = []
+            self.registry.resume(connection=self, payload=payload).addCallback(self.__on_identification_settled)
         elif message_type == RequestType.DISCONNECT:
             self._info("CONTROL MESSAGE IS DISCONNECT")
             self.registry.remove(self)
@@ -321,17 +671,138 @@ class ConnectedClientProtocol(ClientConnection, LoggerMixin):
             self._info("MATCHING YOUR CONTACTS")
             response: bytearray = self.__participant_service.resolve_contacts(content=payload)
             self.send_message(response_type=ResponseType.CONTACT_BATCH, payload=response)
+        elif message_type == RequestType.SYNC_CONTACTS:
+            self._debug("SYNCING YOUR CONTACTS")
+            synced: bytes = self.__participant_service.sync_contacts(
+                participant_identifier=self.__participant_identifier,
+                content=payload)
+            self.send_message(response_type=ResponseType.CONTACT_SYNC, payload=synced)
+        elif message_type == RequestType.READ_WATERMARK:
+            self.__participant_service.read_up_to(participant_identifier=self.__participant_identifier,
+                                                  content=payload)
+        elif message_type == RequestType.FETCH_UNREAD:
+            self.send_message(response_type=ResponseType.UNREAD_COUNTS,
+                              payload=self.__participant_service.unread_counts(
+                                  participant_identifier=self.__participant_identifier))
         elif message_type == RequestType.DIRECT_MESSAGE:
-            self._info("SENDING DIRECT MESSAGE")
+            self._debug("SENDING DIRECT MESSAGE")
             self.__participant_service.relay_direct_message(
                 sender_identifier=self.__participant_identifier,
                 payload=payload
             )
+        elif message_type == RequestType.BATCH:
+            self._debug("PROCESSING REQUEST BATCH")
+            self.__process_batch(payload=payload)
+        elif message_type == RequestType.TRANSFER_OFFER:
+            self._info("STARTING TRANSFER")
+            self.__transfer_service.offer(connection=self, payload=payload)
+        elif message_type == RequestType.TRANSFER_CHUNK:
+            self.__transfer_service.receive_chunk(connection=self, payload=payload)
+        elif message_type == RequestType.PING:
+            self.send_message(response_type=ResponseType.PONG, payload=payload)
+
+    def __process_batch(self, payload: bytearray) -> None:
+        batch = RequestBatch()
+        batch.ParseFromString(payload)
+        direct_messages: List[bytes] = []
+        for request in batch.requests:
+            if request.type == RequestType.DIRECT_MESSAGE.value:
+                direct_messages.append(request.payload)
+                continue
+            # Keep the order of the batch, anything queued ahead of another request is relayed first
+            self.__relay_direct_messages(payloads=direct_messages)
+            direct_messages = []
+            if request.type in (RequestType.BATCH.value, RequestType.IDENTITY.value, RequestType.RESUME.value):
+                self._warning("IGNORING REQUEST IN BATCH: {0}", request.type, max_per_second=1)
+                continue
+            try:
+                message_type = RequestType(request.type)
+            except ValueError:
+                self._warning("UNKNOWN CONTROL MESSAGE IN BATCH: {0}", request.type, max_per_second=1)
+                continue
+            self.__process_message(message_type=message_type, payload=request.payload)
+        self.__relay_direct_messages(payloads=direct_messages)
+
+    def __relay_direct_messages(self, payloads: List[bytes]) -> None:
+        if len(payloads) == 0:
+            return
+        self.__participant_service.relay_direct_messages(
+            sender_identifier=self.__participant_identifier,
+            payloads=payloads
+        )
 
     def send_message(self, response_type: ResponseType, payload: bytearray) -> None:
-        self._info("SENDING CONTROL MESSAGE: {} {}".format(response_type, payload))
-        packet = struct.pack("!HL", response_type.value, len(payload)) + payload
-        self.transport.write(data=packet)
+        self._debug("SENDING CONTROL MESSAGE: {} {}", response_type, payload)
+        if self.__writer.write(message_type=response_type.value, payload=payload):
+            return
+        self.__on_slow_consumer(response_type=response_type, payload=payload)
+
+    def pauseProducing(self) -> None:
+        self._warning("OUTBOUND BUFFER FULL, HOLDING FRAMES FOR: {}", self.__unique_identifier, max_per_second=1)
+        self.__writer.pause()
+
+    def resumeProducing(self) -> None:
+        self.__writer.resume()
+
+    def stopProducing(self) -> None:
+        self.__writer.discard()
+
+    def outbound_statistics(self) -> OutboundStatistics:
+        return OutboundStatistics(
+            queued_bytes=self.__writer.buffered() if self.__writer is not None else 0,
+            queued_frames=self.__writer.queued() if self.__writer is not None else 0,
+            dropped_frames=self.__dropped_frames,
+            stored_frames=self.__stored_frames
+        )
+
+    def __on_slow_consumer(self, response_type: ResponseType, payload: bytes) -> None:
+        policy: SlowConsumerPolicy = self.__transport_configuration.slow_consumer_policy
+        if policy is not SlowConsumerPolicy.DISCONNECT and response_type in EPHEMERAL_RESPONSES:
+            self.__dropped_frames += 1
+            return
+        if policy is SlowConsumerPolicy.STORE_AND_FORWARD and \
+                response_type is ResponseType.RECEIVE_DIRECT_MESSAGE and \
+                self.__participant_identifier is not None:
+            self.__participant_service.store_undelivered(participant_identifier=self.__participant_identifier,
+                                                         response_type=response_type,
+                                                         payload=payload)
+            self.__stored_frames += 1
+            return
+        self.__dropped_frames += 1
+        self._warning("DISCONNECTING SLOW CONSUMER: {0} -> {1}", self.__unique_identifier,
+                      self.outbound_statistics())
+        self.disconnect(error="SLOW-CONSUMER", details="The outbound queue for this connection is full")
+
+    def disconnect(self, error: str, details: str, retry_after: int = 0) -> None:
+        if self.__disconnecting:
+            return
+        self.__disconnecting = True
+        failure_notice = Failure(
+            error=error,
+            details=details,
+            occurred_at=ConnectionRegistry.current_timestamp(),
+            retry_after=retry_after
+        )
+        self.__writer.discard()
+        self.__writer.write(message_type=ResponseType.FAILURE.value,
+                            payload=failure_notice.SerializeToString(),
+                            force=True)
+        self.__writer.flush(force=True)
+        self.transport.loseConnection()
+
+    def abort(self) -> None:
+        self.__writer.discard()
+        self.transport.abortConnection()
+
+    def when_flushed(self) -> defer.Deferred:
+        return self.__writer.when_flushed()
+
+    def __forward_undelivered(self) -> None:
+        if self.__participant_identifier is None:
+            return
+        for response_type, payload in self.__participant_service.drain_undelivered(
+                participant_identifier=self.__participant_identifier):
+            self.send_message(response_type=response_type, payload=payload)
 
     def resolve_participant(self, identifier: str, device_information: DeviceDetails) -> bool:
         self.__participant_identifier = identifier
@@ -341,6 +812,17 @@ class ConnectedClientProtocol(ClientConnection, LoggerMixin):
             device_information=self.__device_information
         )
 
+    def supported_capabilities(self) -> List[int]:
+        if self.__transport_configuration.compression_enabled:
+            return [Capability.ZLIB_COMPRESSION]
+        return []
+
+    def enable_capabilities(self, capabilities: List[int]) -> None:
+        if Capability.ZLIB_COMPRESSION in capabilities:
+            self.__inflater = FrameInflater(max_frame_size=self.__transport_configuration.max_frame_size)
+            self.__writer.enable_compression(threshold=self.__transport_configuration.compression_threshold,
+                                             level=self.__transport_configuration.compression_level)
+
     def participant_identifier(self) -> Optional[str]:
         return self.__participant_identifier
 
@@ -350,8 +832,24 @@ class ConnectedClientProtocol(ClientConnection, LoggerMixin):
     def unique_identifier(self):
         return self.__unique_identifier
 
+    def source_address(self) -> str:
+        return self.__source_address
+
+    def load_profile(self, participant_identifier: str) -> defer.Deferred:
+        return self.__participant_service.resolve(identifier=participant_identifier).addCallback(
+            lambda participant: participant is not None)
+
     def nickname(self):
-        return self.__participant_service.fetch(identifier=self.__participant_identifier).nickname
+        # Unidentified connections have no participant to look up
+        participant = self.__participant_service.fetch(identifier=self.__participant_identifier)
+        return participant.nickname if participant is not None else None
 
     def routing_identity(self) -> Optional[str]:
-        return self.__participant_service.fetch(identifier=self.__participant_identifier).routing_identity
+        # Held by the directory for as long as the participant stays connected, unlike the cached profile
+        routing_identifier = self.__participant_service.local_routing_identifier(
+            participant_identifier=self.__participant_identifier)
+        if routing_identifier is not None:
+            return routing_identifier
+        # Not in the directory until it is accepted, the profile was loaded just before that
+        participant = self.__participant_service.fetch(identifier=self.__participant_identifier)
+        return participant.routing_identity if participant is not None else None
@@ -0,0 +1,198 @@
+import sys
+from collections import OrderedDict
+from itertools import islice
+from typing import Callable, Dict, List, NamedTuple, Optional, Set
+
+from twisted.internet import defer
+from twisted.python import failure
+
+from app.core.logging.loggers import LoggerMixin
+
+PROFILE_CACHE_SIZE = int(100000)
+PROFILE_TTL = float(300.0)
+NEGATIVE_TTL = float(30.0)
+STALE_TTL = float(3600.0)
+# Entries weighed to estimate the memory of the whole cache
+MEMORY_SAMPLE = int(256)
+
+
+class ProfileCacheConfiguration(object):
+    def __init__(self, content_map: Dict):
+        self.capacity = int(content_map.get("capacity", PROFILE_CACHE_SIZE))
+        self.ttl = float(content_map.get("ttl", PROFILE_TTL))
+        self.negative_ttl = float(content_map.get("negative_ttl", NEGATIVE_TTL))
+        self.stale_ttl = float(content_map.get("stale_ttl", STALE_TTL))
+
+
+class ProfileCacheStatistics(NamedTuple):
+    hits: int
+    stale_hits: int
+    negative_hits: int
+    misses: int
+    refreshes: int
+    evictions: int
+    invalidations: int
+    size: int
+    memory: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.stale_hits + self.negative_hits + self.misses
+        return (self.hits + self.stale_hits + self.negative_hits) / lookups if lookups else 0.0
+
+
+class ProfileEntry(object):
+    __slots__ = ("profile", "fresh_until", "stale_until")
+
+    def __init__(self, profile: Optional[object], fresh_until: float, stale_until: float):
+        self.profile = profile
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+
+
+class ProfileCache(LoggerMixin):
+    """
+    Keeps participant profiles for `ttl` seconds in a least recently used map of at most
+    `capacity` entries. Unknown participants are remembered as such for `negative_ttl`.
+    Once a profile goes past its ttl it is still served for up to `stale_ttl` while a
+    single refresh runs in the background, and it stays served if the refresh fails.
+    Profiles missing altogether are loaded once however many lookups wait on them.
+    The `loader` fires with the profile, None for an unknown participant, or fails when
+    the profile could not be had.
+    """
+
+    def __init__(self, configuration: ProfileCacheConfiguration, loader: Callable[[str], defer.Deferred], reactor):
+        self.__configuration = configuration
+        self.__loader = loader
+        self.__reactor = reactor
+        self.__entries: 'OrderedDict[str, ProfileEntry]' = OrderedDict()
+        self.__loading: Dict[str, List[defer.Deferred]] = {}
+        # Changed while being loaded, whatever the load brings back may already be outdated
+        self.__invalidated: Set[str] = set()
+        self.__hits: int = 0
+        self.__stale_hits: int = 0
+        self.__negative_hits: int = 0
+        self.__misses: int = 0
+        self.__refreshes: int = 0
+        self.__evictions: int = 0
+        self.__invalidations: int = 0
+
+    def peek(self, identifier: str) -> Optional[object]:
+        """
+        Returns the cached profile without waiting on a load, refreshing it in the background when stale
+        """
+        entry = self.__entries.get(identifier)
+        if entry is None:
+            return None
+        now = self.__reactor.seconds()
+        if entry.stale_until <= now:
+            return None
+        if entry.fresh_until <= now:
+            self.__load(identifier=identifier)
+        return entry.profile
+
+    def resolve(self, identifier: str) -> defer.Deferred:
+        entry = self.__entries.get(identifier)
+        now = self.__reactor.seconds()
+        if entry is not None and entry.stale_until > now:
+            self.__entries.move_to_end(identifier)
+            if entry.fresh_until > now:
+                if entry.profile is None:
+                    self.__negative_hits += 1
+                else:
+                    self.__hits += 1
+            else:
+                self.__stale_hits += 1
+                self.__load(identifier=identifier)
+            return defer.succeed(entry.profile)
+        self.__misses += 1
+        deferred = defer.Deferred()
+        self.__load(identifier=identifier).append(deferred)
+        return deferred
+
+    def invalidate(self, identifier: str) -> None:
+        if identifier in self.__loading:
+            self.__invalidated.add(identifier)
+        if self.__entries.pop(identifier, None) is not None:
+            self.__invalidations += 1
+
+    def statistics(self) -> ProfileCacheStatistics:
+        return ProfileCacheStatistics(
+            hits=self.__hits,
+            stale_hits=self.__stale_hits,
+            negative_hits=self.__negative_hits,
+            misses=self.__misses,
+            refreshes=self.__refreshes,
+            evictions=self.__evictions,
+            invalidations=self.__invalidations,
+            size=len(self.__entries),
+            memory=self.__estimate_memory()
+        )
+
+    def __load(self, identifier: str) -> List[defer.Deferred]:
+        waiting = self.__loading.get(identifier)
+        if waiting is not None:
+            return waiting
+        waiting = []
+        self.__loading[identifier] = waiting
+        if identifier in self.__entries:
+            self.__refreshes += 1
+        self.__loader(identifier).addCallbacks(self.__on_loaded, self.__on_load_failed,
+                                               callbackArgs=(identifier,), errbackArgs=(identifier,))
+        return waiting
+
+    def __on_loaded(self, profile: Optional[object], identifier: str) -> None:
+        now = self.__reactor.seconds()
+        if profile is None:
+            entry = ProfileEntry(profile=None, fresh_until=now + self.__configuration.negative_ttl,
+                                 stale_until=now + self.__configuration.negative_ttl)
+        else:
+            entry = ProfileEntry(profile=profile, fresh_until=now + self.__configuration.ttl,
+                                 stale_until=now + self.__configuration.ttl + self.__configuration.stale_ttl)
+        if identifier in self.__invalidated:
+            self.__invalidated.discard(identifier)
+        elif self.__configuration.capacity > 0:
+            self.__entries[identifier] = entry
+            self.__entries.move_to_end(identifier)
+            while len(self.__entries) > self.__configuration.capacity:
+                self.__entries.popitem(last=False)
+                self.__evictions += 1
+        self.__settle(identifier=identifier, profile=profile)
+
+    def __on_load_failed(self, reason: failure.Failure, identifier: str) -> None:
+        self.__invalidated.discard(identifier)
+        self._warning("PROFILE LOAD FAILED FOR: {0} -> {1}", identifier, reason.getErrorMessage(), max_per_second=1)
+        entry = self.__entries.get(identifier)
+        now = self.__reactor.seconds()
+        if entry is None or entry.stale_until <= now:
+            self.__settle(identifier=identifier, profile=None)
+            return
+        # Whatever is still servable beats nothing while the account service is down, try it again a little later
+        entry.fresh_until = min(now + self.__configuration.negative_ttl, entry.stale_until)
+        self.__settle(identifier=identifier, profile=entry.profile)
+
+    def __settle(self, identifier: str, profile: Optional[object]) -> None:
+        for deferred in self.__loading.pop(identifier, []):
+            deferred.callback(profile)
+
+    def __estimate_memory(self) -> int:
+        if not self.__entries:
+            return sys.getsizeof(self.__entries)
+        sample = list(islice(reversed(self.__entries.items()), MEMORY_SAMPLE))
+        sampled = sum(self.__entry_size(identifier=identifier, entry=entry) for identifier, entry in sample)
+        return sys.getsizeof(self.__entries) + sampled * len(self.__entries) // len(sample)
+
+    @staticmethod
+    def __entry_size(identifier: str, entry: ProfileEntry) -> int:
+        size = sys.getsizeof(identifier) + sys.getsizeof(entry) + sys.getsizeof(entry.fresh_until) * 2
+        if entry.profile is not None:
+            size += sys.getsizeof(entry.profile)
+            owner = type(entry.profile).__name__.lstrip("_")
+            for attribute in getattr(entry.profile, "__slots__", ()):
+                if attribute.startswith("__"):
+                    # Private slots are stored under their mangled name
+                    attribute = "_{0}{1}".format(owner, attribute)
+                value = getattr(entry.profile, attribute, None)
+                if value is not identifier:
+                    size += sys.getsizeof(value)
+        return size
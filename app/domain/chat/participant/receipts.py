@@ -0,0 +1,87 @@
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from google.protobuf.timestamp_pb2 import Timestamp
+from twisted.internet.interfaces import IDelayedCall
+
+from app.domain.chat.messages.messages_pb2 import Delivery, DeliveryBatch
+from app.domain.chat.participant.connections import ConnectionRegistry
+from app.domain.chat.types import ResponseType
+
+FLUSH_DELAY = float(0.002)
+MAX_RECEIPTS = int(256)
+
+
+class ReceiptConfiguration(object):
+    def __init__(self, content_map: Dict):
+        self.flush_delay = float(content_map.get("flush_delay", FLUSH_DELAY))
+        self.max_receipts = int(content_map.get("max_receipts", MAX_RECEIPTS))
+
+
+class ReceiptStatistics(NamedTuple):
+    receipts: int
+    frames: int
+    pending: int
+
+    @property
+    def receipts_per_frame(self) -> float:
+        return self.receipts / self.frames if self.frames else 0.0
+
+
+class DeliveryReceipts(object):
+    """
+    Holds delivery receipts for `flush_delay` seconds, or until the next reactor tick when it is 0,
+    and sends the receipts gathered for a sender as one DELIVERY_BATCH frame. A lone receipt goes out
+    as the DELIVERY_STATE frame it always was, a sender reaching `max_receipts` is sent at once.
+    Receipts of one flush share the timestamp handed out by `timestamp`.
+    """
+
+    def __init__(self, configuration: ReceiptConfiguration, dispatch: Callable[[str, ResponseType, bytes], None],
+                 reactor):
+        self.__configuration = configuration
+        self.__dispatch = dispatch
+        self.__reactor = reactor
+        self.__pending: Dict[str, List[Delivery]] = {}
+        self.__flush_call: Optional[IDelayedCall] = None
+        self.__timestamp: Optional[Timestamp] = None
+        self.__receipts: int = 0
+        self.__frames: int = 0
+
+    def timestamp(self) -> Timestamp:
+        if self.__timestamp is None or self.__flush_call is None:
+            self.__timestamp = ConnectionRegistry.current_timestamp()
+        return self.__timestamp
+
+    def add(self, sender_identifier: str, delivery: Delivery) -> None:
+        receipts = self.__pending.setdefault(sender_identifier, [])
+        receipts.append(delivery)
+        self.__receipts += 1
+        if len(receipts) >= self.__configuration.max_receipts:
+            del self.__pending[sender_identifier]
+            self.__send(sender_identifier=sender_identifier, receipts=receipts)
+        elif self.__flush_call is None:
+            self.__flush_call = self.__reactor.callLater(self.__configuration.flush_delay, self.flush)
+
+    def flush(self) -> None:
+        if self.__flush_call is not None and self.__flush_call.active():
+            self.__flush_call.cancel()
+        self.__flush_call = None
+        self.__timestamp = None
+        pending = self.__pending
+        self.__pending = {}
+        for sender_identifier, receipts in pending.items():
+            self.__send(sender_identifier=sender_identifier, receipts=receipts)
+
+    def statistics(self) -> ReceiptStatistics:
+        return ReceiptStatistics(
+            receipts=self.__receipts,
+            frames=self.__frames,
+            pending=sum(len(receipts) for receipts in self.__pending.values())
+        )
+
+    def __send(self, sender_identifier: str, receipts: List[Delivery]) -> None:
+        self.__frames += 1
+        if len(receipts) == 1:
+            self.__dispatch(sender_identifier, ResponseType.DELIVERY_STATE, receipts[0].SerializeToString())
+            return
+        self.__dispatch(sender_identifier, ResponseType.DELIVERY_BATCH,
+                        DeliveryBatch(deliveries=receipts).SerializeToString())
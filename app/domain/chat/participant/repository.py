@@ -1,9 +1,30 @@
 import abc
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
 from app.domain.chat.participant.connections import DeviceDetails
 from app.domain.chat.participant.models import Identity
 
 
+class ContactRecord(NamedTuple):
+    participant_identifier: str
+    routing_identifier: str
+    nickname: str
+    photo_url: Optional[str]
+
+
+class ContactBucketRecord(NamedTuple):
+    bucket: int
+    bucket_count: int
+    digest: bytes
+    # Routing identifiers of the participants the contacts in the bucket matched
+    matches: List[str]
+
+
+class ContactRootRecord(NamedTuple):
+    bucket_count: int
+    root: bytes
+
+
 class ParticipantRepository(abc.ABC):
     @abc.abstractmethod
     def has_identity(self, participant_identifier: str) -> bool:
@@ -20,3 +41,30 @@ class ParticipantRepository(abc.ABC):
     @abc.abstractmethod
     def add_device(self, participant_identifier: str, device: DeviceDetails) -> None:
         pass
+
+    @abc.abstractmethod
+    def index_contacts(self, contact: ContactRecord, contact_hashes: List[Tuple[int, bytes]]) -> None:
+        """
+        Makes the participant matchable by exactly the given (contact type, contact hash) pairs
+        """
+        pass
+
+    @abc.abstractmethod
+    def match_contacts(self, contact_hashes: List[bytes]) -> Dict[bytes, ContactRecord]:
+        pass
+
+    @abc.abstractmethod
+    def fetch_contact_root(self, participant_identifier: str) -> Optional[ContactRootRecord]:
+        pass
+
+    @abc.abstractmethod
+    def fetch_contact_buckets(self, participant_identifier: str) -> List[ContactBucketRecord]:
+        pass
+
+    @abc.abstractmethod
+    def save_contact_buckets(self, participant_identifier: str, root: ContactRootRecord,
+                             buckets: List[ContactBucketRecord], emptied: List[int], reset: bool = False) -> None:
+        """
+        Stores the buckets and forgets the emptied ones, or every other bucket of the participant with `reset`
+        """
+        pass
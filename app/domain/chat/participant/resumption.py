@@ -0,0 +1,97 @@
+import hashlib
+import hmac
+import os
+import struct
+from typing import Dict, Optional
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from google.protobuf.message import DecodeError
+
+from app.domain.chat.participant.identification_pb2 import Device, ResumptionTicket
+
+RESUMPTION_ENABLED = bool(True)
+TICKET_LIFETIME = int(300)
+KEY_ROTATION_INTERVAL = int(3600)
+
+# Key epoch the ticket was sealed under, followed by the AES-GCM nonce
+TICKET_HEADER = struct.Struct("!Q12s")
+
+
+class ResumptionConfiguration(object):
+    def __init__(self, content_map: Dict):
+        self.enabled = bool(content_map.get("enabled", RESUMPTION_ENABLED))
+        self.ticket_lifetime = int(content_map.get("ticket_lifetime", TICKET_LIFETIME))
+        # A ticket has to outlive at most one rotation, it is only opened under the current or previous key
+        self.key_rotation_interval = max(int(content_map.get("key_rotation_interval", KEY_ROTATION_INTERVAL)),
+                                         self.ticket_lifetime)
+
+
+class ResumptionTickets(object):
+    """
+    Seals the identity of an accepted connection into a short lived ticket the client can
+    present instead of its token when it reconnects, so resuming costs one AES-GCM open
+    rather than an RSA decryption.
+    Keys are derived from `secret` for each rotation epoch, nodes and workers sharing the
+    secret open each other's tickets. Without a secret a random one is drawn and tickets
+    only resume on the process that issued them.
+    """
+
+    def __init__(self, configuration: ResumptionConfiguration, reactor, secret: Optional[bytes] = None):
+        self.__configuration = configuration
+        self.__reactor = reactor
+        self.__secret = secret or os.urandom(32)
+        self.__keys: Dict[int, AESGCM] = {}
+
+    def enabled(self) -> bool:
+        return self.__configuration.enabled
+
+    def issue(self, participant_identifier: str, device: Device, not_after: float) -> bytes:
+        """
+        Returns a ticket valid for the configured lifetime but never past `not_after`, the expiry of the token
+        """
+        now = self.__reactor.seconds()
+        ticket = ResumptionTicket(
+            participant_identifier=participant_identifier,
+            device=device,
+            expires_at=int(min(now + self.__configuration.ticket_lifetime, not_after)),
+            not_after=int(not_after)
+        )
+        epoch = self.__epoch(now=now)
+        nonce = os.urandom(12)
+        header = TICKET_HEADER.pack(epoch, nonce)
+        return header + self.__key(epoch=epoch).encrypt(nonce, ticket.SerializeToString(), header)
+
+    def open(self, sealed_ticket: bytes) -> Optional[ResumptionTicket]:
+        if not self.__configuration.enabled or len(sealed_ticket) <= TICKET_HEADER.size:
+            return None
+        now = self.__reactor.seconds()
+        header = sealed_ticket[:TICKET_HEADER.size]
+        epoch, nonce = TICKET_HEADER.unpack(header)
+        if epoch not in (self.__epoch(now=now), self.__epoch(now=now) - 1):
+            return None
+        try:
+            content = self.__key(epoch=epoch).decrypt(nonce, sealed_ticket[TICKET_HEADER.size:], header)
+        except InvalidTag:
+            return None
+        ticket = ResumptionTicket()
+        try:
+            ticket.ParseFromString(content)
+        except DecodeError:
+            return None
+        if ticket.expires_at <= now:
+            return None
+        return ticket
+
+    def __epoch(self, now: float) -> int:
+        return int(now // self.__configuration.key_rotation_interval)
+
+    def __key(self, epoch: int) -> AESGCM:
+        key = self.__keys.get(epoch)
+        if key is None:
+            derived = hmac.new(self.__secret, b"resumption-ticket" + struct.pack("!Q", epoch), hashlib.sha256)
+            key = AESGCM(derived.digest())
+            # Only the current and previous epochs are ever used
+            self.__keys = {known: value for known, value in self.__keys.items() if known >= epoch - 1}
+            self.__keys[epoch] = key
+        return key
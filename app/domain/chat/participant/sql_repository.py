@@ -1,10 +1,45 @@
+from typing import Dict, List, Optional, Tuple
+
 from sqlalchemy.exc import NoResultFound
 
 from app.core.database.connection import DataSource
 from app.core.logging.loggers import LoggerMixin
 from app.domain.chat.participant.connections import DeviceDetails
 from app.domain.chat.participant.models import Identity
-from app.domain.chat.participant.repository import ParticipantRepository
+from app.domain.chat.participant.repository import ParticipantRepository, ContactRecord, ContactBucketRecord, \
+    ContactRootRecord
+
+# Keeps every statement well below the bound parameter limits of sqlite and postgres
+HASHES_PER_QUERY: int = 500
+
+UPSERT_CONTACT: str = "INSERT INTO contact_index_tb" \
+                      "(contact_hash,contact_type,participant_identifier,routing_identifier,nickname,photo_url) " \
+                      "VALUES(:contact_hash,:contact_type,:participant_identifier,:routing_identifier,:nickname," \
+                      ":photo_url) " \
+                      "ON CONFLICT(contact_hash) DO UPDATE SET " \
+                      "contact_type=excluded.contact_type," \
+                      "participant_identifier=excluded.participant_identifier," \
+                      "routing_identifier=excluded.routing_identifier," \
+                      "nickname=excluded.nickname," \
+                      "photo_url=excluded.photo_url," \
+                      "updated_at=CURRENT_TIMESTAMP"
+UPSERT_CONTACT_BUCKET: str = "INSERT INTO contact_sync_tb(participant_identifier,bucket,bucket_count,digest,matches) " \
+                             "VALUES(:participant_identifier,:bucket,:bucket_count,:digest,:matches) " \
+                             "ON CONFLICT(participant_identifier,bucket) DO UPDATE SET " \
+                             "bucket_count=excluded.bucket_count," \
+                             "digest=excluded.digest," \
+                             "matches=excluded.matches," \
+                             "updated_at=CURRENT_TIMESTAMP"
+UPSERT_CONTACT_ROOT: str = "INSERT INTO contact_sync_root_tb(participant_identifier,bucket_count,root) " \
+                           "VALUES(:participant_identifier,:bucket_count,:root) " \
+                           "ON CONFLICT(participant_identifier) DO UPDATE SET " \
+                           "bucket_count=excluded.bucket_count," \
+                           "root=excluded.root," \
+                           "updated_at=CURRENT_TIMESTAMP"
+# Routing identifiers are uuids, they never hold one
+MATCH_SEPARATOR: str = ","
+MATCH_CONTACTS: str = "SELECT contact_hash, participant_identifier, routing_identifier, nickname, photo_url " \
+                      "FROM contact_index_tb WHERE contact_hash IN ({0})"
 
 
 class SQLParticipantRepository(ParticipantRepository, LoggerMixin):
@@ -41,3 +76,90 @@ class SQLParticipantRepository(ParticipantRepository, LoggerMixin):
             session.execute(statement=sql, params={'participant_identifier': participant_identifier,
                                                    'information': device.json})
 
+    def index_contacts(self, contact: ContactRecord, contact_hashes: List[Tuple[int, bytes]]) -> None:
+        params: Dict = {'participant_identifier': contact.participant_identifier}
+        kept: List[str] = []
+        for index, (_, contact_hash) in enumerate(contact_hashes):
+            kept.append(":hash_{}".format(index))
+            params['hash_{}'.format(index)] = contact_hash
+        # Hashes of an email address or phone number the participant no longer has
+        sql: str = "DELETE FROM contact_index_tb WHERE participant_identifier=:participant_identifier"
+        if kept:
+            sql += " AND contact_hash NOT IN ({0})".format(",".join(kept))
+        with self.__data_source.session as session:
+            session.execute(statement=sql, params=params)
+            for contact_type, contact_hash in contact_hashes:
+                session.execute(statement=UPSERT_CONTACT,
+                                params={'contact_hash': contact_hash,
+                                        'contact_type': contact_type,
+                                        'participant_identifier': contact.participant_identifier,
+                                        'routing_identifier': contact.routing_identifier,
+                                        'nickname': contact.nickname,
+                                        'photo_url': contact.photo_url})
+
+    def match_contacts(self, contact_hashes: List[bytes]) -> Dict[bytes, ContactRecord]:
+        matches: Dict[bytes, ContactRecord] = {}
+        if len(contact_hashes) == 0:
+            return matches
+        with self.__data_source.session as session:
+            for start in range(0, len(contact_hashes), HASHES_PER_QUERY):
+                params: Dict = {}
+                for index, contact_hash in enumerate(contact_hashes[start:start + HASHES_PER_QUERY]):
+                    params['hash_{}'.format(index)] = contact_hash
+                query: str = MATCH_CONTACTS.format(",".join(":{}".format(name) for name in params))
+                for row in session.execute(statement=query, params=params).fetchall():
+                    matches[bytes(row['contact_hash'])] = ContactRecord(
+                        participant_identifier=row['participant_identifier'],
+                        routing_identifier=row['routing_identifier'],
+                        nickname=row['nickname'],
+                        photo_url=row['photo_url'])
+        return matches
+
+    def fetch_contact_root(self, participant_identifier: str) -> Optional[ContactRootRecord]:
+        query: str = "SELECT bucket_count, root FROM contact_sync_root_tb " \
+                     "WHERE participant_identifier=:participant_identifier"
+        with self.__data_source.session as session:
+            row = session.execute(statement=query,
+                                  params={'participant_identifier': participant_identifier}).fetchone()
+        if row is None:
+            return None
+        return ContactRootRecord(bucket_count=row['bucket_count'], root=bytes(row['root']))
+
+    def fetch_contact_buckets(self, participant_identifier: str) -> List[ContactBucketRecord]:
+        query: str = "SELECT bucket, bucket_count, digest, matches FROM contact_sync_tb " \
+                     "WHERE participant_identifier=:participant_identifier"
+        with self.__data_source.session as session:
+            rows = session.execute(statement=query,
+                                   params={'participant_identifier': participant_identifier}).fetchall()
+        return [ContactBucketRecord(bucket=row['bucket'],
+                                    bucket_count=row['bucket_count'],
+                                    digest=bytes(row['digest']),
+                                    matches=row['matches'].split(MATCH_SEPARATOR) if row['matches'] else [])
+                for row in rows]
+
+    def save_contact_buckets(self, participant_identifier: str, root: ContactRootRecord,
+                             buckets: List[ContactBucketRecord], emptied: List[int], reset: bool = False) -> None:
+        with self.__data_source.session as session:
+            session.execute(statement=UPSERT_CONTACT_ROOT,
+                            params={'participant_identifier': participant_identifier,
+                                    'bucket_count': root.bucket_count,
+                                    'root': root.root})
+            if reset:
+                session.execute(statement="DELETE FROM contact_sync_tb "
+                                          "WHERE participant_identifier=:participant_identifier",
+                                params={'participant_identifier': participant_identifier})
+            elif emptied:
+                params: Dict = {'participant_identifier': participant_identifier}
+                for index, bucket in enumerate(emptied):
+                    params['bucket_{}'.format(index)] = bucket
+                session.execute(statement="DELETE FROM contact_sync_tb "
+                                          "WHERE participant_identifier=:participant_identifier AND bucket IN ({0})"
+                                .format(",".join(":bucket_{}".format(index) for index in range(len(emptied)))),
+                                params=params)
+            for bucket in buckets:
+                session.execute(statement=UPSERT_CONTACT_BUCKET,
+                                params={'participant_identifier': participant_identifier,
+                                        'bucket': bucket.bucket,
+                                        'bucket_count': bucket.bucket_count,
+                                        'digest': bucket.digest,
+                                        'matches': MATCH_SEPARATOR.join(bucket.matches)})
@@ -0,0 +1,255 @@
+import enum
+import os
+import tempfile
+import uuid
+from typing import Dict, Optional, BinaryIO, TYPE_CHECKING
+
+from pymessagebus import CommandBus
+from twisted.internet.defer import DeferredList
+
+from app.core.logging.loggers import LoggerMixin
+from app.domain.chat.messages.messages_pb2 import TransferOffer, TransferChunk, TransferCredit, DirectMessage, \
+    Attachment
+from app.domain.chat.participant.commands import MessageDispatchCommand
+from app.domain.chat.participant.connections import ClientConnection, ConnectionRegistry
+from app.domain.chat.types import ResponseType
+
+if TYPE_CHECKING:
+    from app.domain.chat.participant.participant import ParticipantService
+
+TRANSFER_WINDOW = int(8)
+MAX_TRANSFER_SIZE = int(512 * 1024 * 1024)
+MAX_TRANSFERS_PER_CONNECTION = int(4)
+SPOOL_DIRECTORY = os.path.join(tempfile.gettempdir(), "chat-service", "transfers")
+
+
+class TransferConfiguration(object):
+    def __init__(self, content_map: Dict):
+        self.spool_directory: str = content_map.get("spool_directory", SPOOL_DIRECTORY)
+        self.window = int(content_map.get("window", TRANSFER_WINDOW))
+        self.max_transfer_size = int(content_map.get("max_transfer_size", MAX_TRANSFER_SIZE))
+        self.max_transfers_per_connection = int(content_map.get("max_transfers_per_connection",
+                                                                MAX_TRANSFERS_PER_CONNECTION))
+
+
+class TransferMode(enum.Enum):
+    RELAY = "relay"
+    SPOOL = "spool"
+
+
+class Transfer(object):
+    def __init__(self, sender: ClientConnection, offer: TransferOffer, mode: TransferMode,
+                 target_participant: Optional[str]):
+        self.sender = sender
+        self.offer = offer
+        self.mode = mode
+        self.target_participant = target_participant
+        # Targets only ever see our identifier, two senders may well pick the same one
+        self.relay_identifier = str(uuid.uuid4())
+        self.spool_file: Optional[BinaryIO] = None
+        self.spool_path: Optional[str] = None
+        self.next_sequence: int = 0
+        self.granted_at: int = 0
+        self.received: int = 0
+        # Relayed chunks are only acknowledged once the target has drained them
+        self.draining: bool = False
+
+
+class TransferService(LoggerMixin):
+    """
+    Streams FILE, VIDEO and AUDIO payloads as sequence numbered chunks.
+    Chunks are relayed to the target as they arrive when it is connected to this node
+    and spooled to disk otherwise, so a transfer is never held in memory as a whole.
+    Senders may only have `window` unacknowledged chunks in flight per transfer,
+    which keeps a large upload from crowding out chat frames on the same connection.
+    A relayed chunk is acknowledged once the target connections handed it to their transport,
+    so a slow target paces the sender instead of filling up its own outbound queue.
+    """
+
+    def __init__(self,
+                 configuration: TransferConfiguration,
+                 command_bus: CommandBus,
+                 participant_service: 'ParticipantService'):
+        self.__configuration = configuration
+        self.__command_bus = command_bus
+        self.__participant_service = participant_service
+        self.__transfers: Dict[str, Dict[str, Transfer]] = {}
+        # Relays by target participant, aborted when the target leaves this node
+        self.__relays: Dict[str, Dict[str, Transfer]] = {}
+        os.makedirs(self.__configuration.spool_directory, exist_ok=True)
+
+    def offer(self, connection: ClientConnection, payload: bytearray) -> None:
+        offer = TransferOffer()
+        offer.ParseFromString(payload)
+        transfers = self.__transfers.setdefault(connection.unique_identifier(), {})
+        if offer.transfer_identifier in transfers:
+            self.__reject(connection=connection, transfer_identifier=offer.transfer_identifier,
+                          reason="DUPLICATE-TRANSFER")
+            return
+        if offer.length > self.__configuration.max_transfer_size:
+            self.__reject(connection=connection, transfer_identifier=offer.transfer_identifier,
+                          reason="TRANSFER-TOO-LARGE")
+            return
+        if len(transfers) >= self.__configuration.max_transfers_per_connection:
+            self.__reject(connection=connection, transfer_identifier=offer.transfer_identifier,
+                          reason="TOO-MANY-TRANSFERS")
+            return
+        offer.sender_identifier = connection.routing_identity()
+        target_participant = self.__participant_service.resolve_local_participant(
+            routing_identifier=offer.target_identifier)
+        if target_participant is not None:
+            transfer = Transfer(sender=connection, offer=offer, mode=TransferMode.RELAY,
+                                target_participant=target_participant)
+            self.__relays.setdefault(target_participant, {})[transfer.relay_identifier] = transfer
+            relayed_offer = TransferOffer()
+            relayed_offer.CopyFrom(offer)
+            relayed_offer.transfer_identifier = transfer.relay_identifier
+            self.__dispatch(transfer=transfer, response_type=ResponseType.TRANSFER_OFFER,
+                            payload=relayed_offer.SerializeToString())
+        else:
+            transfer = Transfer(sender=connection, offer=offer, mode=TransferMode.SPOOL, target_participant=None)
+            transfer.spool_path = os.path.join(self.__configuration.spool_directory,
+                                               "{}.part".format(transfer.relay_identifier))
+            transfer.spool_file = open(transfer.spool_path, "wb")
+        transfers[offer.transfer_identifier] = transfer
+        self._info("TRANSFER {0} STARTED IN {1} MODE", transfer.relay_identifier, transfer.mode.value)
+        self.__grant(connection=connection, transfer=transfer, acknowledged=transfer.next_sequence)
+
+    def receive_chunk(self, connection: ClientConnection, payload: bytearray) -> None:
+        chunk = TransferChunk()
+        chunk.ParseFromString(payload)
+        transfer = self.__transfers.get(connection.unique_identifier(), {}).get(chunk.transfer_identifier)
+        if transfer is None:
+            self.__reject(connection=connection, transfer_identifier=chunk.transfer_identifier,
+                          reason="UNKNOWN-TRANSFER")
+            return
+        if chunk.aborted:
+            self.__abort(connection=connection, transfer=transfer, reason="")
+            return
+        if chunk.sequence != transfer.next_sequence:
+            self.__abort(connection=connection, transfer=transfer, reason="OUT-OF-SEQUENCE")
+            return
+        if chunk.sequence >= transfer.granted_at + self.__configuration.window:
+            self.__abort(connection=connection, transfer=transfer, reason="WINDOW-EXCEEDED")
+            return
+        transfer.received += len(chunk.content)
+        if transfer.received > transfer.offer.length:
+            self.__abort(connection=connection, transfer=transfer, reason="LENGTH-EXCEEDED")
+            return
+        if transfer.mode is TransferMode.RELAY:
+            chunk.transfer_identifier = transfer.relay_identifier
+            self.__dispatch(transfer=transfer, response_type=ResponseType.TRANSFER_CHUNK,
+                            payload=chunk.SerializeToString())
+        else:
+            transfer.spool_file.write(chunk.content)
+        transfer.next_sequence += 1
+        if chunk.last:
+            self.__complete(connection=connection, transfer=transfer)
+        elif transfer.next_sequence - transfer.granted_at >= max(self.__configuration.window // 2, 1):
+            if transfer.mode is TransferMode.SPOOL:
+                self.__grant(connection=connection, transfer=transfer, acknowledged=transfer.next_sequence)
+            elif not transfer.draining:
+                self.__grant_once_drained(connection=connection, transfer=transfer)
+
+    def abort_all(self, connection: ClientConnection) -> None:
+        for transfer in list(self.__transfers.get(connection.unique_identifier(), {}).values()):
+            self.__abort(connection=None, transfer=transfer, reason="CONNECTION-LOST")
+        self.__transfers.pop(connection.unique_identifier(), None)
+        participant_identifier = connection.participant_identifier()
+        if participant_identifier is None or self.__participant_service.local_connections(
+                participant_identifier=participant_identifier):
+            return
+        # Its last device is gone, whatever was still on its way to it would be dropped without a word
+        for transfer in list(self.__relays.get(participant_identifier, {}).values()):
+            self.__abort(connection=transfer.sender, transfer=transfer, reason="TARGET-DISCONNECTED")
+
+    def __grant_once_drained(self, connection: ClientConnection, transfer: Transfer) -> None:
+        transfer.draining = True
+        drained = DeferredList([target.when_flushed() for target in self.__participant_service.local_connections(
+            participant_identifier=transfer.target_participant)])
+        drained.addCallback(self.__on_drained, connection=connection, transfer=transfer,
+                            acknowledged=transfer.next_sequence)
+
+    def __on_drained(self, _, connection: ClientConnection, transfer: Transfer, acknowledged: int) -> None:
+        transfer.draining = False
+        if self.__transfers.get(connection.unique_identifier(), {}).get(transfer.offer.transfer_identifier) \
+                is not transfer:
+            # Completed or aborted in the meantime
+            return
+        self.__grant(connection=connection, transfer=transfer, acknowledged=acknowledged)
+
+    def __complete(self, connection: ClientConnection, transfer: Transfer) -> None:
+        self.__remove(connection=connection, transfer=transfer)
+        self.__grant(connection=connection, transfer=transfer, acknowledged=transfer.next_sequence)
+        self._info("TRANSFER {0} COMPLETED: {1} BYTES", transfer.relay_identifier, transfer.received)
+        if transfer.mode is TransferMode.RELAY:
+            self.__forget_relay(transfer=transfer)
+            return
+        transfer.spool_file.close()
+        spooled_path = transfer.spool_path[:-len(".part")]
+        os.replace(transfer.spool_path, spooled_path)
+        # Hand the spooled object over as an attachment, routing it like any other direct message
+        attachment = Attachment(
+            name=transfer.offer.name,
+            length=transfer.received,
+            uri="spool://{}".format(os.path.basename(spooled_path))
+        )
+        direct_message = DirectMessage(
+            type=transfer.offer.type,
+            content=attachment.SerializeToString(),
+            sender_identifier=transfer.offer.sender_identifier,
+            target_identifier=transfer.offer.target_identifier,
+            sent_at=ConnectionRegistry.current_timestamp()
+        )
+        self.__participant_service.relay_direct_message(sender_identifier=connection.participant_identifier(),
+                                                        payload=direct_message.SerializeToString())
+
+    def __abort(self, connection: Optional[ClientConnection], transfer: Transfer, reason: str) -> None:
+        self._warning("TRANSFER {0} ABORTED: {1}", transfer.relay_identifier, reason)
+        if connection is not None:
+            self.__remove(connection=connection, transfer=transfer)
+            if reason:
+                self.__reject(connection=connection, transfer_identifier=transfer.offer.transfer_identifier,
+                              reason=reason)
+        if transfer.mode is TransferMode.RELAY:
+            self.__forget_relay(transfer=transfer)
+            self.__dispatch(transfer=transfer, response_type=ResponseType.TRANSFER_CHUNK,
+                            payload=TransferChunk(transfer_identifier=transfer.relay_identifier,
+                                                  sequence=transfer.next_sequence,
+                                                  aborted=True).SerializeToString())
+        else:
+            transfer.spool_file.close()
+            os.remove(transfer.spool_path)
+
+    def __remove(self, connection: ClientConnection, transfer: Transfer) -> None:
+        transfers = self.__transfers.get(connection.unique_identifier(), {})
+        transfers.pop(transfer.offer.transfer_identifier, None)
+        if len(transfers) == 0:
+            self.__transfers.pop(connection.unique_identifier(), None)
+
+    def __forget_relay(self, transfer: Transfer) -> None:
+        relays = self.__relays.get(transfer.target_participant, {})
+        relays.pop(transfer.relay_identifier, None)
+        if len(relays) == 0:
+            self.__relays.pop(transfer.target_participant, None)
+
+    def __grant(self, connection: ClientConnection, transfer: Transfer, acknowledged: int) -> None:
+        transfer.granted_at = acknowledged
+        credit = TransferCredit(
+            transfer_identifier=transfer.offer.transfer_identifier,
+            acknowledged=acknowledged,
+            window=self.__configuration.window
+        )
+        connection.send_message(response_type=ResponseType.TRANSFER_CREDIT, payload=credit.SerializeToString())
+
+    @staticmethod
+    def __reject(connection: ClientConnection, transfer_identifier: str, reason: str) -> None:
+        credit = TransferCredit(transfer_identifier=transfer_identifier, window=0, reason=reason)
+        connection.send_message(response_type=ResponseType.TRANSFER_CREDIT, payload=credit.SerializeToString())
+
+    def __dispatch(self, transfer: Transfer, response_type: ResponseType, payload: bytes) -> None:
+        self.__command_bus.handle(MessageDispatchCommand(
+            participant_identifier=transfer.target_participant,
+            payload=payload,
+            response_type=response_type
+        ))
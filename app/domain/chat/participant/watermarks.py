@@ -0,0 +1,172 @@
+from collections import OrderedDict
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from twisted.internet.interfaces import IDelayedCall
+
+from app.core.logging.loggers import LoggerMixin
+from app.domain.chat.messages.messages_pb2 import ReadWatermark, ReadWatermarkBatch
+from app.domain.chat.messages.repository import ConversationRecord, MessageRepository
+
+WATERMARK_FLUSH_DELAY = float(0.1)
+READER_CAPACITY = int(100000)
+
+
+class WatermarkConfiguration(object):
+    def __init__(self, content_map: Dict):
+        self.flush_delay = float(content_map.get("flush_delay", WATERMARK_FLUSH_DELAY))
+        self.capacity = int(content_map.get("capacity", READER_CAPACITY))
+
+
+class WatermarkStatistics(NamedTuple):
+    watermarks: int
+    # Watermarks that did not move past the one already stored
+    stale_watermarks: int
+    forwarded_frames: int
+    written_rows: int
+    readers: int
+
+
+class Conversation(object):
+    __slots__ = ("last_sequence", "read_sequence", "read_marker")
+
+    def __init__(self, last_sequence: int, read_sequence: int, read_marker: Optional[str]):
+        self.last_sequence = last_sequence
+        self.read_sequence = read_sequence
+        self.read_marker = read_marker
+
+    @property
+    def unread(self) -> int:
+        return self.last_sequence - self.read_sequence
+
+
+class ReadWatermarks(LoggerMixin):
+    """
+    Numbers the messages of every conversation a reader has and keeps the sequence the reader
+    read up to, which makes the unread count of a conversation a subtraction.
+    The conversations of a reader are loaded once and kept for at most `capacity` readers.
+    Every `flush_delay` seconds a conversation that moved is written as one row however many
+    messages or watermarks it saw, and the watermarks for a sender are forwarded as one frame
+    holding the latest watermark of each reader.
+    """
+
+    def __init__(self, configuration: WatermarkConfiguration, repository: MessageRepository,
+                 forward: Callable[[str, bytes], None], reactor):
+        self.__configuration = configuration
+        self.__repository = repository
+        self.__forward = forward
+        self.__reactor = reactor
+        self.__readers: 'OrderedDict[str, Dict[str, Conversation]]' = OrderedDict()
+        self.__changed: Dict[Tuple[str, str], Conversation] = {}
+        # Routing identifier of the sender -> routing identifier of the reader -> watermark
+        self.__forwards: Dict[str, Dict[str, ReadWatermark]] = {}
+        self.__flush_call: Optional[IDelayedCall] = None
+        self.__watermarks: int = 0
+        self.__stale_watermarks: int = 0
+        self.__forwarded_frames: int = 0
+        self.__written_rows: int = 0
+
+    def next_sequence(self, reader: str, conversation: str) -> int:
+        state = self.__conversation(reader=reader, conversation=conversation)
+        state.last_sequence += 1
+        self.__changed[(reader, conversation)] = state
+        self.__schedule_flush()
+        return state.last_sequence
+
+    def read(self, reader: str, reader_routing_identifier: str, watermark: ReadWatermark) -> bool:
+        """
+        Returns whether the watermark moved, a reader cannot read past the last message it was sent
+        """
+        conversation = watermark.conversation_identifier
+        state = self.__conversation(reader=reader, conversation=conversation)
+        sequence = min(watermark.sequence, state.last_sequence)
+        if sequence <= state.read_sequence:
+            self.__stale_watermarks += 1
+            return False
+        self.__watermarks += 1
+        state.read_sequence = sequence
+        state.read_marker = watermark.marker
+        self.__changed[(reader, conversation)] = state
+        forwarded = ReadWatermark(conversation_identifier=reader_routing_identifier,
+                                  sequence=sequence,
+                                  marker=watermark.marker,
+                                  read_at=watermark.read_at)
+        self.__forwards.setdefault(conversation, {})[reader_routing_identifier] = forwarded
+        self.__schedule_flush()
+        return True
+
+    def unread(self, reader: str) -> List[Tuple[str, Conversation]]:
+        conversations = self.__conversations(reader=reader)
+        return [(conversation, state) for conversation, state in conversations.items() if state.unread > 0]
+
+    def forget(self, reader: str) -> None:
+        """
+        Drops what is cached for the reader, another node may have moved its conversations since
+        """
+        self.__readers.pop(reader, None)
+
+    def flush(self) -> None:
+        if self.__flush_call is not None and self.__flush_call.active():
+            self.__flush_call.cancel()
+        self.__flush_call = None
+        changed = self.__changed
+        self.__changed = {}
+        forwards = self.__forwards
+        self.__forwards = {}
+        for sender, watermarks in forwards.items():
+            self.__forwarded_frames += 1
+            self.__forward(sender, ReadWatermarkBatch(watermarks=watermarks.values()).SerializeToString())
+        if len(changed) == 0:
+            return
+        try:
+            self.__repository.save_conversations(conversations=[
+                ConversationRecord(reader=reader,
+                                   conversation=conversation,
+                                   last_sequence=state.last_sequence,
+                                   read_sequence=state.read_sequence,
+                                   read_marker=state.read_marker)
+                for (reader, conversation), state in changed.items()])
+        except Exception as error:
+            self._error("FAILED TO SAVE {0} CONVERSATIONS -> {1}", len(changed), error)
+            for key, state in changed.items():
+                self.__changed.setdefault(key, state)
+            self.__schedule_flush()
+            return
+        self.__written_rows += len(changed)
+
+    def statistics(self) -> WatermarkStatistics:
+        return WatermarkStatistics(
+            watermarks=self.__watermarks,
+            stale_watermarks=self.__stale_watermarks,
+            forwarded_frames=self.__forwarded_frames,
+            written_rows=self.__written_rows,
+            readers=len(self.__readers)
+        )
+
+    def __schedule_flush(self) -> None:
+        if self.__flush_call is None:
+            self.__flush_call = self.__reactor.callLater(self.__configuration.flush_delay, self.flush)
+
+    def __conversation(self, reader: str, conversation: str) -> Conversation:
+        conversations = self.__conversations(reader=reader)
+        state = conversations.get(conversation)
+        if state is None:
+            state = conversations[conversation] = Conversation(last_sequence=0, read_sequence=0, read_marker=None)
+        return state
+
+    def __conversations(self, reader: str) -> Dict[str, Conversation]:
+        conversations = self.__readers.get(reader)
+        if conversations is not None:
+            self.__readers.move_to_end(reader)
+            return conversations
+        conversations = {record.conversation: Conversation(last_sequence=record.last_sequence,
+                                                            read_sequence=record.read_sequence,
+                                                            read_marker=record.read_marker)
+                         for record in self.__repository.fetch_conversations(reader=reader)}
+        # Whatever is still waiting to be written is newer than what was loaded
+        for (changed_reader, conversation), state in self.__changed.items():
+            if changed_reader == reader:
+                conversations[conversation] = state
+        self.__readers[reader] = conversations
+        while len(self.__readers) > self.__configuration.capacity:
+            self.__readers.popitem(last=False)
+        return conversations
@@ -12,6 +12,15 @@ class RequestType(enum.Enum):
     SEARCH_FOR_GROUP = int(5)
     DISCONNECT = int(6)
     MATCH_CONTACTS = int(7)
+    BATCH = int(8)
+    TRANSFER_OFFER = int(9)
+    TRANSFER_CHUNK = int(10)
+    PING = int(11)
+    PONG = int(12)
+    RESUME = int(13)
+    SYNC_CONTACTS = int(14)
+    READ_WATERMARK = int(15)
+    FETCH_UNREAD = int(16)
 
 
 class ResponseType(enum.Enum):
@@ -22,3 +31,22 @@ class ResponseType(enum.Enum):
     CONTACT_BATCH = int(4)
     RECEIVE_DIRECT_MESSAGE = int(5)
     DELIVERY_STATE = int(6)
+    FAILURE = int(7)
+    DELIVERY_BATCH = int(8)
+    TRANSFER_OFFER = int(9)
+    TRANSFER_CHUNK = int(10)
+    TRANSFER_CREDIT = int(11)
+    PING = int(12)
+    PONG = int(13)
+    CONTACT_SYNC = int(14)
+    READ_WATERMARK = int(15)
+    UNREAD_COUNTS = int(16)
+
+
+# Frames that can be lost without the client missing content, dropped first when a consumer falls behind
+EPHEMERAL_RESPONSES = frozenset([ResponseType.DELIVERY_STATE, ResponseType.DELIVERY_BATCH,
+                                 ResponseType.READ_WATERMARK, ResponseType.PING, ResponseType.PONG])
+
+# Requests a connection may send before it has identified
+ANONYMOUS_REQUESTS = frozenset([RequestType.IDENTITY, RequestType.RESUME, RequestType.DISCONNECT, RequestType.PING,
+                                RequestType.PONG])
@@ -0,0 +1,125 @@
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from typing import List
+
+import requests
+from twisted.internet import defer, reactor
+from twisted.internet.task import LoopingCall
+
+from app.domain.chat.participant.accounts import AccountServiceClient, AccountServiceConfiguration, DETAILS_PATH
+
+PORT = int(5011)
+LATENCY = float(0.02)
+PARTICIPANTS = int(50)
+# Lookups per participant, as when every device of a participant reconnects at once
+LOOKUPS_PER_PARTICIPANT = int(8)
+HEARTBEAT = float(0.001)
+# Distinct participants resolved at once when a node restarts
+STORM = int(2000)
+
+
+class StallMonitor(object):
+    """
+    Ticks on the reactor and remembers the longest gap between ticks, how long every other connection was frozen.
+    """
+
+    def __init__(self):
+        self.__last = time.perf_counter()
+        self.longest: float = 0.0
+        self.__loop = LoopingCall(self.__tick)
+
+    def start(self) -> None:
+        self.__loop.start(HEARTBEAT)
+
+    def stop(self) -> None:
+        self.__loop.stop()
+
+    def __tick(self) -> None:
+        now = time.perf_counter()
+        self.longest = max(self.longest, now - self.__last)
+        self.__last = now
+
+
+def wait_for_stub(port: int) -> None:
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("stub account service did not start")
+
+
+def report(name: str, elapsed: float, lookups: int, upstream: int, stall: float) -> None:
+    print("{0:<10} {1:>8,.0f} LOOKUPS/SEC UPSTREAM {2:>5,} LONGEST STALL {3:>8.1f}ms ANSWERED {4:>6,}".format(
+        name, lookups / elapsed, upstream, stall * 1000, lookups))
+
+
+def blocking(identifiers: List[str], base_url: str) -> None:
+    monitor = StallMonitor()
+    monitor.start()
+    started = time.perf_counter()
+    session = requests.Session()
+    for identifier in identifiers:
+        session.get(url="{0}{1}/{2}".format(base_url, DETAILS_PATH, identifier)).json()
+    elapsed = time.perf_counter() - started
+    # Let the monitor observe the gap the loop above caused
+    reactor.callLater(HEARTBEAT * 2, finish_blocking, monitor, elapsed, len(identifiers))
+
+
+def finish_blocking(monitor: StallMonitor, elapsed: float, lookups: int) -> None:
+    monitor.stop()
+    report(name="BLOCKING", elapsed=elapsed, lookups=lookups, upstream=lookups, stall=monitor.longest)
+
+
+@defer.inlineCallbacks
+def pooled(name: str, identifiers: List[str], base_url: str, bulk_lookups: bool):
+    client = AccountServiceClient(
+        configuration=AccountServiceConfiguration({"url": base_url, "bulk_lookups": bulk_lookups}),
+        reactor=reactor)
+    monitor = StallMonitor()
+    monitor.start()
+    started = time.perf_counter()
+    outcomes = yield defer.DeferredList([client.fetch_details(identifier=identifier) for identifier in identifiers],
+                                        consumeErrors=True)
+    elapsed = time.perf_counter() - started
+    monitor.stop()
+    # Lookups that timed out or were refused count against the rate
+    answered = sum(1 for succeeded, details in outcomes if succeeded and details is not None)
+    report(name=name, elapsed=elapsed, lookups=answered, upstream=client.requests(), stall=monitor.longest)
+    yield client.close()
+
+
+@defer.inlineCallbacks
+def run(identifiers: List[str], storm: List[str], base_url: str):
+    blocking(identifiers=identifiers, base_url=base_url)
+    yield deferred_sleep(0.1)
+    yield pooled(name="POOLED", identifiers=identifiers, base_url=base_url, bulk_lookups=False)
+    print("RECONNECT STORM OF {0:,} PARTICIPANTS".format(len(storm)))
+    yield pooled(name="POOLED", identifiers=storm, base_url=base_url, bulk_lookups=False)
+    yield pooled(name="BATCHED", identifiers=storm, base_url=base_url, bulk_lookups=True)
+    reactor.stop()
+
+
+def deferred_sleep(seconds: float) -> defer.Deferred:
+    deferred = defer.Deferred()
+    reactor.callLater(seconds, deferred.callback, None)
+    return deferred
+
+
+if __name__ == "__main__":
+    stub = subprocess.Popen([sys.executable, "-m", "benchmarks.stub_account_service",
+                             "--port", str(PORT), "--latency", str(LATENCY)], stdout=subprocess.DEVNULL)
+    try:
+        wait_for_stub(port=PORT)
+        participants = [str(uuid.uuid4()) for _ in range(PARTICIPANTS)]
+        lookups = [participant for participant in participants for _ in range(LOOKUPS_PER_PARTICIPANT)]
+        storm = [str(uuid.uuid4()) for _ in range(STORM)]
+        reactor.callWhenRunning(run, lookups, storm, "http://127.0.0.1:{0}".format(PORT))
+        reactor.run()
+    finally:
+        stub.terminate()
+        stub.wait()
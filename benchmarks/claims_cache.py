@@ -0,0 +1,64 @@
+import os
+import random
+import tempfile
+import time
+import uuid
+from typing import List, Optional
+
+import simplejson
+from jwcrypto import jwe, jwk
+
+from app.core.security.cache import ClaimsCache
+from app.core.security.restriction import Restrictions
+
+CONNECTS = int(20000)
+# Share of connects presenting a token the node has already seen, as mobile clients reconnecting do
+REUSE_RATIO = float(0.9)
+TOKEN_LIFETIME = int(3600)
+
+
+def issue_token(key: jwk.JWK) -> bytes:
+    now = int(time.time())
+    claims = {"sub": "participant", "jti": str(uuid.uuid4()), "iat": now, "exp": now + TOKEN_LIFETIME}
+    token = jwe.JWE(simplejson.dumps(claims).encode(), protected={"alg": "RSA-OAEP-256", "enc": "A256GCM"})
+    token.add_recipient(key)
+    return token.serialize(compact=True).encode()
+
+
+def connect_sequence(key: jwk.JWK) -> List[bytes]:
+    random_source = random.Random(42)
+    issued: List[bytes] = []
+    sequence: List[bytes] = []
+    for _ in range(CONNECTS):
+        if issued and random_source.random() < REUSE_RATIO:
+            sequence.append(random_source.choice(issued))
+        else:
+            issued.append(issue_token(key=key))
+            sequence.append(issued[-1])
+    return sequence
+
+
+def run(name: str, key_path: str, sequence: List[bytes], cache: Optional[ClaimsCache]) -> None:
+    restrictions = Restrictions(cache=cache, private_key_path=key_path)
+    started = time.perf_counter()
+    for token in sequence:
+        claims = restrictions.extract_token_claims(encrypted_token=bytearray(token))
+        assert Restrictions.verify_claim(claims=claims)[0]
+    elapsed = time.perf_counter() - started
+    summary = ""
+    if cache is not None:
+        statistics = cache.statistics()
+        summary = "HITS {0:,} MISSES {1:,}".format(statistics.hits, statistics.misses)
+    print("{0:<12} {1:>10,.0f} CONNECTS/SEC {2}".format(name, len(sequence) / elapsed, summary))
+
+
+if __name__ == "__main__":
+    key = jwk.JWK.generate(kty="RSA", size=2048)
+    with tempfile.NamedTemporaryFile(suffix=".pem", delete=False) as key_file:
+        key_file.write(key.export_to_pem(private_key=True, password=None))
+    try:
+        sequence = connect_sequence(key=key)
+        run(name="NO CACHE", key_path=key_file.name, sequence=sequence, cache=None)
+        run(name="CLAIMS CACHE", key_path=key_file.name, sequence=sequence, cache=ClaimsCache())
+    finally:
+        os.remove(key_file.name)
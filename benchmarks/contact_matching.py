@@ -0,0 +1,105 @@
+import os
+import random
+import tempfile
+import time
+import uuid
+from typing import List
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker, scoped_session
+from twisted.internet.task import Clock
+
+from app.core.database.connection import DataSource
+from app.domain.chat.participant.contacts import ContactIndex, ContactIndexConfiguration, contact_hash
+from app.domain.chat.participant.contacts_pb2 import ContactRequest
+from app.domain.chat.participant.sql_repository import SQLParticipantRepository
+from app.settings import MIGRATIONS_FOLDER
+
+# Participants in the index, most of them offline
+PARTICIPANTS = int(100000)
+# Contacts in one address book upload
+BATCH = int(10000)
+# Share of an address book that belongs to participants
+MATCH_RATIO = float(0.3)
+MIGRATION = os.path.join(MIGRATIONS_FOLDER, "sqlite3", "0004.contact_index.sql")
+
+
+class StatementCounter(object):
+    def __init__(self, engine):
+        self.count: int = 0
+        event.listen(engine, "before_cursor_execute", self.__on_execute)
+
+    def __on_execute(self, *args) -> None:
+        self.count += 1
+
+
+def email_address(index: int) -> str:
+    return "participant.{0}@example.com".format(index)
+
+
+def populate(engine) -> None:
+    with open(MIGRATION) as migration:
+        for statement in migration.read().split(";"):
+            if statement.strip():
+                engine.execute(statement)
+    rows = [(contact_hash(contact_type=ContactRequest.ContactType.EMAIL, value=email_address(index)),
+             ContactRequest.ContactType.EMAIL,
+             str(uuid.uuid4()),
+             str(uuid.uuid4()),
+             "participant-{0}".format(index),
+             "https://example.com/{0}.png".format(index)) for index in range(PARTICIPANTS)]
+    with engine.begin() as connection:
+        connection.execute(
+            "INSERT INTO contact_index_tb(contact_hash,contact_type,participant_identifier,routing_identifier,"
+            "nickname,photo_url) VALUES(?,?,?,?,?,?)", rows)
+
+
+def address_book() -> List[ContactRequest]:
+    random_source = random.Random(11)
+    requests: List[ContactRequest] = []
+    for index in range(BATCH):
+        if random_source.random() < MATCH_RATIO:
+            # Written the way phones store them, normalization has to find them anyway
+            value = "  {0} ".format(email_address(random_source.randrange(PARTICIPANTS)).upper())
+        else:
+            value = "stranger.{0}@example.org".format(index)
+        requests.append(ContactRequest(value=value, type=ContactRequest.ContactType.EMAIL))
+    return requests
+
+
+def report(name: str, elapsed: float, matched: int, statements: int) -> None:
+    print("{0:<12} {1:>10,.0f} CONTACTS/SEC {2:>8.1f}ms PER BATCH MATCHED {3:>6,} STATEMENTS {4:>6,}".format(
+        name, BATCH / elapsed, elapsed * 1000, matched, statements))
+
+
+def run() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine("sqlite:///{}".format(os.path.join(directory, "benchmark.db")))
+        populate(engine=engine)
+        repository = SQLParticipantRepository(
+            data_source=DataSource(session=scoped_session(session_factory=sessionmaker(bind=engine))))
+        counter = StatementCounter(engine=engine)
+        requests = address_book()
+
+        started = time.perf_counter()
+        matched = set()
+        for request in requests:
+            hashed = contact_hash(contact_type=request.type, value=request.value)
+            matched.update(contact.participant_identifier
+                           for contact in repository.match_contacts(contact_hashes=[hashed]).values())
+        report(name="PER CONTACT", elapsed=time.perf_counter() - started, matched=len(matched),
+               statements=counter.count)
+
+        index = ContactIndex(configuration=ContactIndexConfiguration({}), repository=repository, reactor=Clock())
+        for name in ("BATCHED", "HOT"):
+            counter.count = 0
+            started = time.perf_counter()
+            contacts = index.match(requests=requests)
+            report(name=name, elapsed=time.perf_counter() - started, matched=len(contacts),
+                   statements=counter.count)
+        statistics = index.statistics()
+        print("HOT HIT RATE {0:>10.1%}".format(statistics.hit_rate))
+
+
+if __name__ == "__main__":
+    run()
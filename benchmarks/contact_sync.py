@@ -0,0 +1,182 @@
+import os
+import random
+import tempfile
+import time
+import uuid
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker, scoped_session
+from twisted.internet.task import Clock
+
+from app.core.database.connection import DataSource
+from app.domain.chat.participant.contacts import ContactIndex, ContactIndexConfiguration, ContactSync, \
+    bucket_digest, bucket_of, contact_hash, root_digest
+from app.domain.chat.participant.contacts_pb2 import BatchContactMatchRequest, BatchContactMatchResponse, \
+    Contact, ContactRequest, ContactSyncRequest, ContactSyncResponse
+from app.domain.chat.participant.sql_repository import SQLParticipantRepository
+from app.settings import MIGRATIONS_FOLDER
+
+# Participants in the index, most of them offline
+PARTICIPANTS = int(100000)
+ADDRESS_BOOK = int(5000)
+BUCKETS = int(256)
+# Share of an address book that belongs to participants
+MATCH_RATIO = float(0.3)
+# Contacts edited between two launches
+EDITS = int(3)
+RELAUNCHES = int(20)
+COUNTRY_CODE = "254"
+MIGRATIONS = ("0004.contact_index.sql", "0005.contact_sync.sql")
+
+
+def phone_number(index: int) -> str:
+    return "+{0}{1:09d}".format(COUNTRY_CODE, 700000000 + index)
+
+
+def populate(engine) -> None:
+    for name in MIGRATIONS:
+        with open(os.path.join(MIGRATIONS_FOLDER, "sqlite3", name)) as migration:
+            for statement in migration.read().split(";"):
+                if statement.strip():
+                    engine.execute(statement)
+    rows = [(contact_hash(contact_type=ContactRequest.ContactType.PHONE, value=phone_number(index)),
+             ContactRequest.ContactType.PHONE,
+             str(uuid.uuid4()),
+             str(uuid.uuid4()),
+             "participant-{0}".format(index),
+             None) for index in range(PARTICIPANTS)]
+    with engine.begin() as connection:
+        connection.execute(
+            "INSERT INTO contact_index_tb(contact_hash,contact_type,participant_identifier,routing_identifier,"
+            "nickname,photo_url) VALUES(?,?,?,?,?,?)", rows)
+
+
+class AddressBook(object):
+    """
+    The client side of a sync, remembers what the server acknowledged last.
+    """
+
+    def __init__(self, values: List[str]):
+        self.values = values
+        self.__synced: Optional[List[bytes]] = None
+
+    def match_request(self) -> BatchContactMatchRequest:
+        return BatchContactMatchRequest(country_code=COUNTRY_CODE, requests=self.__requests(self.values))
+
+    def sync_request(self, with_digests: bool = False) -> ContactSyncRequest:
+        buckets = self.__buckets()
+        digests = [bucket_digest(buckets.get(index, [])) for index in range(BUCKETS)]
+        request = ContactSyncRequest(country_code=COUNTRY_CODE, bucket_count=BUCKETS, root=root_digest(digests))
+        if self.__synced == digests and not with_digests:
+            return request
+        request.digests.extend(digests)
+        for index in range(BUCKETS):
+            if self.__synced is None or self.__synced[index] != digests[index]:
+                request.buckets.add(index=index, requests=buckets.get(index, []))
+        return request
+
+    def acknowledge(self, request: ContactSyncRequest) -> None:
+        if len(request.digests) > 0:
+            self.__synced = list(request.digests)
+
+    def __buckets(self) -> Dict[int, List[ContactRequest]]:
+        buckets: Dict[int, List[ContactRequest]] = {}
+        for request in self.__requests(self.values):
+            buckets.setdefault(bucket_of(request=request, bucket_count=BUCKETS), []).append(request)
+        return buckets
+
+    @staticmethod
+    def __requests(values: List[str]) -> List[ContactRequest]:
+        return [ContactRequest(value=value, type=ContactRequest.ContactType.PHONE) for value in values]
+
+
+def address_book(random_source: random.Random) -> List[str]:
+    values: List[str] = []
+    for _ in range(ADDRESS_BOOK):
+        if random_source.random() < MATCH_RATIO:
+            values.append(phone_number(random_source.randrange(PARTICIPANTS)))
+        else:
+            values.append(phone_number(PARTICIPANTS + random_source.randrange(PARTICIPANTS)))
+    return values
+
+
+def full_match(index: ContactIndex, payload: bytes) -> bytes:
+    request = BatchContactMatchRequest()
+    request.ParseFromString(payload)
+    response = BatchContactMatchResponse()
+    for contact in index.match(requests=request.requests, country_code=request.country_code):
+        response.contacts.append(Contact(nickname=contact.nickname, identifier=contact.routing_identifier))
+    return response.SerializeToString()
+
+
+def synced(contact_sync: ContactSync, participant_identifier: str, payload: bytes) -> bytes:
+    request = ContactSyncRequest()
+    request.ParseFromString(payload)
+    return contact_sync.sync(participant_identifier=participant_identifier, request=request).SerializeToString()
+
+
+def report(name: str, request: int, response: int, elapsed: float, added: int = 0, removed: int = 0) -> None:
+    print("{0:<20} REQUEST {1:>9,} BYTES RESPONSE {2:>9,} BYTES SERVER {3:>9.3f}ms ADDED {4:>5,} REMOVED {5:>3,}"
+          .format(name, request, response, elapsed * 1000, added, removed))
+
+
+def run() -> None:
+    random_source = random.Random(5)
+    participant_identifier = str(uuid.uuid4())
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine("sqlite:///{}".format(os.path.join(directory, "benchmark.db")))
+        populate(engine=engine)
+        repository = SQLParticipantRepository(
+            data_source=DataSource(session=scoped_session(session_factory=sessionmaker(bind=engine))))
+        index = ContactIndex(configuration=ContactIndexConfiguration({}), repository=repository, reactor=Clock())
+        contact_sync = ContactSync(index=index, repository=repository)
+        book = AddressBook(values=address_book(random_source=random_source))
+
+        payload = book.match_request().SerializeToString()
+        full_match(index=index, payload=payload)
+        started = time.perf_counter()
+        for _ in range(RELAUNCHES):
+            answer = full_match(index=index, payload=payload)
+        report(name="MATCH EVERY LAUNCH", request=len(payload), response=len(answer),
+               elapsed=(time.perf_counter() - started) / RELAUNCHES)
+
+        request = book.sync_request()
+        started = time.perf_counter()
+        answer = synced(contact_sync=contact_sync, participant_identifier=participant_identifier,
+                        payload=request.SerializeToString())
+        elapsed = time.perf_counter() - started
+        book.acknowledge(request=request)
+        response = ContactSyncResponse.FromString(answer)
+        report(name="FIRST SYNC", request=request.ByteSize(), response=len(answer), elapsed=elapsed,
+               added=len(response.added))
+
+        request = book.sync_request()
+        started = time.perf_counter()
+        for _ in range(RELAUNCHES):
+            answer = synced(contact_sync=contact_sync, participant_identifier=participant_identifier,
+                            payload=request.SerializeToString())
+        response = ContactSyncResponse.FromString(answer)
+        assert not response.send_digests and len(response.resend) == 0
+        report(name="UNCHANGED RELAUNCH", request=request.ByteSize(), response=len(answer),
+               elapsed=(time.perf_counter() - started) / RELAUNCHES)
+
+        members: Set[int] = {position for position, value in enumerate(book.values)
+                             if int(value[-9:]) - 700000000 < PARTICIPANTS}
+        for _ in range(EDITS):
+            # One member leaves the address book and another one joins it
+            book.values[random_source.choice(sorted(members))] = phone_number(PARTICIPANTS * 3)
+            book.values.append(phone_number(random_source.randrange(PARTICIPANTS)))
+        request = book.sync_request()
+        started = time.perf_counter()
+        answer = synced(contact_sync=contact_sync, participant_identifier=participant_identifier,
+                        payload=request.SerializeToString())
+        elapsed = time.perf_counter() - started
+        book.acknowledge(request=request)
+        response = ContactSyncResponse.FromString(answer)
+        report(name="RELAUNCH WITH EDITS", request=request.ByteSize(), response=len(answer), elapsed=elapsed,
+               added=len(response.added), removed=len(response.removed))
+
+
+if __name__ == "__main__":
+    run()
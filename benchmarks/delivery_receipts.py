@@ -0,0 +1,94 @@
+import os
+import tempfile
+import uuid
+from collections import Counter
+from typing import Dict
+
+from pymessagebus import CommandBus
+
+from app.configuration import Configuration
+from app.domain.chat.messages.messages_pb2 import DirectMessage
+from app.domain.chat.messages.persistence import MessagePersistence, PersistenceConfiguration
+from app.domain.chat.messages.sql_repository import SQLMessageRepository
+from app.domain.chat.participant.commands import MessageDispatchCommand
+from app.domain.chat.participant.directory import ParticipantDirectory
+from app.domain.chat.participant.participant import ParticipantService
+from app.domain.chat.types import ResponseType
+from benchmarks.message_persistence import HandBackClock
+from benchmarks.schema import add_identities, data_source, migrated_engine
+
+# Messages a chatty sender gets in within one reactor tick
+MESSAGES_PER_TICK = (1, 2, 5, 20)
+MESSAGES = int(2000)
+
+
+class ReceiptSettings(object):
+    """
+    The node configuration with the receipt settings of the run.
+    """
+
+    def __init__(self, receipts: Dict):
+        self.__configuration = Configuration.get_instance()
+        self.__receipts = receipts
+
+    def receipt_configuration(self) -> Dict:
+        return self.__receipts
+
+    def __getattr__(self, name: str):
+        return getattr(self.__configuration, name)
+
+
+def run_once(database_path: str, receipts: Dict, messages_per_tick: int) -> None:
+    engine = migrated_engine(uri="sqlite:///{}".format(database_path))
+    sender_identifier, target_identifier = str(uuid.uuid4()), str(uuid.uuid4())
+    add_identities(engine=engine, participants=(sender_identifier, target_identifier))
+    frames: Counter = Counter()
+    command_bus = CommandBus()
+    command_bus.add_handler(MessageDispatchCommand, lambda command: frames.update([command.response_type]))
+    directory = ParticipantDirectory()
+    clock = HandBackClock()
+    message_repository = SQLMessageRepository(data_source=data_source(engine=engine))
+    persistence = MessagePersistence(configuration=PersistenceConfiguration({}), repository=message_repository,
+                                     reactor=clock)
+    persistence.start()
+    service = ParticipantService(configuration=ReceiptSettings(receipts=receipts),
+                                 command_bus=command_bus,
+                                 participant_repository=None,
+                                 message_repository=message_repository,
+                                 account_client=None,
+                                 directory=directory,
+                                 persistence=persistence,
+                                 reactor=clock)
+    target_routing_identity = str(uuid.uuid4())
+    directory.add(participant_identifier=target_identifier, routing_identifier=target_routing_identity,
+                  connection=object())
+    payload = DirectMessage(type=DirectMessage.Type.TEXT, content="are you there?".encode(),
+                            target_identifier=target_routing_identity).SerializeToString()
+
+    for index in range(MESSAGES):
+        service.relay_direct_message(sender_identifier=sender_identifier, payload=payload)
+        if (index + 1) % messages_per_tick == 0:
+            # Receipts follow the commit of their messages
+            clock.settle(persistence=persistence)
+            clock.advance(0.002)
+    clock.settle(persistence=persistence)
+    clock.advance(0.002)
+    persistence.stop()
+    assert persistence.statistics().failed == 0
+
+    receipt_frames = frames[ResponseType.DELIVERY_STATE] + frames[ResponseType.DELIVERY_BATCH]
+    print("{0:<11} {1:>3} PER TICK FRAMES PER MESSAGE {2:>5.2f} RECEIPT FRAMES {3:>6,}".format(
+        "PER RECEIPT" if receipts.get("max_receipts") == 1 else "BUFFERED", messages_per_tick,
+        sum(frames.values()) / MESSAGES, receipt_frames))
+
+
+def run() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        for messages_per_tick in MESSAGES_PER_TICK:
+            for name, receipts in (("per-receipt", {"max_receipts": 1}), ("buffered", {})):
+                run_once(database_path=os.path.join(directory, "{0}-{1}.db".format(name, messages_per_tick)),
+                         receipts=receipts, messages_per_tick=messages_per_tick)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,91 @@
+import os
+import tempfile
+import time
+import uuid
+from typing import List, Tuple
+
+from pymessagebus import CommandBus
+
+from app.configuration import Configuration
+from app.domain.chat.messages.messages_pb2 import DirectMessage
+from app.domain.chat.messages.sql_repository import SQLMessageRepository
+from app.domain.chat.messages.persistence import MessagePersistence, PersistenceConfiguration
+from app.domain.chat.participant.commands import MessageDispatchCommand
+from app.domain.chat.participant.directory import ParticipantDirectory
+from app.domain.chat.participant.participant import ParticipantService
+from benchmarks.message_persistence import HandBackClock
+from benchmarks.schema import add_identities, data_source, migrated_engine
+
+BURST = int(100)
+ROUNDS = int(20)
+
+
+def build_service(database_path: str, sender_identifier: str, target_routing_identity: str,
+                  clock: HandBackClock) -> Tuple[ParticipantService, MessagePersistence]:
+    engine = migrated_engine(uri="sqlite:///{}".format(database_path))
+    target_identifier = str(uuid.uuid4())
+    add_identities(engine=engine, participants=(sender_identifier, target_identifier))
+    command_bus = CommandBus()
+    command_bus.add_handler(MessageDispatchCommand, lambda command: None)
+    directory = ParticipantDirectory()
+    message_repository = SQLMessageRepository(data_source=data_source(engine=engine))
+    persistence = MessagePersistence(configuration=PersistenceConfiguration({}), repository=message_repository,
+                                     reactor=clock)
+    persistence.start()
+    service = ParticipantService(configuration=Configuration.get_instance(),
+                                 command_bus=command_bus,
+                                 participant_repository=None,
+                                 message_repository=message_repository,
+                                 account_client=None,
+                                 directory=directory,
+                                 persistence=persistence,
+                                 reactor=clock)
+    # Pretend the target is connected to this node
+    directory.add(participant_identifier=target_identifier, routing_identifier=target_routing_identity,
+                  connection=object())
+    return service, persistence
+
+
+def burst(target_routing_identity: str) -> List[bytes]:
+    return [DirectMessage(
+        type=DirectMessage.Type.TEXT,
+        content="message number {} in this burst".format(index).encode(),
+        target_identifier=target_routing_identity
+    ).SerializeToString() for index in range(BURST)]
+
+
+def run() -> None:
+    target_routing_identity = str(uuid.uuid4())
+    sender_identifier = str(uuid.uuid4())
+    payloads = burst(target_routing_identity=target_routing_identity)
+    with tempfile.TemporaryDirectory() as directory:
+        clock = HandBackClock()
+        service, persistence = build_service(database_path=os.path.join(directory, "benchmark.db"),
+                                             sender_identifier=sender_identifier,
+                                             target_routing_identity=target_routing_identity,
+                                             clock=clock)
+
+        # Both wait until every message is saved
+        started = time.perf_counter()
+        for _ in range(ROUNDS):
+            for payload in payloads:
+                service.relay_direct_message(sender_identifier=sender_identifier, payload=payload)
+        clock.settle(persistence=persistence)
+        individual = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for _ in range(ROUNDS):
+            service.relay_direct_messages(sender_identifier=sender_identifier, payloads=payloads)
+        clock.settle(persistence=persistence)
+        batched = time.perf_counter() - started
+        persistence.stop()
+        assert persistence.statistics().failed == 0
+
+    messages = BURST * ROUNDS
+    print("DIRECT_MESSAGE FRAMES -> {0:>10,.0f} MESSAGES/SEC".format(messages / individual))
+    print("BATCH FRAMES          -> {0:>10,.0f} MESSAGES/SEC".format(messages / batched))
+    print("SPEED UP              -> {0:>10.1f}x".format(individual / batched))
+
+
+if __name__ == "__main__":
+    run()
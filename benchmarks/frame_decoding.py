@@ -0,0 +1,39 @@
+import os
+import timeit
+
+from app.domain.chat.framing import HEADER, FrameDecoder
+from app.domain.chat.types import RequestType
+
+PAYLOAD_SIZE = int(256)
+READS = int(2000)
+
+
+def build_read(frames_per_read: int) -> bytes:
+    payload = os.urandom(PAYLOAD_SIZE)
+    frame = HEADER.pack(RequestType.DIRECT_MESSAGE.value, len(payload)) + payload
+    return frame * frames_per_read
+
+
+def run(frames_per_read: int) -> None:
+    data = build_read(frames_per_read=frames_per_read)
+    # Split every read in two so the partial frame path is exercised as well
+    middle = len(data) // 2 + 3
+    head, tail = data[:middle], data[middle:]
+    decoder = FrameDecoder()
+
+    def decode():
+        decoder.feed(data=head)
+        decoder.feed(data=tail)
+
+    elapsed = timeit.timeit(decode, number=READS)
+    frames = READS * frames_per_read
+    print("{0:>4} FRAMES/READ -> {1:>12,.0f} FRAMES/SEC {2:>10,.1f} MB/SEC".format(
+        frames_per_read,
+        frames / elapsed,
+        (READS * len(data)) / elapsed / (1024 * 1024)
+    ))
+
+
+if __name__ == "__main__":
+    for count in (1, 10, 100):
+        run(frames_per_read=count)
@@ -0,0 +1,88 @@
+import logging
+import os
+import time
+from typing import Optional
+
+from twisted.internet.task import Clock
+from twisted.internet.testing import StringTransport
+
+from app.core.logging.loggers import initialize_logging
+from app.domain.chat.framing import HEADER, TransportConfiguration
+from app.domain.chat.messages.messages_pb2 import DirectMessage, Delivery
+from app.domain.chat.participant.participant import ConnectedClientProtocol
+from app.domain.chat.types import RequestType, ResponseType
+
+FRAMES_PER_READ = int(10)
+READS = int(2000)
+
+
+class StandInRegistry(object):
+    def add_to_pending_identification(self, connection) -> Optional[int]:
+        return None
+
+    def remove(self, connection) -> None:
+        pass
+
+    def record_activity(self, connection) -> None:
+        pass
+
+
+class StandInParticipantService(object):
+    """
+    Acknowledges every direct message straight back to the sender, so each frame read
+    is matched by a frame written just like on a live connection.
+    """
+
+    def __init__(self):
+        self.connection = None
+
+    def save_device_information(self, participant_identifier: str, device_information) -> None:
+        pass
+
+    def relay_direct_message(self, sender_identifier: str, payload: bytes) -> None:
+        delivery = Delivery(marker="benchmark", state=Delivery.State.DELIVERED)
+        self.connection.send_message(response_type=ResponseType.DELIVERY_STATE, payload=delivery.SerializeToString())
+
+
+def build_read() -> bytes:
+    payload = DirectMessage(
+        type=DirectMessage.Type.TEXT,
+        content=b"are we still on for tonight?",
+        target_identifier="01f3e4b2-64b1-4d2b-9b0e-3c1b4c0b8a5e"
+    ).SerializeToString()
+    return (HEADER.pack(RequestType.DIRECT_MESSAGE.value, len(payload)) + payload) * FRAMES_PER_READ
+
+
+def run(level: int) -> None:
+    logging.getLogger().setLevel(level)
+    clock = Clock()
+    service = StandInParticipantService()
+    protocol = ConnectedClientProtocol(
+        registry=StandInRegistry(),
+        source_address="127.0.0.1",
+        participant_service=service,
+        transfer_service=None,
+        transport_configuration=TransportConfiguration({"compression_enabled": False}),
+        reactor=clock
+    )
+    service.connection = protocol
+    transport = StringTransport()
+    protocol.makeConnection(transport)
+    # Direct messages are only taken from identified connections
+    protocol.resolve_participant(identifier="benchmark", device_information=None)
+    data = build_read()
+    started = time.perf_counter()
+    for _ in range(READS):
+        protocol.dataReceived(data)
+        clock.advance(0)
+        transport.clear()
+    elapsed = time.perf_counter() - started
+    print("{0:<8} {1:>12,.0f} FRAMES/SEC".format(logging.getLevelName(level), READS * FRAMES_PER_READ / elapsed))
+
+
+if __name__ == "__main__":
+    initialize_logging()
+    # Keep the full structlog chain running but don't measure the terminal
+    logging.getLogger().handlers[0].setStream(open(os.devnull, "w"))
+    for level in (logging.DEBUG, logging.INFO, logging.WARNING):
+        run(level=level)
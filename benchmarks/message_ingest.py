@@ -0,0 +1,105 @@
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple
+
+from sqlalchemy.engine import Engine
+
+from app.core.database.connection import DataSource
+from app.domain.chat.messages.repository import DirectMessageRecord
+from app.domain.chat.messages.sql_repository import SQLMessageRepository, INSERT_DIRECT_MESSAGE, MESSAGE_RECEIVED, \
+    IDENTITY_COLUMNS
+from benchmarks.message_persistence import PAYLOAD_SIZE, PARTICIPANTS
+from benchmarks.schema import POSTGRES_URI, add_identities, data_source, migrated_engine
+
+ROWS = (1000, 10000, 100000)
+
+
+class Database(NamedTuple):
+    name: str
+    data_source: DataSource
+    # The single row INSERT with the identity lookup of the dialect
+    statement: str
+
+
+def build_database(name: str, uri: str) -> Database:
+    """
+    Migrates the database from scratch and registers the participants of `messages`
+    """
+    engine: Engine = migrated_engine(uri=uri)
+    add_identities(engine=engine, participants=PARTICIPANTS)
+    return Database(name=name,
+                    data_source=data_source(engine=engine),
+                    statement=INSERT_DIRECT_MESSAGE.format(identity=IDENTITY_COLUMNS[engine.dialect.name]))
+
+
+def messages(rows: int) -> List[DirectMessageRecord]:
+    sender, target = PARTICIPANTS
+    return [DirectMessageRecord(sender=sender, target=target, payload=os.urandom(PAYLOAD_SIZE),
+                                received_at=datetime.utcnow(), node="benchmark", marker=str(uuid.uuid4()))
+            for _ in range(rows)]
+
+
+def params(message: DirectMessageRecord) -> Dict:
+    return {'sender': message.sender,
+            'target': message.target,
+            'payload': message.payload,
+            'received_at': message.received_at,
+            'node': message.node,
+            'marker': message.marker,
+            'status': MESSAGE_RECEIVED}
+
+
+def insert(database: Database, records: List[DirectMessageRecord]) -> None:
+    with database.data_source.session as session:
+        for message in records:
+            session.execute(statement=database.statement, params=params(message))
+
+
+def executemany(database: Database, records: List[DirectMessageRecord]) -> None:
+    with database.data_source.session as session:
+        session.execute(statement=database.statement, params=[params(message) for message in records])
+
+
+def copy(database: Database, records: List[DirectMessageRecord]) -> None:
+    SQLMessageRepository(data_source=database.data_source).ingest(messages=records)
+
+
+def measure(database: Database, records: List[DirectMessageRecord],
+            ingest: Callable[[Database, List[DirectMessageRecord]], None]) -> None:
+    with database.data_source.session as session:
+        session.execute(statement="DELETE FROM direct_message_tb")
+    started = time.perf_counter()
+    ingest(database, records)
+    elapsed = time.perf_counter() - started
+    with database.data_source.session as session:
+        # Only rows that join back to their sender and target count
+        stored = session.execute(statement="SELECT COUNT(*) AS stored FROM direct_message_tb message "
+                                           "JOIN identity_tb sender ON sender.id=message.sender_id "
+                                           "JOIN identity_tb target ON target.id=message.target_id"
+                                 ).fetchone()['stored']
+    assert stored == len(records)
+    print("{0:<8} {1:<11} {2:>7,} ROWS {3:>9.3f}s {4:>11,.0f} ROWS/SEC".format(
+        database.name, ingest.__name__.upper(), len(records), elapsed, len(records) / elapsed))
+
+
+def run() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        databases = [build_database(name="SQLITE", uri="sqlite:///{}".format(os.path.join(directory, "ingest.db")))]
+        if POSTGRES_URI:
+            databases.append(build_database(name="POSTGRES", uri=POSTGRES_URI))
+        for rows in ROWS:
+            records = messages(rows=rows)
+            for database in databases:
+                for ingest in (insert, executemany):
+                    measure(database=database, records=records, ingest=ingest)
+                if database.name == "POSTGRES":
+                    measure(database=database, records=records, ingest=copy)
+        if not POSTGRES_URI:
+            print("COPY SKIPPED, SET BENCHMARK_POSTGRES_URI TO A POSTGRES DATABASE TO RUN IT")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,100 @@
+import os
+import queue
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from typing import List
+
+from twisted.internet.task import Clock
+
+from app.domain.chat.messages.persistence import MessagePersistence, PersistenceConfiguration
+from app.domain.chat.messages.repository import DirectMessageRecord
+from app.domain.chat.messages.sql_repository import SQLMessageRepository
+from benchmarks.schema import add_identities, data_source, migrated_engine
+
+MESSAGES = int(5000)
+PAYLOAD_SIZE = int(200)
+PARTICIPANTS = (str(uuid.uuid4()), str(uuid.uuid4()))
+
+
+class HandBackClock(Clock):
+    """
+    A clock that also runs what other threads hand back to the reactor, whenever it is told to.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.__handed_back: 'queue.Queue' = queue.Queue()
+
+    def callFromThread(self, f, *args, **kwargs) -> None:
+        self.__handed_back.put((f, args, kwargs))
+
+    def settle(self, persistence: MessagePersistence) -> None:
+        """
+        Runs what is handed back until nothing waits on the persistence any more
+        """
+        while persistence.statistics().queued > 0:
+            try:
+                f, args, kwargs = self.__handed_back.get(timeout=0.01)
+            except queue.Empty:
+                continue
+            f(*args, **kwargs)
+
+
+def build_repository(database_path: str) -> SQLMessageRepository:
+    """
+    A repository over the migrated schema, its identities are the ones `messages` gives
+    """
+    engine = migrated_engine(uri="sqlite:///{}".format(database_path))
+    add_identities(engine=engine, participants=PARTICIPANTS)
+    return SQLMessageRepository(data_source=data_source(engine=engine))
+
+
+def messages() -> List[DirectMessageRecord]:
+    sender, target = PARTICIPANTS
+    return [DirectMessageRecord(sender=sender, target=target, payload=os.urandom(PAYLOAD_SIZE),
+                                received_at=datetime.utcnow(), node="benchmark", marker=str(uuid.uuid4()))
+            for _ in range(MESSAGES)]
+
+
+def report(name: str, elapsed: float, reactor_time: float, commits: int, latency: float) -> None:
+    print("{0:<14} {1:>9,.0f} MESSAGES/SEC {2:>7.1f}us ON THE REACTOR PER MESSAGE COMMITS {3:>5,} "
+          "{4:>6.2f}ms PER COMMIT".format(name, MESSAGES / elapsed, reactor_time / MESSAGES * 1000000, commits,
+                                          latency * 1000))
+
+
+def run() -> None:
+    records = messages()
+    with tempfile.TemporaryDirectory() as directory:
+        repository = build_repository(database_path=os.path.join(directory, "inline.db"))
+        started = time.perf_counter()
+        for record in records:
+            repository.save(sender=record.sender, target=record.target, payload=record.payload,
+                            received_at=record.received_at, node=record.node, marker=record.marker)
+        elapsed = time.perf_counter() - started
+        report(name="INLINE", elapsed=elapsed, reactor_time=elapsed, commits=MESSAGES, latency=elapsed / MESSAGES)
+
+        clock = HandBackClock()
+        persistence = MessagePersistence(configuration=PersistenceConfiguration({}),
+                                         repository=build_repository(os.path.join(directory, "behind.db")),
+                                         reactor=clock)
+        persistence.start()
+        saved: List[None] = []
+        started = time.perf_counter()
+        for record in records:
+            persistence.save(messages=[record]).addCallback(saved.append)
+        reactor_time = time.perf_counter() - started
+        clock.settle(persistence=persistence)
+        elapsed = time.perf_counter() - started
+        persistence.stop()
+        assert len(saved) == MESSAGES and persistence.statistics().failed == 0
+        statistics = persistence.statistics()
+        report(name="WRITE BEHIND", elapsed=elapsed, reactor_time=reactor_time, commits=statistics.commits,
+               latency=statistics.commit_latency)
+        print("MESSAGES PER COMMIT {0:>8.1f} MAX COMMIT {1:>8.2f}ms".format(
+            statistics.messages_per_commit, statistics.max_commit_latency * 1000))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,108 @@
+import gc
+import time
+import tracemalloc
+import uuid
+from typing import Callable, Dict, List, Tuple
+
+from app.domain.chat.participant.directory import ParticipantDirectory
+
+PARTICIPANTS = int(100000)
+# Footprint the per participant cost is extrapolated to
+TARGET = int(500000)
+# Every n-th participant has a second device connected
+SECOND_DEVICE_EVERY = int(10)
+
+
+class Connection(object):
+    """
+    Stands in for a client connection, it holds the identifiers it was handed like the real one does.
+    """
+
+    def __init__(self, participant_identifier: str, routing_identifier: str):
+        self.unique_identifier = str(uuid.uuid4())
+        self.participant_identifier = participant_identifier
+        self.routing_identifier = routing_identifier
+
+
+class LegacyDeviceCollective(object):
+    """
+    The per participant record the connection registry used to keep.
+    """
+
+    def __init__(self, participant_identifier: str):
+        self.__participant_identifier = participant_identifier
+        self.__connections: Dict[str, Connection] = {}
+
+    def add_connection(self, connection: Connection) -> None:
+        self.__connections[connection.unique_identifier] = connection
+
+
+class LegacyLayout(object):
+    """
+    A device collective per participant in the registry and the routing map of the participant service.
+    """
+
+    def __init__(self):
+        self.collectives: Dict[str, LegacyDeviceCollective] = {}
+        self.route_pairing: Dict[str, str] = {}
+
+    def add(self, participant_identifier: str, routing_identifier: str, connection: Connection) -> None:
+        collective = self.collectives.get(participant_identifier)
+        if collective is None:
+            collective = self.collectives[participant_identifier] = LegacyDeviceCollective(participant_identifier)
+        collective.add_connection(connection)
+        self.route_pairing[routing_identifier] = participant_identifier
+
+
+def handshakes() -> List[Tuple[str, str, List[Connection]]]:
+    """
+    Identifiers are decoded separately for every connection and profile, so equal strings are distinct objects.
+    """
+    arrivals = []
+    for index in range(PARTICIPANTS):
+        participant_identifier, routing_identifier = str(uuid.uuid4()), str(uuid.uuid4())
+        devices = 2 if index % SECOND_DEVICE_EVERY == 0 else 1
+        connections = [Connection(participant_identifier="".join(participant_identifier),
+                                  routing_identifier="".join(routing_identifier)) for _ in range(devices)]
+        arrivals.append((participant_identifier, routing_identifier, connections))
+    return arrivals
+
+
+def measure(name: str, arrivals: List[Tuple[str, str, List[Connection]]],
+            build: Callable[[str, str, Connection], None]) -> None:
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    for participant_identifier, routing_identifier, connections in arrivals:
+        for connection in connections:
+            # Every connection hands over its own copy of the identifiers
+            build(str(bytearray(connection.participant_identifier, "ascii"), "ascii"),
+                  str(bytearray(connection.routing_identifier, "ascii"), "ascii"),
+                  connection)
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print("{0:<10} {1:>7,.0f} BYTES PER PARTICIPANT {2:>8,.1f}MB AT {3:,} {4:>7.2f}us PER CONNECTION".format(
+        name, retained / PARTICIPANTS, retained / PARTICIPANTS * TARGET / 1024 / 1024, TARGET,
+        elapsed / sum(len(connections) for _, _, connections in arrivals) * 1000000))
+
+
+def run() -> None:
+    arrivals = handshakes()
+    measure(name="LEGACY", arrivals=arrivals, build=LegacyLayout().add)
+    directory = ParticipantDirectory()
+    measure(name="DIRECTORY", arrivals=arrivals,
+            build=lambda participant_identifier, routing_identifier, connection: directory.add(
+                participant_identifier=participant_identifier, routing_identifier=routing_identifier,
+                connection=connection))
+    # Disconnecting every device has to leave both indexes empty
+    for participant_identifier, routing_identifier, connections in arrivals:
+        for connection in connections:
+            directory.remove(participant_identifier=participant_identifier, connection=connection)
+        assert directory.find_by_routing(routing_identifier) is None
+    assert directory.participant_count() == 0 and directory.connection_count() == 0
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,79 @@
+import random
+import time
+import uuid
+import zlib
+from typing import List
+
+from app.domain.chat.framing import COMPRESSION_LEVEL, COMPRESSION_THRESHOLD
+from app.domain.chat.messages.messages_pb2 import DirectMessage
+from app.domain.chat.participant.contacts_pb2 import BatchContactMatchResponse, Contact
+
+WORDS = ("hey", "are", "we", "still", "on", "for", "tonight", "the", "meeting", "moved", "to", "thursday",
+         "sounds", "good", "see", "you", "there", "can", "you", "send", "me", "the", "address", "please",
+         "running", "late", "by", "ten", "minutes", "sorry", "lol", "thanks", "again", "for", "yesterday")
+
+
+def chat_message(random_source: random.Random) -> bytes:
+    sentence = " ".join(random_source.choice(WORDS) for _ in range(random_source.randint(4, 120)))
+    return DirectMessage(
+        type=DirectMessage.Type.TEXT,
+        content=sentence.encode(),
+        sender_identifier=str(uuid.UUID(int=random_source.getrandbits(128))),
+        target_identifier=str(uuid.UUID(int=random_source.getrandbits(128)))
+    ).SerializeToString()
+
+
+def contact_batch(random_source: random.Random) -> bytes:
+    response = BatchContactMatchResponse()
+    for index in range(random_source.randint(10, 200)):
+        identifier = str(uuid.UUID(int=random_source.getrandbits(128)))
+        response.contacts.append(Contact(
+            nickname="user-{0}".format(index),
+            identifier=identifier,
+            profile_picture_url="https://cdn.example.com/avatars/{0}.png".format(identifier)
+        ))
+    return response.SerializeToString()
+
+
+def corpus(size: int) -> List[bytes]:
+    random_source = random.Random(42)
+    return [contact_batch(random_source) if index % 50 == 0 else chat_message(random_source)
+            for index in range(size)]
+
+
+def run(name: str, payloads: List[bytes], compress) -> None:
+    original = sum(len(payload) for payload in payloads)
+    started = time.perf_counter()
+    compressed = sum(len(compress(payload)) for payload in payloads)
+    elapsed = time.perf_counter() - started
+    print("{0:<28} {1:>8.2f} US/FRAME {2:>10,} -> {3:>10,} BYTES ({4:>5.1f}% SAVED)".format(
+        name,
+        elapsed / len(payloads) * 1e6,
+        original,
+        compressed,
+        (1 - compressed / original) * 100
+    ))
+
+
+def per_frame(payload: bytes) -> bytes:
+    if len(payload) < COMPRESSION_THRESHOLD:
+        return payload
+    return zlib.compress(payload, COMPRESSION_LEVEL)
+
+
+def streaming():
+    compressor = zlib.compressobj(COMPRESSION_LEVEL)
+
+    def compress(payload: bytes) -> bytes:
+        if len(payload) < COMPRESSION_THRESHOLD:
+            return payload
+        return compressor.compress(payload) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    return compress
+
+
+if __name__ == "__main__":
+    payloads = corpus(size=10000)
+    run(name="UNCOMPRESSED", payloads=payloads, compress=lambda payload: payload)
+    run(name="ZLIB PER FRAME", payloads=payloads, compress=per_frame)
+    run(name="ZLIB CONNECTION STREAM", payloads=payloads, compress=streaming())
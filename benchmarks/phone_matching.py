@@ -0,0 +1,100 @@
+import os
+import random
+import tempfile
+import time
+import uuid
+from typing import List
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker, scoped_session
+from twisted.internet.task import Clock
+
+from app.core.database.connection import DataSource
+from app.domain.chat.participant.contacts import ContactIndex, ContactIndexConfiguration, contact_hash
+from app.domain.chat.participant.contacts_pb2 import ContactRequest
+from app.domain.chat.participant.sql_repository import SQLParticipantRepository
+from benchmarks.contact_matching import MIGRATION, StatementCounter
+
+# Participants in the index, most of them offline
+PARTICIPANTS = int(200000)
+ADDRESS_BOOK_SIZES = (100, 1000, 10000, 50000)
+# Share of an address book that belongs to participants
+MATCH_RATIO = float(0.3)
+ROUNDS = int(3)
+COUNTRY_CODE = "254"
+# The ways phones store the same national number
+FORMATS = (
+    "+{0} {1} {2} {3}",
+    "0{1} {2} {3}",
+    "0{1}-{2}-{3}",
+    "00{0}{1}{2}{3}",
+    "+{0} ({1}) {2}-{3}",
+)
+
+
+def subscriber(index: int) -> str:
+    return "{0:09d}".format(700000000 + index)
+
+
+def written(index: int, random_source: random.Random) -> str:
+    number = subscriber(index)
+    return random_source.choice(FORMATS).format(COUNTRY_CODE, number[:3], number[3:6], number[6:])
+
+
+def populate(engine) -> None:
+    with open(MIGRATION) as migration:
+        for statement in migration.read().split(";"):
+            if statement.strip():
+                engine.execute(statement)
+    rows = [(contact_hash(contact_type=ContactRequest.ContactType.PHONE,
+                          value="+{0}{1}".format(COUNTRY_CODE, subscriber(index))),
+             ContactRequest.ContactType.PHONE,
+             str(uuid.uuid4()),
+             str(uuid.uuid4()),
+             "participant-{0}".format(index),
+             None) for index in range(PARTICIPANTS)]
+    with engine.begin() as connection:
+        connection.execute(
+            "INSERT INTO contact_index_tb(contact_hash,contact_type,participant_identifier,routing_identifier,"
+            "nickname,photo_url) VALUES(?,?,?,?,?,?)", rows)
+
+
+def address_book(size: int) -> List[ContactRequest]:
+    random_source = random.Random(size)
+    requests: List[ContactRequest] = []
+    for _ in range(size):
+        if random_source.random() < MATCH_RATIO:
+            index = random_source.randrange(PARTICIPANTS)
+        else:
+            # Numbers of people that never signed up
+            index = PARTICIPANTS + random_source.randrange(PARTICIPANTS)
+        requests.append(ContactRequest(value=written(index=index, random_source=random_source),
+                                       type=ContactRequest.ContactType.PHONE))
+    return requests
+
+
+def run() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine("sqlite:///{}".format(os.path.join(directory, "benchmark.db")))
+        populate(engine=engine)
+        repository = SQLParticipantRepository(
+            data_source=DataSource(session=scoped_session(session_factory=sessionmaker(bind=engine))))
+        counter = StatementCounter(engine=engine)
+        for size in ADDRESS_BOOK_SIZES:
+            requests = address_book(size=size)
+            best = float("inf")
+            matched = 0
+            for _ in range(ROUNDS):
+                # A new index each round so nothing is answered from the hot layer
+                index = ContactIndex(configuration=ContactIndexConfiguration({}), repository=repository,
+                                     reactor=Clock())
+                counter.count = 0
+                started = time.perf_counter()
+                matched = len(index.match(requests=requests, country_code=COUNTRY_CODE))
+                best = min(best, time.perf_counter() - started)
+            print("{0:>6,} CONTACTS {1:>8.1f}us PER CONTACT {2:>9.1f}ms TOTAL MATCHED {3:>6,} "
+                  "STATEMENTS {4:>4,}".format(size, best / size * 1000000, best * 1000, matched, counter.count))
+
+
+if __name__ == "__main__":
+    run()
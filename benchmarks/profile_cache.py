@@ -0,0 +1,58 @@
+import random
+import time
+import tracemalloc
+import uuid
+
+from twisted.internet import defer
+from twisted.internet.task import Clock
+
+from app.domain.chat.participant.participant import Participant
+from app.domain.chat.participant.profiles import ProfileCache, ProfileCacheConfiguration
+
+PARTICIPANTS = int(200000)
+LOOKUPS = int(500000)
+CAPACITY = int(100000)
+# Skew of the lookups, a few participants are far more active than the rest
+ZIPF_EXPONENT = float(1.1)
+SIZING_TARGET = int(1000000)
+
+
+def load(identifier: str) -> defer.Deferred:
+    return defer.succeed(Participant(routing_identity=str(uuid.uuid4()), content_map={
+        "identifier": identifier,
+        "nickname": "user-{0}".format(identifier[:8]),
+        "email_address": "{0}@example.com".format(identifier),
+        "photo_url": "https://example.com/{0}.png".format(identifier)
+    }))
+
+
+def zipf_lookups(participants, count: int):
+    random_source = random.Random(7)
+    weights = [1.0 / (rank ** ZIPF_EXPONENT) for rank in range(1, len(participants) + 1)]
+    return random_source.choices(participants, weights=weights, k=count)
+
+
+if __name__ == "__main__":
+    clock = Clock()
+    participants = [str(uuid.uuid4()) for _ in range(PARTICIPANTS)]
+    lookups = zipf_lookups(participants=participants, count=LOOKUPS)
+
+    cache = ProfileCache(configuration=ProfileCacheConfiguration({"capacity": CAPACITY}), loader=load, reactor=clock)
+    tracemalloc.start()
+    started = time.perf_counter()
+    for identifier in lookups:
+        cache.resolve(identifier=identifier)
+    elapsed = time.perf_counter() - started
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    statistics = cache.statistics()
+    print("LOOKUPS/SEC        {0:>12,.0f}".format(LOOKUPS / elapsed))
+    print("HIT RATE           {0:>12.1%}".format(statistics.hit_rate))
+    print("SIZE               {0:>12,}".format(statistics.size))
+    print("EVICTIONS          {0:>12,}".format(statistics.evictions))
+    print("ESTIMATED MEMORY   {0:>12,} BYTES".format(statistics.memory))
+    print("TRACED MEMORY      {0:>12,} BYTES".format(traced))
+    print("BYTES PER ENTRY    {0:>12,.0f}".format(statistics.memory / statistics.size))
+    print("AT {0:,} ENTRIES {1:>8,.0f} MB".format(SIZING_TARGET,
+                                                  statistics.memory / statistics.size * SIZING_TARGET / 2 ** 20))
@@ -0,0 +1,140 @@
+import os
+import tempfile
+import time
+import uuid
+from typing import List, Optional
+
+from jwcrypto import jwk
+from pymessagebus import CommandBus
+from twisted.internet import defer
+from twisted.internet.task import Clock
+
+from app.core.security.admission import AdmissionController, AdmissionConfiguration
+from app.core.security.restriction import Restrictions
+from app.domain.chat.participant.commands import ParticipantArrivedCommand
+from app.domain.chat.participant.connections import ClientConnection, ConnectionRegistry, DeviceDetails
+from app.domain.chat.participant.directory import ParticipantDirectory
+from app.domain.chat.participant.identification_pb2 import Device, Identification, Resumption, RoutingIdentity
+from app.domain.chat.participant.liveness import LivenessMonitor, LivenessConfiguration
+from app.domain.chat.participant.resumption import ResumptionTickets, ResumptionConfiguration
+from app.domain.chat.types import ResponseType
+from benchmarks.claims_cache import issue_token
+
+CONNECTS = int(2000)
+
+
+class StandInConnection(ClientConnection):
+    def __init__(self):
+        self.__unique_identifier = str(uuid.uuid4())
+        self.__participant_identifier: Optional[str] = None
+        self.accepted: Optional[RoutingIdentity] = None
+
+    def send_message(self, response_type: ResponseType, payload: bytearray) -> None:
+        if response_type is ResponseType.IDENTITY_ACCEPTED:
+            self.accepted = RoutingIdentity()
+            self.accepted.ParseFromString(payload)
+
+    def nickname(self):
+        return "benchmark"
+
+    def unique_identifier(self):
+        return self.__unique_identifier
+
+    def device(self) -> Optional[DeviceDetails]:
+        return None
+
+    def resolve_participant(self, identifier: str, device_information: DeviceDetails) -> None:
+        self.__participant_identifier = identifier
+
+    def load_profile(self, participant_identifier: str) -> defer.Deferred:
+        return defer.succeed(True)
+
+    def participant_identifier(self) -> Optional[str]:
+        return self.__participant_identifier
+
+    def routing_identity(self) -> Optional[str]:
+        return self.__participant_identifier
+
+    def supported_capabilities(self) -> List[int]:
+        return []
+
+    def enable_capabilities(self, capabilities: List[int]) -> None:
+        pass
+
+    def source_address(self) -> str:
+        return "127.0.0.1"
+
+    def disconnect(self, error: str, details: str, retry_after: int = 0) -> None:
+        pass
+
+    def abort(self) -> None:
+        pass
+
+    def when_flushed(self) -> defer.Deferred:
+        return defer.succeed(None)
+
+
+class DecryptingVerifier(object):
+    """
+    Decrypts every token on the spot, the cost a reconnect pays without a ticket and without a cached claim.
+    """
+
+    def __init__(self, restrictions: Restrictions):
+        self.__restrictions = restrictions
+
+    def identify(self, encrypted_token: bytes) -> defer.Deferred:
+        return defer.succeed(self.__restrictions.extract_token_claims(encrypted_token=bytearray(encrypted_token)))
+
+
+def build_registry(key_path: str, clock: Clock, tickets: ResumptionTickets) -> ConnectionRegistry:
+    command_bus = CommandBus()
+    command_bus.add_handler(ParticipantArrivedCommand, lambda command: None)
+    return ConnectionRegistry(
+        command_bus=command_bus,
+        identity_verifier=DecryptingVerifier(restrictions=Restrictions(private_key_path=key_path)),
+        liveness_monitor=LivenessMonitor(configuration=LivenessConfiguration({}), reactor=clock),
+        admission_controller=AdmissionController(
+            configuration=AdmissionConfiguration({"identification_rate": 1e9, "identification_burst": 1e9,
+                                                  "source_rate": 1e9, "source_burst": 1e9}),
+            reactor=clock),
+        resumption_tickets=tickets,
+        directory=ParticipantDirectory()
+    )
+
+
+def report(name: str, started: float, connects: int) -> None:
+    elapsed = time.perf_counter() - started
+    print("{0:<12} {1:>10,.0f} ACCEPTS/SEC".format(name, connects / elapsed))
+
+
+if __name__ == "__main__":
+    key = jwk.JWK.generate(kty="RSA", size=2048)
+    with tempfile.NamedTemporaryFile(suffix=".pem", delete=False) as key_file:
+        key_file.write(key.export_to_pem(private_key=True, password=None))
+    try:
+        clock = Clock()
+        clock.advance(time.time())
+        registry = build_registry(key_path=key_file.name, clock=clock,
+                                  tickets=ResumptionTickets(configuration=ResumptionConfiguration({}), reactor=clock))
+        device = Device(name="benchmark", operating_system="linux", version="1.0", ip_address="127.0.0.1")
+        tokens = [issue_token(key=key) for _ in range(CONNECTS)]
+
+        tickets: List[bytes] = []
+        started = time.perf_counter()
+        for token in tokens:
+            connection = StandInConnection()
+            registry.add_to_pending_identification(connection=connection)
+            identification = Identification(token=token, device=device).SerializeToString()
+            registry.register(payload=identification, connection=connection)
+            tickets.append(connection.accepted.resumption_ticket)
+        report(name="IDENTITY", started=started, connects=len(tokens))
+
+        started = time.perf_counter()
+        for ticket in tickets:
+            connection = StandInConnection()
+            registry.add_to_pending_identification(connection=connection)
+            registry.resume(payload=Resumption(ticket=ticket).SerializeToString(), connection=connection)
+            assert connection.accepted is not None
+        report(name="RESUME", started=started, connects=len(tickets))
+    finally:
+        os.remove(key_file.name)
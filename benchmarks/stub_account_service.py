@@ -0,0 +1,89 @@
+import argparse
+import sys
+from typing import Dict, List
+
+import simplejson
+from twisted.internet import reactor
+from twisted.web import server
+from twisted.web.resource import Resource
+
+from app.domain.chat.participant.accounts import DETAILS_PATH, BULK_DETAILS_PATH
+
+LATENCY = float(0.02)
+PORT = int(5000)
+
+
+class StubAccountService(Resource):
+    """
+    Answers account detail lookups like the account service does, after `latency` seconds.
+    Identifiers starting with "missing" have no account, a 404 for a single lookup and left
+    out of the answer to a bulk lookup.
+    """
+    isLeaf = True
+
+    def __init__(self, latency: float = LATENCY, clock=reactor):
+        super().__init__()
+        self.__latency = latency
+        self.__clock = clock
+        self.requests: int = 0
+
+    def render_GET(self, request) -> object:
+        self.requests += 1
+        identifier = request.path.decode("utf-8")[len(DETAILS_PATH) + 1:]
+        self.__clock.callLater(self.__latency, self.__answer, request, identifier)
+        return server.NOT_DONE_YET
+
+    def render_POST(self, request) -> object:
+        if request.path.decode("utf-8") != BULK_DETAILS_PATH:
+            request.setResponseCode(404)
+            return b""
+        self.requests += 1
+        identifiers = simplejson.loads(request.content.read())["identifiers"]
+        self.__clock.callLater(self.__latency, self.__answer_bulk, request, identifiers)
+        return server.NOT_DONE_YET
+
+    @staticmethod
+    def details(identifier: str) -> Dict:
+        return {
+            "identifier": identifier,
+            "nickname": "user-{0}".format(identifier[:8]),
+            "email_address": "{0}@example.com".format(identifier),
+            "photo_url": "https://example.com/{0}.png".format(identifier)
+        }
+
+    def __answer(self, request, identifier: str) -> None:
+        if request.finished or request.channel is None:
+            # The client gave up waiting
+            return
+        request.setHeader(b"Content-Type", b"application/json")
+        if identifier.startswith("missing"):
+            request.setResponseCode(404)
+            request.write(simplejson.dumps({"message": "unknown user"}).encode())
+        else:
+            request.write(simplejson.dumps(self.details(identifier=identifier)).encode())
+        request.finish()
+
+    def __answer_bulk(self, request, identifiers: List[str]) -> None:
+        if request.finished or request.channel is None:
+            return
+        request.setHeader(b"Content-Type", b"application/json")
+        request.write(simplejson.dumps({"users": [self.details(identifier=identifier) for identifier in identifiers
+                                                  if not identifier.startswith("missing")]}).encode())
+        request.finish()
+
+
+def listen(port: int, latency: float = LATENCY, interface: str = "127.0.0.1"):
+    service = StubAccountService(latency=latency)
+    listening = reactor.listenTCP(port, server.Site(service), interface=interface)
+    return service, listening
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serves canned account details for tests and benchmarks")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--latency", type=float, default=LATENCY)
+    arguments = parser.parse_args()
+    listen(port=arguments.port, latency=arguments.latency)
+    print("STUB ACCOUNT SERVICE ON {0} LATENCY {1}s".format(arguments.port, arguments.latency))
+    sys.stdout.flush()
+    reactor.run()
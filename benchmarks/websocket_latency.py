@@ -0,0 +1,141 @@
+import statistics
+import time
+from typing import List
+
+from autobahn.twisted.websocket import WebSocketClientFactory, WebSocketClientProtocol
+from autobahn.websocket.compress import PerMessageDeflateOffer, PerMessageDeflateResponse, \
+    PerMessageDeflateResponseAccept
+from twisted.internet import defer, protocol, reactor
+
+from app.core.service.websocket import SUBPROTOCOL, WebSocketConfiguration, WebSocketServiceFactory
+from app.domain.chat.framing import HEADER, FrameDecoder, TransportConfiguration
+from app.domain.chat.participant.participant import ConnectedClientProtocol
+from app.domain.chat.types import RequestType, ResponseType
+from benchmarks.hot_path_logging import StandInRegistry
+
+ROUND_TRIPS = int(5000)
+PAYLOAD = b"x" * 64
+
+
+class StandInTransferService(object):
+    def abort_all(self, connection) -> None:
+        pass
+
+
+class PingServiceFactory(protocol.ServerFactory):
+    """
+    Serves the real ConnectedClientProtocol, which answers PING with PONG before identification.
+    """
+
+    def buildProtocol(self, address):
+        return ConnectedClientProtocol(
+            registry=StandInRegistry(),
+            source_address=address.host,
+            participant_service=None,
+            transfer_service=StandInTransferService(),
+            transport_configuration=TransportConfiguration({"compression_enabled": False}),
+            reactor=reactor
+        )
+
+
+class RoundTrips(object):
+    def __init__(self, send):
+        self.__send = send
+        self.__decoder = FrameDecoder()
+        self.__started_at = 0.0
+        self.samples: List[float] = []
+        self.finished = defer.Deferred()
+
+    def ping(self) -> None:
+        self.__started_at = time.perf_counter()
+        self.__send(HEADER.pack(RequestType.PING.value, len(PAYLOAD)) + PAYLOAD)
+
+    def received(self, data: bytes) -> None:
+        for frame in self.__decoder.feed(data=data):
+            if frame.message_type != ResponseType.PONG.value:
+                continue
+            self.samples.append(time.perf_counter() - self.__started_at)
+            if len(self.samples) == ROUND_TRIPS:
+                self.finished.callback(self.samples)
+                return
+            self.ping()
+
+
+class TCPClient(protocol.Protocol):
+    def connectionMade(self):
+        self.factory.round_trips = RoundTrips(send=self.transport.write)
+        self.factory.connected.callback(self.factory.round_trips)
+
+    def dataReceived(self, data: bytes):
+        self.factory.round_trips.received(data)
+
+
+class WebSocketClient(WebSocketClientProtocol):
+    def onOpen(self):
+        self.factory.round_trips = RoundTrips(send=lambda data: self.sendMessage(data, isBinary=True))
+        self.factory.connected.callback(self.factory.round_trips)
+
+    def onMessage(self, payload: bytes, isBinary: bool):
+        self.factory.round_trips.received(payload)
+
+
+def tcp_client_factory(port: int) -> protocol.ClientFactory:
+    factory = protocol.ClientFactory()
+    factory.protocol = TCPClient
+    factory.connected = defer.Deferred()
+    reactor.connectTCP("127.0.0.1", port, factory)
+    return factory
+
+
+def websocket_client_factory(port: int, compressed: bool) -> WebSocketClientFactory:
+    factory = WebSocketClientFactory("ws://127.0.0.1:{0}".format(port), protocols=[SUBPROTOCOL])
+    factory.protocol = WebSocketClient
+    factory.connected = defer.Deferred()
+    if compressed:
+        def accept(response):
+            if isinstance(response, PerMessageDeflateResponse):
+                return PerMessageDeflateResponseAccept(response)
+
+        factory.setProtocolOptions(perMessageCompressionOffers=[PerMessageDeflateOffer()],
+                                   perMessageCompressionAccept=accept)
+    reactor.connectTCP("127.0.0.1", port, factory)
+    return factory
+
+
+def report(name: str, samples: List[float]) -> None:
+    ordered = sorted(samples)
+    print("{0:<24} P50 {1:>8.1f} US  P99 {2:>8.1f} US  MEAN {3:>8.1f} US".format(
+        name,
+        ordered[len(ordered) // 2] * 1e6,
+        ordered[int(len(ordered) * 0.99)] * 1e6,
+        statistics.mean(ordered) * 1e6
+    ))
+
+
+@defer.inlineCallbacks
+def run():
+    service_factory = PingServiceFactory()
+    tcp_port = reactor.listenTCP(0, service_factory, interface="127.0.0.1")
+    websocket_port = reactor.listenTCP(0, WebSocketServiceFactory(
+        wrapped_factory=service_factory,
+        configuration=WebSocketConfiguration({"compression_enabled": True}),
+        reactor=reactor
+    ), interface="127.0.0.1")
+    clients = (
+        ("RAW TCP", lambda: tcp_client_factory(port=tcp_port.getHost().port)),
+        ("WEBSOCKET", lambda: websocket_client_factory(port=websocket_port.getHost().port, compressed=False)),
+        ("WEBSOCKET DEFLATE", lambda: websocket_client_factory(port=websocket_port.getHost().port, compressed=True)),
+    )
+    try:
+        for name, connect in clients:
+            round_trips = yield connect().connected
+            round_trips.ping()
+            samples = yield round_trips.finished
+            report(name=name, samples=samples)
+    finally:
+        reactor.stop()
+
+
+if __name__ == "__main__":
+    reactor.callWhenRunning(run)
+    reactor.run()
@@ -5,11 +5,26 @@
 
 
 # Press the green button in the gutter to run the script.
+import sys
+
 from app.application import Application
 from app.configuration import Configuration
+from app.core.logging.loggers import initialize_logging
+from app.core.service.workers import Supervisor, WorkerConfiguration
 
 if __name__ == '__main__':
-    application: Application = Application(configuration=Configuration.get_instance())
-    application.run()
+    initialize_logging()
+    configuration: Configuration = Configuration.get_instance()
+    workers = WorkerConfiguration(content_map=configuration.worker_configuration())
+    if workers.count > 0 and configuration.worker_index() is None:
+        from twisted.internet import reactor
+
+        supervisor: Supervisor = Supervisor(configuration=workers,
+                                            reactor=reactor,
+                                            arguments=[sys.executable] + sys.argv)
+        supervisor.run()
+    else:
+        application: Application = Application(configuration=configuration)
+        application.run()
 
 
@@ -1,4 +1,4 @@
-DROP INDEX device_index_idx;
+DROP INDEX device_information_idx;
 DROP INDEX identity_index_idx;
 DROP TABLE device_information_tb;
 DROP TABLE identity_tb;
@@ -0,0 +1,2 @@
+DROP INDEX direct_message_idx;
+DROP TABLE direct_message_tb;
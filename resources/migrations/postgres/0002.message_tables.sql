@@ -6,10 +6,10 @@ CREATE TABLE IF NOT EXISTS direct_message_tb (
 	node VARCHAR NOT NULL,
 	marker UUID NOT NULL,
 	status VARCHAR NOT NULL,
-	received_at TIMESTAMP DEFAULT NOT NULL,
+	received_at TIMESTAMP NOT NULL,
 	created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
 	idx BIGSERIAL NOT NULL UNIQUE
 );
 
-CREATE INDEX direct_message_idx ON device_information_tb USING btree(idx);
\ No newline at end of file
+CREATE INDEX direct_message_idx ON direct_message_tb USING btree(idx);
\ No newline at end of file
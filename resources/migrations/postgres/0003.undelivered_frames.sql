@@ -0,0 +1,10 @@
+CREATE TABLE IF NOT EXISTS undelivered_frame_tb (
+	id SERIAL PRIMARY KEY,
+	participant_identifier VARCHAR NOT NULL,
+	response_type INTEGER NOT NULL,
+	payload BYTEA NOT NULL,
+	stored_at TIMESTAMP NOT NULL,
+	created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX undelivered_frame_participant_idx ON undelivered_frame_tb USING btree(participant_identifier, id);
@@ -0,0 +1,11 @@
+CREATE TABLE IF NOT EXISTS contact_index_tb (
+	contact_hash BYTEA PRIMARY KEY,
+	contact_type SMALLINT NOT NULL,
+	participant_identifier VARCHAR NOT NULL,
+	routing_identifier VARCHAR NOT NULL,
+	nickname VARCHAR NOT NULL,
+	photo_url VARCHAR,
+	updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX contact_index_participant_idx ON contact_index_tb USING btree(participant_identifier);
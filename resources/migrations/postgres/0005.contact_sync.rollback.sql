@@ -0,0 +1,2 @@
+DROP TABLE contact_sync_root_tb;
+DROP TABLE contact_sync_tb;
@@ -0,0 +1,16 @@
+CREATE TABLE IF NOT EXISTS contact_sync_tb (
+	participant_identifier VARCHAR NOT NULL,
+	bucket INTEGER NOT NULL,
+	bucket_count INTEGER NOT NULL,
+	digest BYTEA NOT NULL,
+	matches TEXT NOT NULL,
+	updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+	PRIMARY KEY (participant_identifier, bucket)
+);
+
+CREATE TABLE IF NOT EXISTS contact_sync_root_tb (
+	participant_identifier VARCHAR PRIMARY KEY,
+	bucket_count INTEGER NOT NULL,
+	root BYTEA NOT NULL,
+	updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1 @@
+DROP TABLE conversation_tb;
@@ -0,0 +1,9 @@
+CREATE TABLE IF NOT EXISTS conversation_tb (
+	reader_identifier VARCHAR NOT NULL,
+	conversation_identifier VARCHAR NOT NULL,
+	last_sequence BIGINT NOT NULL DEFAULT 0,
+	read_sequence BIGINT NOT NULL DEFAULT 0,
+	read_marker VARCHAR,
+	updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+	PRIMARY KEY (reader_identifier, conversation_identifier)
+);
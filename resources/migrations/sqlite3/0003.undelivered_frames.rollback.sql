@@ -0,0 +1,2 @@
+DROP INDEX undelivered_frame_participant_idx;
+DROP TABLE undelivered_frame_tb;
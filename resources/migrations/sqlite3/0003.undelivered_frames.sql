@@ -0,0 +1,10 @@
+CREATE TABLE IF NOT EXISTS undelivered_frame_tb (
+	id INTEGER PRIMARY KEY AUTOINCREMENT,
+	participant_identifier VARCHAR(36) NOT NULL,
+	response_type INTEGER NOT NULL,
+	payload BLOB NOT NULL,
+	stored_at TIMESTAMP NOT NULL,
+	created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX undelivered_frame_participant_idx ON undelivered_frame_tb(participant_identifier, id);
@@ -0,0 +1,2 @@
+DROP INDEX contact_index_participant_idx;
+DROP TABLE contact_index_tb;
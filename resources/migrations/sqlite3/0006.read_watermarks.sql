@@ -0,0 +1,9 @@
+CREATE TABLE IF NOT EXISTS conversation_tb (
+	reader_identifier VARCHAR(36) NOT NULL,
+	conversation_identifier VARCHAR(36) NOT NULL,
+	last_sequence INTEGER NOT NULL DEFAULT 0,
+	read_sequence INTEGER NOT NULL DEFAULT 0,
+	read_marker VARCHAR(36),
+	updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+	PRIMARY KEY (reader_identifier, conversation_identifier)
+);
@@ -0,0 +1,20 @@
+CREATE TABLE IF NOT EXISTS direct_message_tb (
+	id INTEGER PRIMARY KEY AUTOINCREMENT,
+	sender_id INTEGER NOT NULL,
+	target_id INTEGER NOT NULL,
+	message BLOB NOT NULL,
+	node VARCHAR NOT NULL,
+	marker VARCHAR(36) NOT NULL,
+	status VARCHAR NOT NULL,
+	received_at TIMESTAMP NOT NULL,
+	created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+	idx INTEGER
+);
+
+CREATE TRIGGER IF NOT EXISTS update_direct_message_idx AFTER INSERT ON direct_message_tb
+		BEGIN
+		    UPDATE direct_message_tb SET idx=id WHERE id=NEW.id;
+		END;
+
+CREATE INDEX direct_message_idx ON direct_message_tb(idx);
@@ -0,0 +1,55 @@
+from typing import List
+
+from twisted.internet.task import Clock
+
+from app.domain.chat.participant.liveness import LivenessConfiguration, LivenessMonitor, TimingWheel
+
+
+def advance_until_expired(wheel: TimingWheel, key: str, start: float, step: float) -> float:
+    now = start
+    while True:
+        now += step
+        if key in wheel.advance(now=now):
+            return now
+
+
+def test_fractional_deadlines_expire_within_a_tick():
+    for deadline in (0.3, 9.99, 10.0, 10.01, 10.3, 511.7, 700.25):
+        wheel = TimingWheel(tick_interval=1.0, slots=512, now=0.0)
+        wheel.schedule(key="connection", deadline=deadline)
+        expired_at = advance_until_expired(wheel=wheel, key="connection", start=0.0, step=1.0)
+        assert deadline <= expired_at < deadline + 1.0, (deadline, expired_at)
+        assert len(wheel) == 0
+
+
+def test_deadlines_off_the_tick_grid_expire_within_a_tick():
+    wheel = TimingWheel(tick_interval=0.1, slots=8, now=0.05)
+    wheel.schedule(key="connection", deadline=0.35)
+    expired_at = advance_until_expired(wheel=wheel, key="connection", start=0.05, step=0.1)
+    assert 0.35 <= expired_at < 0.35 + 0.1 + 1e-9, expired_at
+
+
+class Connection(object):
+    def __init__(self, identifier: str):
+        self.identifier = identifier
+        self.disconnected_with: List[str] = []
+
+    def unique_identifier(self) -> str:
+        return self.identifier
+
+    def disconnect(self, error: str, details: str) -> None:
+        self.disconnected_with.append(error)
+
+
+def test_unidentified_connection_is_evicted_after_the_timeout():
+    clock = Clock()
+    clock.advance(0.3)
+    monitor = LivenessMonitor(configuration=LivenessConfiguration({"identification_timeout": 10.0}), reactor=clock)
+    monitor.start()
+    connection = Connection(identifier="connection")
+    monitor.track(connection=connection)
+    clock.pump([1.0] * 10)
+    assert connection.disconnected_with == []
+    clock.pump([1.0])
+    assert connection.disconnected_with == ["IDENTIFICATION-TIMEOUT"]
+    monitor.stop()
@@ -0,0 +1,44 @@
+import uuid
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import text
+
+from app.domain.chat.messages.persistence import MessagePersistence, PersistenceConfiguration
+from app.domain.chat.messages.repository import DirectMessageRecord
+from app.domain.chat.messages.sql_repository import SQLMessageRepository
+from benchmarks.message_persistence import HandBackClock
+from benchmarks.schema import add_identities, data_source, migrated_engine
+
+
+def messages(sender: str, target: str, count: int) -> List[DirectMessageRecord]:
+    return [DirectMessageRecord(sender=sender, target=target, payload=b"hello", received_at=datetime.utcnow(),
+                                node="test", marker=str(uuid.uuid4())) for _ in range(count)]
+
+
+def test_failed_batch_keeps_exactly_the_good_messages(tmp_path):
+    engine = migrated_engine(uri="sqlite:///{}".format(tmp_path / "messages.db"))
+    sender, target = str(uuid.uuid4()), str(uuid.uuid4())
+    add_identities(engine=engine, participants=(sender, target))
+    clock = HandBackClock()
+    # Long enough for the three saves to be committed as one batch
+    persistence = MessagePersistence(configuration=PersistenceConfiguration({"max_batch_age": 1.0}),
+                                     repository=SQLMessageRepository(data_source=data_source(engine=engine)),
+                                     reactor=clock)
+    # The bad message lands in the second INSERT of the batch, after a first one that went through
+    saves = [messages(sender=sender, target=target, count=150),
+             messages(sender=sender, target=str(uuid.uuid4()), count=1),
+             messages(sender=sender, target=target, count=10)]
+    outcomes: List[bool] = []
+    for save in saves:
+        persistence.save(messages=save).addCallbacks(lambda _: outcomes.append(True),
+                                                     lambda _: outcomes.append(False))
+    persistence.start()
+    clock.settle(persistence=persistence)
+    persistence.stop()
+
+    assert outcomes == [True, False, True]
+    stored = engine.execute(text("SELECT marker FROM direct_message_tb")).fetchall()
+    assert sorted(row['marker'] for row in stored) == sorted(message.marker for message in saves[0] + saves[2])
+    statistics = persistence.statistics()
+    assert (statistics.saved, statistics.failed) == (160, 1)
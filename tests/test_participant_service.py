@@ -0,0 +1,62 @@
+import uuid
+from typing import List
+
+from pymessagebus import CommandBus
+
+from app.configuration import Configuration
+from app.domain.chat.messages.messages_pb2 import DirectMessage
+from app.domain.chat.messages.persistence import MessagePersistence, PersistenceConfiguration
+from app.domain.chat.messages.sql_repository import SQLMessageRepository
+from app.domain.chat.participant.commands import MessageDispatchCommand
+from app.domain.chat.participant.directory import ParticipantDirectory
+from app.domain.chat.participant.node_pb2 import ParticipantPassOver
+from app.domain.chat.participant.participant import ParticipantService
+from app.domain.chat.types import ResponseType
+from benchmarks.message_persistence import HandBackClock
+from benchmarks.schema import add_identities, data_source, migrated_engine
+
+
+def pass_over(tmp_path, sender_known: bool) -> List[MessageDispatchCommand]:
+    engine = migrated_engine(uri="sqlite:///{}".format(tmp_path / "messages.db"))
+    sender, target, target_routing_identifier = str(uuid.uuid4()), str(uuid.uuid4()), str(uuid.uuid4())
+    add_identities(engine=engine, participants=(sender, target) if sender_known else (target,))
+    dispatched: List[MessageDispatchCommand] = []
+    command_bus = CommandBus()
+    command_bus.add_handler(MessageDispatchCommand, dispatched.append)
+    directory = ParticipantDirectory()
+    directory.add(participant_identifier=target, routing_identifier=target_routing_identifier, connection=object())
+    clock = HandBackClock()
+    message_repository = SQLMessageRepository(data_source=data_source(engine=engine))
+    persistence = MessagePersistence(configuration=PersistenceConfiguration({}), repository=message_repository,
+                                     reactor=clock)
+    persistence.start()
+    service = ParticipantService(configuration=Configuration.get_instance(),
+                                 command_bus=command_bus,
+                                 participant_repository=None,
+                                 message_repository=message_repository,
+                                 account_client=None,
+                                 directory=directory,
+                                 persistence=persistence,
+                                 reactor=clock)
+    service.on_external_participant_event(ParticipantPassOver(
+        sender_identifier=sender,
+        target_identifier=target_routing_identifier,
+        originating_node="elsewhere",
+        marker=str(uuid.uuid4()),
+        payload=DirectMessage(type=DirectMessage.Type.TEXT, content=b"hi",
+                              target_identifier=target_routing_identifier).SerializeToString(),
+        sender_routing_identifier=str(uuid.uuid4())))
+    # Nothing reaches the target while the message waits to be saved
+    assert dispatched == []
+    clock.settle(persistence=persistence)
+    persistence.stop()
+    return dispatched
+
+
+def test_passed_over_message_reaches_target_once_saved(tmp_path):
+    dispatched = pass_over(tmp_path=tmp_path, sender_known=True)
+    assert [command.response_type for command in dispatched] == [ResponseType.RECEIVE_DIRECT_MESSAGE]
+
+
+def test_passed_over_message_that_cannot_be_saved_is_not_delivered(tmp_path):
+    assert pass_over(tmp_path=tmp_path, sender_known=False) == []
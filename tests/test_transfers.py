@@ -0,0 +1,112 @@
+import uuid
+from typing import List, Optional, Tuple
+
+from pymessagebus import CommandBus
+from twisted.internet import defer
+from twisted.internet.task import Clock
+from twisted.internet.testing import StringTransport
+
+from app.domain.chat.framing import FrameWriter
+from app.domain.chat.messages.messages_pb2 import TransferChunk, TransferCredit, TransferOffer
+from app.domain.chat.participant.commands import MessageDispatchCommand
+from app.domain.chat.participant.transfers import TransferConfiguration, TransferService
+from app.domain.chat.types import ResponseType
+
+
+class Sender(object):
+    def __init__(self):
+        self.credits: List[TransferCredit] = []
+
+    def unique_identifier(self) -> str:
+        return "sender"
+
+    def participant_identifier(self) -> str:
+        return "sender-participant"
+
+    def routing_identity(self) -> str:
+        return "sender-routing"
+
+    def send_message(self, response_type: ResponseType, payload: bytes) -> None:
+        assert response_type is ResponseType.TRANSFER_CREDIT
+        self.credits.append(TransferCredit.FromString(payload))
+
+
+class Target(object):
+    """
+    Queues what it is sent on a frame writer, pausing the writer stands in for a client that stopped reading
+    """
+
+    def __init__(self, clock: Clock):
+        self.transport = StringTransport()
+        self.writer = FrameWriter(transport=self.transport, reactor=clock)
+
+    def unique_identifier(self) -> str:
+        return "target"
+
+    def participant_identifier(self) -> str:
+        return "target-participant"
+
+    def send_message(self, response_type: ResponseType, payload: bytes) -> None:
+        assert self.writer.write(message_type=response_type.value, payload=payload)
+
+    def when_flushed(self) -> defer.Deferred:
+        return self.writer.when_flushed()
+
+
+class Participants(object):
+    def __init__(self, target: Target):
+        self.connections: Tuple = (target,)
+
+    def resolve_local_participant(self, routing_identifier: str) -> Optional[str]:
+        return "target-participant" if self.connections else None
+
+    def local_connections(self, participant_identifier: str) -> Tuple:
+        return self.connections
+
+
+def relay(tmp_path) -> Tuple[TransferService, Sender, Target, Participants, Clock]:
+    clock = Clock()
+    target = Target(clock=clock)
+    participants = Participants(target=target)
+    command_bus = CommandBus()
+    command_bus.add_handler(MessageDispatchCommand, lambda command: [
+        connection.send_message(response_type=command.response_type, payload=command.payload)
+        for connection in participants.local_connections(participant_identifier=command.participant_identifier)])
+    service = TransferService(configuration=TransferConfiguration({"spool_directory": str(tmp_path), "window": 8}),
+                              command_bus=command_bus, participant_service=participants)
+    sender = Sender()
+    service.offer(connection=sender, payload=TransferOffer(transfer_identifier="upload", target_identifier="target",
+                                                           name="video", length=1024).SerializeToString())
+    return service, sender, target, participants, clock
+
+
+def send_chunks(service: TransferService, sender: Sender, sequences: range) -> None:
+    for sequence in sequences:
+        service.receive_chunk(connection=sender, payload=TransferChunk(
+            transfer_identifier="upload", sequence=sequence, content=uuid.uuid4().bytes).SerializeToString())
+
+
+def test_relay_credit_waits_for_the_target_to_drain(tmp_path):
+    service, sender, target, _, clock = relay(tmp_path=tmp_path)
+    assert [(credit.acknowledged, credit.window) for credit in sender.credits] == [(0, 8)]
+    target.writer.pause()
+    send_chunks(service=service, sender=sender, sequences=range(0, 6))
+    clock.advance(0)
+    # Still queued on the target, the sender gets no further credit
+    assert len(sender.credits) == 1
+    target.writer.resume()
+    # Acknowledges what was queued when the window half filled up, not what came in after
+    assert [credit.acknowledged for credit in sender.credits] == [0, 4]
+    send_chunks(service=service, sender=sender, sequences=range(6, 8))
+    clock.advance(0)
+    assert [credit.acknowledged for credit in sender.credits] == [0, 4, 8]
+
+
+def test_relay_is_aborted_when_the_target_leaves(tmp_path):
+    service, sender, target, participants, _ = relay(tmp_path=tmp_path)
+    send_chunks(service=service, sender=sender, sequences=range(0, 2))
+    participants.connections = ()
+    service.abort_all(connection=target)
+    assert sender.credits[-1].reason == "TARGET-DISCONNECTED"
+    send_chunks(service=service, sender=sender, sequences=range(2, 3))
+    assert sender.credits[-1].reason == "UNKNOWN-TRANSFER"
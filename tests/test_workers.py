@@ -0,0 +1,12 @@
+import simplejson
+from twisted.web.test.requesthelper import DummyRequest
+
+from app.core.service.workers import HealthResource, HealthStatus
+
+
+def test_health_resource_serves_what_the_probe_reports():
+    for status, code in ((HealthStatus.UP, 200), (HealthStatus.DEGRADED, 429), (HealthStatus.DOWN, 503)):
+        request = DummyRequest([b""])
+        body = HealthResource(probe=lambda: {"status": status.value, "connections": 3}).render_GET(request)
+        assert request.responseCode == code
+        assert simplejson.loads(body) == {"status": status.value, "connections": 3}